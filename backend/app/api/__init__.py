@@ -1,5 +1,7 @@
 from .rituals import router as rituals_router
 from .tts import router as tts_router
 from .generation import router as generation_router
+from .maintenance import router as maintenance_router
+from .audio import AudioFiles
 
-__all__ = ["rituals_router", "tts_router", "generation_router"]
+__all__ = ["rituals_router", "tts_router", "generation_router", "maintenance_router", "AudioFiles"]
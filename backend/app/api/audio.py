@@ -0,0 +1,69 @@
+"""Audio file serving."""
+
+import asyncio
+import os
+
+from fastapi.staticfiles import StaticFiles
+from starlette.exceptions import HTTPException
+from starlette.responses import Response
+from starlette.types import Scope
+
+from ..config import get_settings
+from ..logging_config import get_logger
+from ..services.audio_jobs import get_audio_job_manager
+from ..services.storage import TEMP_AUDIO_ID, get_storage_service
+
+logger = get_logger(__name__)
+
+
+class AudioFiles(StaticFiles):
+    """
+    Serves /api/audio/{ritual_id}/{file} from storage.
+
+    Paths are resolved by the storage service rather than joined onto one
+    directory, so URLs stay the same whichever layout (flat or sharded) the
+    file is in, including mid-migration. Range requests, ETags and
+    conditional GETs are handled by StaticFiles as before.
+
+    Every response for a ritual's audio is recorded in the storage's access
+    log (which drives quota eviction), and a request for a segment whose
+    audio was evicted waits for it to be regenerated.
+    """
+
+    def lookup_path(self, path: str) -> tuple[str, os.stat_result | None]:
+        full_path = get_storage_service().resolve_audio_path(path.replace(os.sep, "/"))
+        if full_path is None:
+            return "", None
+        try:
+            return str(full_path), os.stat(full_path)
+        except (FileNotFoundError, NotADirectoryError):
+            return "", None
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        ritual_id, _, name = path.replace(os.sep, "/").partition("/")
+        try:
+            response = await super().get_response(path, scope)
+        except HTTPException as e:
+            if e.status_code != 404 or ritual_id == TEMP_AUDIO_ID or "/" in name:
+                raise
+            if not await self._restore(ritual_id, name.rpartition(".")[0]):
+                raise
+            response = await super().get_response(path, scope)
+
+        if ritual_id != TEMP_AUDIO_ID:
+            get_storage_service().audio_access.touch(ritual_id)
+        return response
+
+    @staticmethod
+    async def _restore(ritual_id: str, segment_id: str) -> bool:
+        """Regenerate an evicted segment, bounded by the restore timeout."""
+        timeout = get_settings().audio_restore_timeout_seconds
+        try:
+            return await asyncio.wait_for(get_audio_job_manager().restore_evicted(ritual_id, segment_id), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Timed out regenerating evicted audio {ritual_id}/{segment_id}")
+            raise HTTPException(
+                status_code=503,
+                detail="Audio is being regenerated",
+                headers={"Retry-After": "5"},
+            )
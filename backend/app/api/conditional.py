@@ -0,0 +1,48 @@
+"""ETags and conditional requests for JSON responses."""
+
+import json
+from typing import Optional, Union
+
+from fastapi import HTTPException, Request, Response
+
+from ..services.storage import content_etag
+
+
+def parse_etags(header: Optional[str]) -> Optional[list[str]]:
+    """ETags listed in an If-Match / If-None-Match header, or None if it's absent."""
+    if header is None:
+        return None
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def if_match(request: Request) -> Optional[list[str]]:
+    """The request's If-Match ETags, or None without the header."""
+    return parse_etags(request.headers.get("if-match"))
+
+
+def precondition_failed() -> HTTPException:
+    return HTTPException(status_code=412, detail="Ritual was changed by another request; reload it and retry")
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """Whether If-None-Match covers etag (weak comparison, as RFC 9110 requires for GET)."""
+    tags = parse_etags(request.headers.get("if-none-match"))
+    if not tags:
+        return False
+    return any(tag == "*" or tag.removeprefix("W/") == etag for tag in tags)
+
+
+def json_response(request: Request, body: Union[str, bytes], headers: Optional[dict] = None) -> Response:
+    """
+    A JSON response with a strong ETag of its body (and headers, e.g. a
+    paging cursor), or an empty 304 when the client already has it.
+    """
+    headers = dict(headers or {})
+    tagged = body.encode("utf-8") if isinstance(body, str) else body
+    if headers:
+        tagged += json.dumps(headers, sort_keys=True).encode("utf-8")
+    etag = content_etag(tagged)
+    headers["ETag"] = etag
+    if not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -5,7 +5,7 @@ from fastapi import APIRouter, HTTPException
 from ..logging_config import get_logger
 from ..models.ritual import RitualCreate, RitualResponse
 from ..services.openai_provider import get_openai_provider
-from ..services.storage import get_storage_service
+from ..services.async_storage import get_async_storage_service
 
 logger = get_logger(__name__)
 
@@ -28,7 +28,7 @@ async def generate_ritual(request: RitualCreate):
     )
 
     openai_provider = get_openai_provider()
-    storage = get_storage_service()
+    storage = get_async_storage_service()
 
     if not openai_provider.is_available():
         logger.error("OpenAI API not configured")
@@ -63,7 +63,7 @@ async def generate_ritual(request: RitualCreate):
         ritual.audio_status = "pending"  # Audio not generated yet
 
         # Save ritual to storage
-        storage.save_ritual(ritual)
+        await storage.save_ritual(ritual)
         logger.debug(f"Ritual saved to storage: {ritual.id}")
 
         return RitualResponse(ritual=ritual)
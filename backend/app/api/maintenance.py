@@ -0,0 +1,26 @@
+"""Storage maintenance API routes."""
+
+from fastapi import APIRouter
+
+from ..logging_config import get_logger
+from ..models.maintenance import MaintenanceStats
+from ..services.maintenance import get_maintenance_scheduler
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/stats", response_model=MaintenanceStats)
+async def get_maintenance_stats():
+    """Maintenance scheduler counters, including bytes reclaimed per task."""
+    return MaintenanceStats(**get_maintenance_scheduler().stats())
+
+
+@router.post("/run", response_model=MaintenanceStats)
+async def run_maintenance():
+    """Run a maintenance pass now (waits for one already in progress) and return the updated counters."""
+    scheduler = get_maintenance_scheduler()
+    logger.info("Running maintenance pass on request")
+    await scheduler.run_once()
+    return MaintenanceStats(**scheduler.stats())
@@ -1,66 +1,339 @@
 """Ritual CRUD API routes."""
 
-from fastapi import APIRouter, HTTPException
-from typing import List
+import asyncio
+import base64
+import json
+import tempfile
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from typing import IO, List, Literal, Optional, Union
 
 from ..logging_config import get_logger
-from ..models.ritual import Ritual, RitualResponse
-from ..services.storage import get_storage_service
+from .conditional import if_match, json_response, precondition_failed
+from ..models.library import LibraryImportResult
+from ..models.ritual import Ritual, RitualCacheStats, RitualResponse, RitualSearchHit, RitualSummary
+from ..services.ritual_index import RitualIndexEntry
+from ..services.storage import PreconditionFailedError, StorageService, etag_matches, ritual_etag
+from ..services.ritual_patch import (
+    JSON_PATCH_TYPE, MERGE_PATCH_TYPE, PatchError, PatchTestFailed, PatchValidationError, patch_ritual,
+)
+from ..services.async_storage import get_async_storage_service
+from ..services.library_transfer import (
+    DEFAULT_IMPORT_WORKERS, import_ndjson, import_tar, is_tar,
+)
 
 logger = get_logger(__name__)
 
 router = APIRouter()
 
+MAX_PAGE_SIZE = 500
 
-@router.get("", response_model=List[Ritual])
-async def list_rituals():
-    """List all rituals."""
-    logger.debug("Listing all rituals")
-    storage = get_storage_service()
-    rituals = storage.list_rituals()
-    logger.info(f"Listed {len(rituals)} rituals")
-    return rituals
+# Times a PATCH without If-Match is reapplied when the ritual changes while it's being patched
+PATCH_ATTEMPTS = 3
+
+
+def _encode_cursor(key: tuple[str, str]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        key = None
+    if not isinstance(key, list) or len(key) != 2 or not all(isinstance(part, str) for part in key):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key[0], key[1]
+
+
+def _summary(entry: RitualIndexEntry) -> RitualSummary:
+    # Index entries come from validated rituals, so skip validating them again
+    return RitualSummary.model_construct(
+        id=entry.id,
+        title=entry.title,
+        duration=entry.duration,
+        tone=entry.tone,
+        tags=list(entry.tags),
+        is_template=entry.is_template,
+        audio_status=entry.audio_status,
+        created_at=entry.created_at,
+        updated_at=entry.updated_at,
+    )
+
+
+def _json_list(items: list, headers: Optional[dict] = None, request: Optional[Request] = None) -> Response:
+    """
+    Serialize already-validated models directly, bypassing response_model validation.
+
+    With the request, the response gets an ETag and honors If-None-Match.
+    """
+    body = "[" + ",".join(item.model_dump_json(by_alias=True) for item in items) + "]"
+    if request is not None:
+        return json_response(request, body, headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("", response_model=Union[List[Ritual], List[RitualSummary]])
+async def list_rituals(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    tags: Optional[List[str]] = Query(None),
+    tone: Optional[Literal["gentle", "neutral", "coach"]] = None,
+    audio_status: Optional[Literal["pending", "generating", "ready", "error"]] = Query(None, alias="audioStatus"),
+    is_template: Optional[bool] = Query(None, alias="isTemplate"),
+    view: Literal["full", "summary"] = "full",
+    ids: Optional[List[str]] = Query(None),
+):
+    """
+    List rituals, newest first.
+
+    Without parameters this returns every ritual. With `limit`, results are
+    paged: the X-Next-Cursor response header holds the `cursor` for the next
+    page and is absent on the last one. `tags` (repeatable; all must match),
+    `tone`, `audioStatus` and `isTemplate` filter the listing, and
+    `view=summary` leaves out sections. `ids` (repeatable or comma-separated)
+    fetches those rituals in the given order instead. Responses carry an
+    ETag; a matching If-None-Match gets an empty 304.
+    """
+    storage = get_async_storage_service()
+
+    if ids:
+        ritual_ids = [ritual_id for value in ids for ritual_id in value.split(",") if ritual_id]
+        logger.debug(f"Fetching {len(ritual_ids)} rituals by ID")
+        if view == "summary":
+            entries = await storage.get_ritual_summaries(ritual_ids)
+            return _json_list([_summary(entry) for entry in entries], request=request)
+        return _json_list(await storage.load_rituals(ritual_ids, readonly=True), request=request)
+
+    logger.debug("Listing rituals")
+    entries, next_key = await storage.page_ritual_summaries(
+        before=_decode_cursor(cursor) if cursor else None,
+        limit=limit,
+        tags=tags,
+        tone=tone,
+        audio_status=audio_status,
+        is_template=is_template,
+    )
+    headers = {"X-Next-Cursor": _encode_cursor(next_key)} if next_key else None
+
+    if view == "summary":
+        items = [_summary(entry) for entry in entries]
+    else:
+        items = await storage.load_rituals([entry.id for entry in entries], readonly=True)
+    logger.info(f"Listed {len(items)} rituals")
+    return _json_list(items, headers, request)
+
+
+@router.get("/search", response_model=List[RitualSearchHit])
+async def search_rituals(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Full-text search over ritual titles, intentions, tags and segment text.
+
+    Returns summaries of rituals containing every word of `q` (the last
+    one as a prefix), most relevant first, each with its `score` and a
+    `snippet` of the best-matching text. Page with `offset`.
+    """
+    storage = get_async_storage_service()
+    hits = await storage.search_rituals(q, limit, offset)
+    items = [
+        RitualSearchHit.model_construct(**dict(_summary(hit.entry)), score=hit.score, snippet=hit.snippet)
+        for hit in hits
+    ]
+    logger.debug(f"Search for {q!r} matched {len(items)} rituals")
+    return _json_list(items)
+
+
+@router.get("/export")
+async def export_rituals(audio: bool = False):
+    """
+    Stream the whole library as NDJSON (one ritual per line).
+
+    With `audio=true`, streams a tar instead: each ritual as
+    `rituals/{id}.json` followed by its segment audio under `audio/{id}/`.
+    """
+    if audio:
+        media_type, filename = "application/x-tar", "rituals.tar"
+    else:
+        media_type, filename = "application/x-ndjson", "rituals.ndjson"
+    logger.info(f"Exporting rituals ({media_type})")
+    return StreamingResponse(
+        get_async_storage_service().export_library(audio),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/import", response_model=LibraryImportResult)
+async def import_rituals(request: Request, workers: int = Query(DEFAULT_IMPORT_WORKERS, ge=1, le=32)):
+    """
+    Import an export: NDJSON, or a tar with audio (detected from its header).
+
+    The upload is spooled to disk and then imported on `workers` threads.
+    Rituals whose stored copy is at least as recent, and audio files that
+    are already stored, are skipped, so an interrupted import can simply be
+    sent again. Invalid entries are reported without stopping the import.
+    """
+    storage = get_async_storage_service().storage
+
+    # Creating, filling, rewinding and closing the spool file all happen off the event loop
+    spool = await asyncio.to_thread(tempfile.TemporaryFile, dir=storage.storage_path)
+    try:
+        async for chunk in request.stream():
+            await asyncio.to_thread(spool.write, chunk)
+        result = await asyncio.to_thread(_import_spooled, storage, spool, workers)
+    finally:
+        await asyncio.to_thread(spool.close)
+    return LibraryImportResult(**result)
+
+
+def _import_spooled(storage: StorageService, spool: IO[bytes], workers: int) -> dict:
+    """Import a spooled upload, as a tar or NDJSON depending on its header."""
+    spool.seek(0)
+    archive = is_tar(spool.read(512))
+    spool.seek(0)
+    if archive:
+        return import_tar(storage, spool, workers)
+    return import_ndjson(storage, spool, workers)
+
+
+@router.get("/cache/stats", response_model=RitualCacheStats)
+async def get_ritual_cache_stats():
+    """Parsed-ritual cache hit/miss counters, for sizing RITUAL_CACHE_SIZE."""
+    return RitualCacheStats(**get_async_storage_service().storage.ritual_cache.stats())
 
 
 @router.get("/{ritual_id}", response_model=Ritual)
-async def get_ritual(ritual_id: str):
-    """Get a specific ritual by ID."""
+async def get_ritual(ritual_id: str, request: Request):
+    """
+    Get a specific ritual by ID.
+
+    The ETag header identifies this version of the ritual: send it back in
+    If-None-Match to get an empty 304 if it hasn't changed, or in If-Match
+    on PUT/PATCH so the update fails (412) if someone else changed it.
+    """
     logger.debug(f"Getting ritual: {ritual_id}")
-    storage = get_storage_service()
-    ritual = storage.load_ritual(ritual_id)
+    storage = get_async_storage_service()
+    ritual = await storage.load_ritual(ritual_id, readonly=True)
     if not ritual:
         logger.warning(f"Ritual not found: {ritual_id}")
         raise HTTPException(status_code=404, detail="Ritual not found")
     logger.debug(f"Found ritual: {ritual.title}")
-    return ritual
+    return json_response(request, ritual.model_dump_json(by_alias=True))
 
 
 @router.post("", response_model=RitualResponse)
-async def create_ritual(ritual: Ritual):
+async def create_ritual(ritual: Ritual, response: Response):
     """Create a new ritual."""
     logger.info(f"Creating ritual: id={ritual.id}, title='{ritual.title}'")
-    storage = get_storage_service()
-    storage.save_ritual(ritual)
+    storage = get_async_storage_service()
+    await storage.save_ritual(ritual)
     logger.debug(f"Ritual saved: {ritual.id}")
+    response.headers["ETag"] = ritual_etag(ritual)
     return RitualResponse(ritual=ritual)
 
 
 @router.put("/{ritual_id}", response_model=RitualResponse)
-async def update_ritual(ritual_id: str, ritual: Ritual):
-    """Update an existing ritual."""
+async def update_ritual(ritual_id: str, ritual: Ritual, request: Request, response: Response):
+    """
+    Update an existing ritual.
+
+    With If-Match, the update only happens if the stored ritual still has
+    one of the given ETags (412 otherwise). The response's ETag is the new
+    version's.
+    """
     logger.info(f"Updating ritual: {ritual_id}")
-    storage = get_storage_service()
+    storage = get_async_storage_service()
 
     # Verify ritual exists
-    existing = storage.load_ritual(ritual_id)
-    if not existing:
+    if not await storage.ritual_exists(ritual_id):
         logger.warning(f"Ritual not found for update: {ritual_id}")
         raise HTTPException(status_code=404, detail="Ritual not found")
 
     # Ensure ID matches
     ritual.id = ritual_id
-    storage.save_ritual(ritual)
+    try:
+        await storage.save_ritual(ritual, if_match=if_match(request))
+    except PreconditionFailedError:
+        logger.info(f"Ritual {ritual_id} changed since the client read it; update refused")
+        raise precondition_failed()
     logger.debug(f"Ritual updated: {ritual_id}")
+    response.headers["ETag"] = ritual_etag(ritual)
+    return RitualResponse(ritual=ritual)
+
+
+@router.patch(
+    "/{ritual_id}",
+    response_model=RitualResponse,
+    openapi_extra={"requestBody": {"required": True, "content": {
+        JSON_PATCH_TYPE: {"schema": {"type": "array", "items": {"type": "object"}}},
+        MERGE_PATCH_TYPE: {"schema": {"type": "object"}},
+    }}},
+)
+async def update_ritual_partially(ritual_id: str, request: Request, response: Response):
+    """
+    Update part of a ritual.
+
+    The body is a JSON Patch (Content-Type application/json-patch+json) or
+    a JSON Merge Patch (application/merge-patch+json, or application/json),
+    applied to the stored ritual. Only changed sections are validated again,
+    and only the audio of segments whose text changed or that were removed
+    is deleted (their audioUrl is cleared), so the next audio job
+    regenerates just those. A failed "test" operation returns 409.
+
+    With If-Match, the patch only applies to that version of the ritual
+    (412 otherwise). Without it, a patch that races another update is
+    reapplied to the new version, so neither update is lost.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in (JSON_PATCH_TYPE, MERGE_PATCH_TYPE, "application/json"):
+        raise HTTPException(status_code=415, detail=f"Use {JSON_PATCH_TYPE} or {MERGE_PATCH_TYPE}")
+    try:
+        patch = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON")
+
+    logger.info(f"Patching ritual: {ritual_id}")
+    storage = get_async_storage_service()
+    expected = if_match(request)
+    for attempt in range(PATCH_ATTEMPTS):
+        ritual = await storage.load_ritual(ritual_id)
+        if not ritual:
+            logger.warning(f"Ritual not found for patch: {ritual_id}")
+            raise HTTPException(status_code=404, detail="Ritual not found")
+        etag = ritual_etag(ritual)
+        if expected is not None and not etag_matches(etag, expected):
+            raise precondition_failed()
+
+        try:
+            ritual, stale_segments = patch_ritual(ritual, patch, json_patch=content_type == JSON_PATCH_TYPE)
+        except PatchTestFailed as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        except PatchError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except PatchValidationError as e:
+            raise HTTPException(status_code=422, detail=jsonable_encoder(e.errors))
+
+        try:
+            # Saved only over the version the patch was applied to
+            await storage.save_ritual(ritual, if_match=[etag])
+            break
+        except PreconditionFailedError:
+            if expected is not None:
+                raise precondition_failed()
+            logger.info(f"Ritual {ritual_id} changed while patching; reapplying (attempt {attempt + 1})")
+    else:
+        raise HTTPException(status_code=409, detail="Ritual is being changed by other requests; retry")
+
+    if stale_segments:
+        await storage.remove_segment_audio(ritual_id, stale_segments)
+    logger.debug(f"Ritual patched: {ritual_id} ({len(stale_segments)} segments need new audio)")
+    response.headers["ETag"] = ritual_etag(ritual)
     return RitualResponse(ritual=ritual)
 
 
@@ -68,14 +341,13 @@ async def update_ritual(ritual_id: str, ritual: Ritual):
 async def delete_ritual(ritual_id: str):
     """Delete a ritual and its audio files."""
     logger.info(f"Deleting ritual: {ritual_id}")
-    storage = get_storage_service()
+    storage = get_async_storage_service()
 
     # Verify ritual exists
-    existing = storage.load_ritual(ritual_id)
-    if not existing:
+    if not await storage.ritual_exists(ritual_id):
         logger.warning(f"Ritual not found for deletion: {ritual_id}")
         raise HTTPException(status_code=404, detail="Ritual not found")
 
-    storage.delete_ritual(ritual_id)
+    await storage.delete_ritual(ritual_id)
     logger.info(f"Ritual deleted: {ritual_id}")
     return {"message": "Ritual deleted", "id": ritual_id}
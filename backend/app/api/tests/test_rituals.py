@@ -94,3 +94,237 @@ class TestRitualsAPI:
         rituals = response.json()
         assert len(rituals) >= 1
         assert any(r["id"] == sample_ritual_data["id"] for r in rituals)
+
+    def test_list_rituals_paged_and_filtered(self, client: TestClient):
+        """Should page through filtered rituals with a cursor."""
+        for i in range(5):
+            client.post("/api/rituals", json={
+                "id": f"page-{i}",
+                "title": f"Page {i}",
+                "duration": 60,
+                "tone": "coach" if i % 2 else "gentle",
+                "tags": ["paging-test"],
+                "createdAt": f"2030-01-0{i + 1}T00:00:00Z",
+                "sections": [{"type": "body", "durationSeconds": 60, "segments": []}],
+            })
+
+        seen = []
+        cursor = None
+        while True:
+            params = {"tags": "paging-test", "limit": 2, **({"cursor": cursor} if cursor else {})}
+            response = client.get("/api/rituals", params=params)
+            assert response.status_code == 200
+            seen += [r["id"] for r in response.json()]
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        assert seen == ["page-4", "page-3", "page-2", "page-1", "page-0"]
+
+        response = client.get("/api/rituals", params={"tags": "paging-test", "tone": "coach", "view": "summary"})
+        summaries = response.json()
+        assert [r["id"] for r in summaries] == ["page-3", "page-1"]
+        assert "sections" not in summaries[0]
+        assert summaries[0]["audioStatus"] == "pending"
+
+        # Both shapes are documented
+        schema = client.get("/openapi.json").json()["paths"]["/api/rituals"]["get"]["responses"]["200"]
+        shapes = schema["content"]["application/json"]["schema"]["anyOf"]
+        assert {shape["items"]["$ref"].rsplit("/", 1)[-1] for shape in shapes} == {"Ritual", "RitualSummary"}
+
+        response = client.get("/api/rituals", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+
+        # Valid JSON that isn't a [created_at, id] pair: null, an object, three strings, a number in the pair
+        for cursor in ("bnVsbA", "eyJhIjogImIiLCAiYyI6ICJkIn0", "WyJhIiwgImIiLCAiYyJd", "WyJhIiwgMV0"):
+            response = client.get("/api/rituals", params={"cursor": cursor})
+            assert response.status_code == 400, cursor
+            assert response.json()["detail"] == "Invalid cursor"
+
+    def test_list_rituals_by_ids(self, client: TestClient, sample_ritual_data: dict):
+        """Should fetch the requested rituals in order, skipping unknown IDs."""
+        client.post("/api/rituals", json=sample_ritual_data)
+        client.post("/api/rituals", json={**sample_ritual_data, "id": "ids-other"})
+
+        response = client.get("/api/rituals", params={"ids": f"ids-other,missing,{sample_ritual_data['id']}"})
+        assert [r["id"] for r in response.json()] == ["ids-other", sample_ritual_data["id"]]
+        assert "sections" in response.json()[0]
+
+        response = client.get("/api/rituals", params=[("ids", "ids-other"), ("view", "summary")])
+        assert [r["id"] for r in response.json()] == ["ids-other"]
+
+    def test_ritual_cache_stats(self, client: TestClient, sample_ritual_data: dict):
+        """Repeated GETs of an unchanged ritual are served from the parsed-ritual cache."""
+        client.post("/api/rituals", json=sample_ritual_data)
+        before = client.get("/api/rituals/cache/stats").json()
+
+        for _ in range(3):
+            client.get(f"/api/rituals/{sample_ritual_data['id']}")
+
+        after = client.get("/api/rituals/cache/stats").json()
+        assert after["hits"] - before["hits"] == 2
+        assert after["misses"] - before["misses"] == 1
+        assert 0 <= after["hitRate"] <= 1
+
+    def test_search_rituals(self, client: TestClient):
+        """Should rank matching rituals and highlight the match."""
+        for ritual_id, title, text in (
+            ("search-title", "Zephyrine dawn", "Breathe in."),
+            ("search-text", "Evening wind-down", "Let the zephyrine breeze settle you."),
+        ):
+            client.post("/api/rituals", json={
+                "id": ritual_id,
+                "title": title,
+                "duration": 60,
+                "sections": [{"type": "body", "durationSeconds": 60, "segments": [
+                    {"type": "text", "text": text, "durationSeconds": 10},
+                ]}],
+            })
+
+        response = client.get("/api/rituals/search", params={"q": "zephyr"})
+        assert response.status_code == 200
+        hits = response.json()
+        assert [h["id"] for h in hits] == ["search-title", "search-text"]
+        assert hits[0]["score"] > hits[1]["score"]
+        assert "<mark>zephyrine</mark>" in hits[1]["snippet"]
+        assert "sections" not in hits[0]
+
+        client.delete("/api/rituals/search-title")
+        response = client.get("/api/rituals/search", params={"q": "zephyrine breeze", "limit": 5})
+        assert [h["id"] for h in response.json()] == ["search-text"]
+
+        assert client.get("/api/rituals/search").status_code == 422
+
+    def test_export_and_import(self, client: TestClient, sample_ritual_data: dict):
+        """Should stream the library out and restore it, skipping what's already stored."""
+        client.post("/api/rituals", json=sample_ritual_data)
+
+        response = client.get("/api/rituals/export")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        exported = response.content
+        assert sample_ritual_data["id"].encode() in exported
+
+        client.delete(f"/api/rituals/{sample_ritual_data['id']}")
+        response = client.post("/api/rituals/import", content=exported, params={"workers": 2})
+        assert response.status_code == 200
+        result = response.json()
+        assert result["ritualsImported"] == 1
+        assert result["ritualsSkipped"] == len(exported.splitlines()) - 1
+        assert result["failed"] == 0
+        assert client.get(f"/api/rituals/{sample_ritual_data['id']}").status_code == 200
+
+        response = client.get("/api/rituals/export", params={"audio": "true"})
+        assert response.headers["content-type"] == "application/x-tar"
+        result = client.post("/api/rituals/import", content=response.content).json()
+        assert result["ritualsImported"] == 0
+        assert result["failed"] == 0
+
+    def test_patch_ritual(self, client: TestClient):
+        """Should apply JSON Patch and merge patches, deleting only the audio of changed segments."""
+        from app.services.storage import get_storage_service
+
+        client.post("/api/rituals", json={
+            "id": "patch-test",
+            "title": "Before",
+            "duration": 60,
+            "audioStatus": "ready",
+            "sections": [{"id": "patch-sec", "type": "body", "durationSeconds": 60, "segments": [
+                {"id": "patch-a", "type": "text", "text": "One", "durationSeconds": 10, "audioUrl": "/a"},
+                {"id": "patch-b", "type": "text", "text": "Two", "durationSeconds": 10, "audioUrl": "/b"},
+            ]}],
+        })
+        storage = get_storage_service()
+        storage.save_audio("patch-test", "patch-a", b"audio a")
+        storage.save_audio("patch-test", "patch-b", b"audio b")
+
+        response = client.patch(
+            "/api/rituals/patch-test", json={"title": "After", "tags": ["evening"]},
+            headers={"Content-Type": "application/merge-patch+json"},
+        )
+        assert response.status_code == 200
+        ritual = response.json()["ritual"]
+        assert (ritual["title"], ritual["tags"], ritual["audioStatus"]) == ("After", ["evening"], "ready")
+        assert storage.audio_exists("patch-test", "patch-a")
+
+        response = client.patch(
+            "/api/rituals/patch-test",
+            json=[{"op": "replace", "path": "/sections/0/segments/1/text", "value": "Deux"}],
+            headers={"Content-Type": "application/json-patch+json"},
+        )
+        assert response.status_code == 200
+        ritual = client.get("/api/rituals/patch-test").json()
+        assert ritual["sections"][0]["segments"][1]["text"] == "Deux"
+        assert ritual["sections"][0]["segments"][1]["audioUrl"] is None
+        assert ritual["audioStatus"] == "pending"
+        assert storage.audio_exists("patch-test", "patch-a")
+        assert not storage.audio_exists("patch-test", "patch-b")
+        assert "patch-b.mp3" not in storage.load_audio_manifest("patch-test")
+
+        patch_headers = {"Content-Type": "application/json-patch+json"}
+        response = client.patch(
+            "/api/rituals/patch-test", json=[{"op": "test", "path": "/title", "value": "Before"}], headers=patch_headers,
+        )
+        assert response.status_code == 409
+        response = client.patch(
+            "/api/rituals/patch-test", json=[{"op": "remove", "path": "/nope"}], headers=patch_headers,
+        )
+        assert response.status_code == 400
+        response = client.patch(
+            "/api/rituals/patch-test", json=[{"op": "replace", "path": "/duration", "value": "long"}], headers=patch_headers,
+        )
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"] == ["duration"]
+        response = client.patch("/api/rituals/patch-test", content="title=x", headers={"Content-Type": "text/plain"})
+        assert response.status_code == 415
+        response = client.patch("/api/rituals/missing", json={"title": "x"})
+        assert response.status_code == 404
+
+    def test_etags_and_conditional_requests(self, client: TestClient, sample_ritual_data: dict):
+        """Should answer If-None-Match with 304 and refuse stale If-Match updates with 412."""
+        from app.services.storage import get_storage_service
+
+        ritual_id = sample_ritual_data["id"]
+        client.post("/api/rituals", json=sample_ritual_data)
+        response = client.get(f"/api/rituals/{ritual_id}")
+        etag = response.headers["ETag"]
+        assert etag.startswith('"') and etag.endswith('"')
+
+        response = client.get(f"/api/rituals/{ritual_id}", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+        assert client.get(f"/api/rituals/{ritual_id}", headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+
+        listing = client.get("/api/rituals", params={"view": "summary"})
+        response = client.get("/api/rituals", params={"view": "summary"},
+                              headers={"If-None-Match": listing.headers["ETag"]})
+        assert response.status_code == 304
+
+        # A client holding the current ETag can update; one holding an older one can't
+        updated = {**sample_ritual_data, "title": "Edited"}
+        response = client.put(f"/api/rituals/{ritual_id}", json=updated, headers={"If-Match": etag})
+        assert response.status_code == 200
+        new_etag = response.headers["ETag"]
+        assert new_etag != etag
+        assert client.get(f"/api/rituals/{ritual_id}").headers["ETag"] == new_etag
+        assert client.get(f"/api/rituals/{ritual_id}", headers={"If-None-Match": etag}).status_code == 200
+
+        response = client.put(f"/api/rituals/{ritual_id}", json={**updated, "title": "Lost"}, headers={"If-Match": etag})
+        assert response.status_code == 412
+        response = client.patch(f"/api/rituals/{ritual_id}", json={"title": "Lost"}, headers={"If-Match": etag})
+        assert response.status_code == 412
+        assert client.get(f"/api/rituals/{ritual_id}").json()["title"] == "Edited"
+
+        response = client.patch(f"/api/rituals/{ritual_id}", json={"title": "Patched"}, headers={"If-Match": new_etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] == client.get(f"/api/rituals/{ritual_id}").headers["ETag"]
+
+        # Audio status changes its ETag when audio is added
+        status = client.get(f"/api/tts/audio-status/{ritual_id}")
+        response = client.get(f"/api/tts/audio-status/{ritual_id}", headers={"If-None-Match": status.headers["ETag"]})
+        assert response.status_code == 304
+        segment_id = sample_ritual_data["sections"][0]["segments"][0]["id"]
+        get_storage_service().save_audio(ritual_id, segment_id, b"audio")
+        response = client.get(f"/api/tts/audio-status/{ritual_id}", headers={"If-None-Match": status.headers["ETag"]})
+        assert response.status_code == 200
+        assert response.json()["generated"] == status.json()["generated"] + 1
@@ -1,8 +1,18 @@
 """Offline tests for TTS API using mocked providers."""
 
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Generator
+
+import httpx
 import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
+from tests.mocks import MockElevenLabsTTSProvider
+
 
 @pytest.mark.offline
 class TestTTSMocked:
@@ -58,6 +68,68 @@ class TestTTSMocked:
         assert "tts-test-ritual" in data["audioUrl"]
         assert "seg-001" in data["audioUrl"]
 
+        audio = mock_tts_client.get(data["audioUrl"], headers={"Range": "bytes=0-9"})
+        assert audio.status_code == 206
+        assert len(audio.content) == 10
+        assert mock_tts_client.get("/api/audio/tts-test-ritual/missing.mp3").status_code == 404
+
+
+@pytest.mark.offline
+class TestTTSStreamMocked:
+    """Tests for POST /api/tts/synthesize/stream using mock providers."""
+
+    def test_stream_elevenlabs_tees_to_disk(self, mock_tts_client: TestClient, test_storage_path: Path):
+        """Streamed MP3 bytes should match the file saved for replay."""
+        response = mock_tts_client.post("/api/tts/synthesize/stream", json={
+            "text": "Stream me.",
+            "voiceId": "sarah",
+            "provider": "elevenlabs",
+            "ritualId": "stream-ritual",
+            "segmentId": "stream-seg-1",
+        })
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "audio/mpeg"
+        assert response.headers["x-audio-url"] == "/api/audio/stream-ritual/stream-seg-1.mp3"
+
+        saved = test_storage_path / "audio" / "stream-ritual" / "stream-seg-1.mp3"
+        assert saved.read_bytes() == response.content
+
+    def test_stream_google_sends_streaming_wav_header(self, mock_tts_client: TestClient, test_storage_path: Path):
+        """Google streams start with an open-ended WAV header; the saved file gets real sizes."""
+        response = mock_tts_client.post("/api/tts/synthesize/stream", json={
+            "text": "Stream me.",
+            "voiceId": "aoede",
+            "provider": "google",
+            "ritualId": "stream-ritual",
+            "segmentId": "stream-seg-2",
+        })
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "audio/wav"
+        body = response.content
+        assert body[:4] == b"RIFF"
+        assert int.from_bytes(body[4:8], "little") == 0xFFFFFFFF
+
+        saved = (test_storage_path / "audio" / "stream-ritual" / "stream-seg-2.wav").read_bytes()
+        assert len(saved) == len(body)
+        assert int.from_bytes(saved[4:8], "little") == len(saved) - 8
+        assert int.from_bytes(saved[40:44], "little") == len(saved) - 44
+
+    def test_stream_without_ritual_uses_temp(self, mock_tts_client: TestClient):
+        response = mock_tts_client.post("/api/tts/synthesize/stream", json={"text": "Ad hoc."})
+        assert response.status_code == 200
+        assert response.headers["x-audio-url"].startswith("/api/audio/temp/")
+
+    def test_stream_provider_failure(self, latency_client, test_storage_path: Path):
+        """A provider error before the first chunk should map to 500 and leave no file."""
+        client, _ = latency_client
+        response = client.post("/api/tts/synthesize/stream", json={
+            "text": "Segment 3.",
+            "ritualId": "stream-fail-ritual",
+            "segmentId": "stream-fail-seg",
+        })
+        assert response.status_code == 500
+        assert not list((test_storage_path / "audio" / "stream-fail-ritual").iterdir())
+
 
 @pytest.mark.offline
 class TestFullFlowMocked:
@@ -89,6 +161,141 @@ class TestFullFlowMocked:
         assert audio_data["segmentsGenerated"] > 0
         assert audio_data["status"] == "ready"
 
+        # 3. Render the ritual into one master file
+        render_response = mock_all_client.post(f"/api/tts/render/{ritual_id}")
+        assert render_response.status_code == 200
+        render = render_response.json()
+        assert render["audioUrl"] == f"/api/audio/{ritual_id}/render/ritual.mp3"
+        assert render["masterRendered"] is True
+
+        ritual = mock_all_client.get(f"/api/rituals/{ritual_id}").json()
+        assert ritual["audioUrl"] == render["audioUrl"]
+        assert ritual["audioDurationSeconds"] == pytest.approx(render["audioDurationSeconds"])
+        assert all(section["audioUrl"] for section in ritual["sections"] if section["segments"])
+
+        # Nothing changed, so a second render reuses every file
+        again = mock_all_client.post(f"/api/tts/render/{ritual_id}").json()
+        assert again["sectionsRendered"] == []
+        assert again["masterRendered"] is False
+
+    def test_render_requires_audio(self, mock_all_client: TestClient):
+        """Rendering before segment audio exists is a conflict."""
+        gen_response = mock_all_client.post("/api/generate/ritual", json={"intention": "calm", "durationMinutes": 1})
+        ritual_id = gen_response.json()["ritual"]["id"]
+
+        response = mock_all_client.post(f"/api/tts/render/{ritual_id}")
+        assert response.status_code == 409
+
+        assert mock_all_client.post("/api/tts/render/nonexistent").status_code == 404
+
+    def test_verify_repair_regenerates_only_corrupt_segments(self, mock_all_client: TestClient, test_storage_path: Path):
+        """A truncated segment is found, removed and regenerated; intact ones are kept."""
+        ritual = mock_all_client.post("/api/generate/ritual", json={"intention": "calm"}).json()["ritual"]
+        ritual_id = ritual["id"]
+        mock_all_client.post("/api/tts/generate-ritual-audio", json={"ritualId": ritual_id, "provider": "elevenlabs"})
+
+        audio_dir = test_storage_path / "audio" / ritual_id
+        files = sorted(p for p in audio_dir.glob("*.mp3"))
+        damaged = files[0]
+        intact_mtime = files[1].stat().st_mtime_ns
+        damaged.write_bytes(damaged.read_bytes()[:100])
+
+        report = mock_all_client.post(f"/api/tts/verify-ritual-audio/{ritual_id}").json()
+        assert report["corrupt"] == {damaged.stem: report["corrupt"][damaged.stem]}
+        assert report["removed"] == [] and report["jobId"] is None
+
+        report = mock_all_client.post(f"/api/tts/verify-ritual-audio/{ritual_id}", json={
+            "repair": True, "provider": "elevenlabs",
+        }).json()
+        assert report["removed"] == [damaged.stem]
+        job = mock_all_client.get(f"/api/tts/audio-jobs/{report['jobId']}").json()
+        assert job["skipped"] == job["total"] - 1
+
+        audio = mock_all_client.post("/api/tts/generate-ritual-audio", json={"ritualId": ritual_id}).json()
+        assert audio["status"] == "ready"
+        assert len(damaged.read_bytes()) > 100  # Regenerated, not relinked from the cache
+        assert files[1].stat().st_mtime_ns == intact_mtime
+        report = mock_all_client.post(f"/api/tts/verify-ritual-audio/{ritual_id}").json()
+        assert report["ok"] == report["checked"] == len(files)
+
+        assert mock_all_client.post("/api/tts/verify-ritual-audio/nonexistent").status_code == 404
+
+    def test_regenerate_only_changed_segments(self, mock_all_client: TestClient, test_storage_path: Path):
+        """An edited segment is resynthesized alone; a provider switch redoes every segment."""
+        ritual = mock_all_client.post("/api/generate/ritual", json={"intention": "calm"}).json()["ritual"]
+        ritual_id = ritual["id"]
+        request = {"ritualId": ritual_id, "voiceId": "sarah", "provider": "elevenlabs"}
+        first = mock_all_client.post("/api/tts/generate-ritual-audio", json=request).json()
+
+        audio_dir = test_storage_path / "audio" / ritual_id
+        mtimes = {p.name: p.stat().st_mtime_ns for p in audio_dir.glob("*.mp3")}
+        edited = next(s for section in ritual["sections"] for s in section["segments"] if s["type"] == "text")
+        edited["text"] = "An entirely new line to read."
+        assert mock_all_client.put(f"/api/rituals/{ritual_id}", json=ritual).status_code == 200
+
+        again = mock_all_client.post("/api/tts/generate-ritual-audio", json=request).json()
+        assert again["segmentsGenerated"] == 1
+        assert again["segmentsSkipped"] == first["segmentsGenerated"] - 1
+        changed = {p.name for p in audio_dir.glob("*.mp3") if p.stat().st_mtime_ns != mtimes[p.name]}
+        assert changed == {f"{edited['id']}.mp3"}
+
+        switched = mock_all_client.post("/api/tts/generate-ritual-audio", json={**request, "provider": "google"}).json()
+        assert switched["segmentsGenerated"] == first["segmentsGenerated"]
+        assert list(audio_dir.glob("*.mp3")) == []  # Replaced by the new provider's WAVs
+        assert len(list(audio_dir.glob("*.wav"))) == first["segmentsGenerated"]
+
+    def test_patched_segment_gets_audio_url_back(self, mock_all_client: TestClient):
+        """A segment whose text was patched gets its audioUrl again once its audio is regenerated."""
+        ritual = mock_all_client.post("/api/generate/ritual", json={"intention": "calm"}).json()["ritual"]
+        ritual_id = ritual["id"]
+        request = {"ritualId": ritual_id, "voiceId": "sarah", "provider": "elevenlabs"}
+        mock_all_client.post("/api/tts/generate-ritual-audio", json=request)
+
+        section_index, segment_index, segment = next(
+            (i, j, s) for i, section in enumerate(ritual["sections"])
+            for j, s in enumerate(section["segments"]) if s["type"] == "text"
+        )
+        patch = [{"op": "replace", "path": f"/sections/{section_index}/segments/{segment_index}/text", "value": "A new line."}]
+        response = mock_all_client.patch(
+            f"/api/rituals/{ritual_id}", content=json.dumps(patch), headers={"Content-Type": "application/json-patch+json"}
+        )
+        assert response.status_code == 200
+        assert response.json()["ritual"]["sections"][section_index]["segments"][segment_index]["audioUrl"] is None
+
+        job = mock_all_client.post("/api/tts/audio-jobs", json=request).json()
+        assert wait_for_job(mock_all_client, job["id"])["generated"] == 1
+        patched = mock_all_client.get(f"/api/rituals/{ritual_id}").json()
+        url = patched["sections"][section_index]["segments"][segment_index]["audioUrl"]
+        assert url == f"/api/audio/{ritual_id}/{segment['id']}.mp3"
+        assert mock_all_client.get(url).status_code == 200
+
+    def test_evicted_audio_regenerates_on_request(self, mock_all_client: TestClient):
+        """Audio dropped by the quota comes back when its URL is requested."""
+        from app.services.audio_jobs import get_audio_job_manager
+        from app.services.storage import get_storage_service
+
+        ritual = mock_all_client.post("/api/generate/ritual", json={"intention": "calm"}).json()["ritual"]
+        ritual_id = ritual["id"]
+        mock_all_client.post("/api/tts/generate-ritual-audio", json={"ritualId": ritual_id, "provider": "google"})
+        segment = next(s for section in ritual["sections"] for s in section["segments"] if s["type"] == "text")
+        url = f"/api/audio/{ritual_id}/{segment['id']}.wav"
+
+        storage = get_storage_service()
+        assert storage.evict_ritual_audio(ritual_id)
+        evicted = mock_all_client.get(f"/api/rituals/{ritual_id}").json()
+        assert evicted["audioStatus"] == "pending" and evicted["audioEvictedAt"]
+
+        response = mock_all_client.get(url)
+        assert response.status_code == 200
+        assert response.content[:4] == b"RIFF"  # Regenerated with the provider it was made with
+        assert ritual_id in storage.audio_access.flush()
+
+        wait_for_job(mock_all_client, get_audio_job_manager().get_latest_job(ritual_id).id)
+        restored = mock_all_client.get(f"/api/rituals/{ritual_id}").json()
+        assert restored["audioStatus"] == "ready" and restored["audioEvictedAt"] is None
+        # Never-generated audio is not synthesized on request
+        assert mock_all_client.get(f"/api/audio/{ritual_id}/unknown.mp3").status_code == 404
+
     def test_generate_audio_ritual_not_found(self, mock_all_client: TestClient):
         """Should return 404 for nonexistent ritual."""
         response = mock_all_client.post("/api/tts/generate-ritual-audio", json={
@@ -97,3 +304,324 @@ class TestFullFlowMocked:
             "provider": "elevenlabs",
         })
         assert response.status_code == 404
+
+    def test_ritual_stream_ranges(self, mock_all_client: TestClient):
+        """The virtual ritual stream supports seeking with Range requests."""
+        ritual_id = mock_all_client.post("/api/generate/ritual", json={"intention": "calm"}).json()["ritual"]["id"]
+        assert mock_all_client.get(f"/api/tts/ritual-stream/{ritual_id}").status_code == 409
+
+        mock_all_client.post("/api/tts/generate-ritual-audio", json={"ritualId": ritual_id})
+        full = mock_all_client.get(f"/api/tts/ritual-stream/{ritual_id}")
+        assert full.status_code == 200
+        assert full.headers["content-type"] == "audio/mpeg"
+        assert full.headers["accept-ranges"] == "bytes"
+        assert int(full.headers["content-length"]) == len(full.content)
+        body = full.content
+        total = len(body)
+
+        url = f"/api/tts/ritual-stream/{ritual_id}"
+        part = mock_all_client.get(url, headers={"Range": "bytes=1000-2999"})
+        assert part.status_code == 206
+        assert part.headers["content-range"] == f"bytes 1000-2999/{total}"
+        assert part.content == body[1000:3000]
+
+        assert mock_all_client.get(url, headers={"Range": "bytes=-500"}).content == body[-500:]
+        assert mock_all_client.get(url, headers={"Range": f"bytes={total - 10}-"}).content == body[-10:]
+
+        unsatisfiable = mock_all_client.get(url, headers={"Range": f"bytes={total}-"})
+        assert unsatisfiable.status_code == 416
+        assert unsatisfiable.headers["content-range"] == f"bytes */{total}"
+        assert mock_all_client.get(url, headers={"Range": "bytes=-0"}).status_code == 416
+
+        # Invalid range-specs are ignored (RFC 9110), so the whole stream is sent
+        for invalid in ("bytes=5-3", "bytes=-", "bytes=a-9", "bytes=0--9", "bytes=+1-"):
+            response = mock_all_client.get(url, headers={"Range": invalid})
+            assert response.status_code == 200, invalid
+            assert len(response.content) == total
+
+        # A stale If-Range validator gets the whole (changed) stream instead of a partial one
+        stale = mock_all_client.get(url, headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+        assert stale.status_code == 200
+        fresh = mock_all_client.get(url, headers={"Range": "bytes=0-9", "If-Range": full.headers["etag"]})
+        assert fresh.status_code == 206
+
+        assert mock_all_client.get("/api/tts/ritual-stream/nonexistent").status_code == 404
+
+
+SEGMENT_COUNT = 8
+LATENCY = 0.2
+
+
+@pytest.fixture
+def latency_app(mock_tts_services) -> tuple[FastAPI, MockElevenLabsTTSProvider]:
+    """App whose ElevenLabs mock injects latency and fails one text."""
+    from app.main import app
+
+    provider = MockElevenLabsTTSProvider(latency=LATENCY, fail_texts={"Segment 3."})
+    mock_tts_services(elevenlabs_provider=provider, concurrency_limits={"elevenlabs": 4, "google": 1})
+    return app, provider
+
+
+@pytest.fixture
+def latency_client(latency_app) -> Generator[tuple[TestClient, MockElevenLabsTTSProvider], None, None]:
+    """TestClient over latency_app."""
+    app, provider = latency_app
+    with TestClient(app) as c:
+        yield c, provider
+
+
+def create_text_ritual(client: TestClient, ritual_id: str, count: int = SEGMENT_COUNT) -> None:
+    """Create a ritual with `count` text segments interleaved with silences."""
+    segments = []
+    for i in range(count):
+        segments.append({"id": f"{ritual_id}-seg-{i}", "type": "text", "text": f"Segment {i}.", "durationSeconds": 5})
+        segments.append({"id": f"{ritual_id}-sil-{i}", "type": "silence", "durationSeconds": 3})
+    response = client.post("/api/rituals", json={
+        "id": ritual_id,
+        "title": "Concurrency Test",
+        "duration": 120,
+        "sections": [{"id": f"{ritual_id}-sec", "type": "body", "durationSeconds": 120, "segments": segments}],
+    })
+    assert response.status_code == 200
+
+
+@pytest.mark.offline
+class TestConcurrentRitualAudio:
+    """generate-ritual-audio should synthesize segments concurrently."""
+
+    def test_wall_time_close_to_slowest_batch(self, latency_client):
+        """8 segments at 4-way concurrency should take ~2 batches, not 8 round-trips."""
+        client, provider = latency_client
+        create_text_ritual(client, "concurrent-ritual")
+
+        start = time.perf_counter()
+        response = client.post("/api/tts/generate-ritual-audio", json={
+            "ritualId": "concurrent-ritual",
+            "voiceId": "sarah",
+            "provider": "elevenlabs",
+        })
+        elapsed = time.perf_counter() - start
+        assert response.status_code == 200
+
+        sequential = SEGMENT_COUNT * LATENCY
+        batches = SEGMENT_COUNT / 4 * LATENCY
+        assert elapsed < sequential / 2
+        assert elapsed >= batches * 0.9
+        assert provider.max_in_flight == 4
+
+    def test_counts_and_durations_stay_accurate(self, latency_client):
+        """Generated/failed/skipped counts and per-segment durations must line up."""
+        client, _ = latency_client
+        create_text_ritual(client, "counts-ritual")
+
+        first = client.post("/api/tts/generate-ritual-audio", json={"ritualId": "counts-ritual"}).json()
+        assert first["segmentsTotal"] == SEGMENT_COUNT
+        assert first["segmentsGenerated"] == SEGMENT_COUNT - 1
+        assert first["segmentsFailed"] == 1
+        assert first["segmentsSkipped"] == 0
+        assert first["status"] == "partial"
+
+        ritual = client.get("/api/rituals/counts-ritual").json()
+        for segment in ritual["sections"][0]["segments"]:
+            if segment["type"] != "text":
+                continue
+            if segment["text"] == "Segment 3.":
+                assert segment["actualDurationSeconds"] is None
+            else:
+                # Mock audio lasts 60ms per character, rounded to whole MP3 frames (~26ms)
+                assert segment["actualDurationSeconds"] == pytest.approx(len(segment["text"]) * 0.06, abs=0.027)
+
+        second = client.post("/api/tts/generate-ritual-audio", json={"ritualId": "counts-ritual"}).json()
+        assert second["segmentsSkipped"] == SEGMENT_COUNT - 1
+        assert second["segmentsGenerated"] == 0
+        assert second["segmentsFailed"] == 1
+
+
+def wait_for_job(client: TestClient, job_id: str, timeout: float = 5.0) -> dict:
+    """Poll a job until it leaves the queued/running states."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/tts/audio-jobs/{job_id}").json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not finish within {timeout}s")
+
+
+@pytest.mark.offline
+class TestAudioJobs:
+    """Background audio jobs via /api/tts/audio-jobs."""
+
+    def test_create_job_returns_immediately(self, latency_client):
+        """POST should return a job ID before any segment finishes."""
+        client, _ = latency_client
+        create_text_ritual(client, "job-ritual")
+
+        start = time.perf_counter()
+        response = client.post("/api/tts/audio-jobs", json={"ritualId": "job-ritual"})
+        elapsed = time.perf_counter() - start
+
+        assert response.status_code == 202
+        assert elapsed < LATENCY
+        job = response.json()
+        assert job["id"]
+        assert job["ritualId"] == "job-ritual"
+        assert job["total"] == SEGMENT_COUNT
+        assert job["generated"] == 0
+
+        # Progress is visible while the job runs
+        status = client.get("/api/tts/audio-status/job-ritual").json()
+        assert status["jobId"] == job["id"]
+        assert status["audioStatus"] == "generating"
+
+        done = wait_for_job(client, job["id"])
+        assert done["status"] == "completed"
+        assert done["result"] == "partial"
+        assert done["generated"] == SEGMENT_COUNT - 1
+        assert done["failed"] == 1
+        failed = [s for s in done["segments"] if s["status"] == "failed"]
+        assert failed[0]["segmentId"] == "job-ritual-seg-3"
+        assert failed[0]["error"]
+
+        status = client.get("/api/tts/audio-status/job-ritual").json()
+        assert status["generated"] == SEGMENT_COUNT - 1
+        assert status["jobStatus"] == "completed"
+        assert status["audioStatus"] == "ready"
+
+    def test_duplicate_start_joins_active_job(self, latency_client):
+        """Starting twice for the same ritual should return the running job."""
+        client, _ = latency_client
+        create_text_ritual(client, "join-ritual")
+
+        first = client.post("/api/tts/audio-jobs", json={"ritualId": "join-ritual"}).json()
+        second = client.post("/api/tts/audio-jobs", json={"ritualId": "join-ritual"}).json()
+        assert first["id"] == second["id"]
+        wait_for_job(client, first["id"])
+
+    def test_cancel_job(self, latency_client):
+        """Cancelling should stop remaining segments and keep generated audio."""
+        client, provider = latency_client
+        create_text_ritual(client, "cancel-ritual", count=12)
+
+        job = client.post("/api/tts/audio-jobs", json={"ritualId": "cancel-ritual"}).json()
+        time.sleep(LATENCY * 1.5)  # Let the first batch land
+
+        response = client.delete(f"/api/tts/audio-jobs/{job['id']}")
+        assert response.status_code == 200
+        cancelled = response.json()
+        assert cancelled["status"] == "cancelled"
+        assert 0 < cancelled["generated"] < 12
+        assert any(s["status"] == "cancelled" for s in cancelled["segments"])
+
+        ritual = client.get("/api/rituals/cancel-ritual").json()
+        assert ritual["audioStatus"] == "ready"
+        calls_after_cancel = provider.calls
+        time.sleep(LATENCY)
+        assert provider.calls == calls_after_cancel
+
+    def test_legacy_endpoint_reports_job_id(self, latency_client):
+        """The synchronous endpoint should run through a job and report it."""
+        client, _ = latency_client
+        create_text_ritual(client, "legacy-ritual", count=2)
+
+        data = client.post("/api/tts/generate-ritual-audio", json={"ritualId": "legacy-ritual"}).json()
+        assert data["jobId"]
+        job = client.get(f"/api/tts/audio-jobs/{data['jobId']}").json()
+        assert job["status"] == "completed"
+        assert job["generated"] == data["segmentsGenerated"]
+
+    def test_job_not_found(self, latency_client):
+        client, _ = latency_client
+        assert client.get("/api/tts/audio-jobs/missing-job").status_code == 404
+        assert client.delete("/api/tts/audio-jobs/missing-job").status_code == 404
+
+
+def parse_sse(body: str) -> list[tuple[str, dict]]:
+    """Parse a Server-Sent Events body into (event, data) pairs."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.mark.offline
+class TestAudioJobEvents:
+    """Server-Sent Events progress stream for audio jobs."""
+
+    @pytest.mark.asyncio
+    async def test_many_subscribers_share_one_job(self, latency_app):
+        """Every subscriber sees each segment once; synthesis runs once."""
+        app, provider = latency_app
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            segments = [
+                {"id": "sse-seg-0", "type": "text", "text": "Segment 0.", "durationSeconds": 5},
+                {"id": "sse-seg-1", "type": "text", "text": "Segment 1.", "durationSeconds": 5},
+                {"id": "sse-seg-2", "type": "text", "text": "Segment 2.", "durationSeconds": 5},
+                {"id": "sse-seg-3", "type": "text", "text": "Segment 3.", "durationSeconds": 5},
+            ]
+            await client.post("/api/rituals", json={
+                "id": "sse-ritual",
+                "title": "SSE Test",
+                "duration": 60,
+                "sections": [{"id": "sse-sec", "type": "body", "durationSeconds": 60, "segments": segments}],
+            })
+            # Pre-existing audio for one segment so a skip is reported
+            await client.post("/api/tts/synthesize", json={
+                "text": "Segment 0.", "ritualId": "sse-ritual", "segmentId": "sse-seg-0",
+            })
+            calls_before = provider.calls
+
+            job = (await client.post("/api/tts/audio-jobs", json={"ritualId": "sse-ritual"})).json()
+            responses = await asyncio.gather(
+                client.get(f"/api/tts/audio-jobs/{job['id']}/events"),
+                client.get(f"/api/tts/audio-jobs/{job['id']}/events"),
+                client.get("/api/tts/audio-status/sse-ritual/events"),
+            )
+
+        assert provider.calls - calls_before == 3
+        streams = [parse_sse(r.text) for r in responses]
+        for response, events in zip(responses, streams):
+            assert response.headers["content-type"].startswith("text/event-stream")
+            names = [name for name, _ in events]
+            assert names[0] == "snapshot"
+            assert names[-1] == "summary"
+            segment_events = {data["segmentId"]: data["status"] for name, data in events if name == "segment"}
+            assert segment_events == {
+                "sse-seg-0": "skipped",
+                "sse-seg-1": "generated",
+                "sse-seg-2": "generated",
+                "sse-seg-3": "failed",
+            }
+            summary = events[-1][1]
+            assert summary["status"] == "completed"
+            assert (summary["generated"], summary["skipped"], summary["failed"]) == (2, 1, 1)
+
+    def test_finished_job_streams_snapshot_and_summary(self, latency_client):
+        """Subscribing after completion replays the final state and closes."""
+        client, _ = latency_client
+        create_text_ritual(client, "sse-done-ritual", count=2)
+        data = client.post("/api/tts/generate-ritual-audio", json={"ritualId": "sse-done-ritual"}).json()
+
+        events = parse_sse(client.get(f"/api/tts/audio-jobs/{data['jobId']}/events").text)
+        assert [name for name, _ in events] == ["snapshot", "segment", "segment", "summary"]
+        assert events[-1][1]["status"] == "completed"
+
+    def test_stream_not_found(self, latency_client):
+        client, _ = latency_client
+        assert client.get("/api/tts/audio-jobs/missing-job/events").status_code == 404
+        assert client.get("/api/tts/audio-status/no-such-ritual/events").status_code == 404
+
+
+@pytest.mark.offline
+class TestTTSCacheStats:
+    """GET /api/tts/cache/stats."""
+
+    def test_cache_stats(self, mock_tts_client: TestClient):
+        response = mock_tts_client.get("/api/tts/cache/stats")
+        assert response.status_code == 200
+        data = response.json()
+        assert "enabled" in data
+        assert "hitRate" in data
+        assert "bytesSaved" in data
@@ -1,13 +1,22 @@
 """TTS API routes."""
 
-from fastapi import APIRouter, HTTPException
-from typing import List, Literal
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field
 
+from ..config import get_settings
 from ..logging_config import get_logger
-from ..models.tts import TTSRequest, TTSResponse, Voice
+from ..models.audio_job import AudioJob
+from ..models.tts import TTSRequest, TTSResponse, TTSCacheStats, Voice
+from ..services.audio_jobs import get_audio_job_manager
+from ..services.ritual_renderer import MASTER_NAME, MissingAudioError, get_ritual_renderer
+from ..services.ritual_stream import get_ritual_stream_service
 from ..services.tts_service import get_tts_service
-from ..services.storage import get_storage_service
+from ..services.async_storage import get_async_storage_service
+from .conditional import json_response
 
 logger = get_logger(__name__)
 
@@ -30,7 +39,9 @@ class GenerateRitualAudioResponse(BaseModel):
     segments_generated: int = Field(alias="segmentsGenerated")
     segments_total: int = Field(alias="segmentsTotal")
     segments_skipped: int = Field(0, alias="segmentsSkipped")
+    segments_failed: int = Field(0, alias="segmentsFailed")
     status: Literal["ready", "partial", "error"]
+    job_id: Optional[str] = Field(None, alias="jobId")
 
     class Config:
         populate_by_name = True
@@ -43,6 +54,45 @@ class RitualAudioStatusResponse(BaseModel):
     generated: int
     missing: int
     status: Literal["none", "partial", "ready"]
+    audio_status: Optional[str] = Field(None, alias="audioStatus")
+    job_id: Optional[str] = Field(None, alias="jobId")
+    job_status: Optional[str] = Field(None, alias="jobStatus")
+
+    class Config:
+        populate_by_name = True
+
+
+class RenderRitualResponse(BaseModel):
+    """Response after rendering a ritual's audio into continuous files."""
+    ritual_id: str = Field(alias="ritualId")
+    audio_url: str = Field(alias="audioUrl")
+    audio_duration_seconds: float = Field(alias="audioDurationSeconds")
+    sections_rendered: List[str] = Field(alias="sectionsRendered")
+    master_rendered: bool = Field(alias="masterRendered")
+
+    class Config:
+        populate_by_name = True
+
+
+class VerifyRitualAudioRequest(BaseModel):
+    """Request to check a ritual's stored audio, optionally repairing it."""
+    repair: bool = False
+    # With repair, regenerate the removed segments using this provider (and voice)
+    provider: Optional[Literal["elevenlabs", "google"]] = None
+    voice_id: Optional[str] = Field(None, alias="voiceId")
+
+    class Config:
+        populate_by_name = True
+
+
+class VerifyRitualAudioResponse(BaseModel):
+    """Result of checking a ritual's audio files against their checksums."""
+    ritual_id: str = Field(alias="ritualId")
+    checked: int
+    ok: int
+    corrupt: dict[str, str]  # segment ID -> reason
+    removed: List[str]
+    job_id: Optional[str] = Field(None, alias="jobId")
 
     class Config:
         populate_by_name = True
@@ -80,6 +130,47 @@ async def synthesize_text(request: TTSRequest):
         raise HTTPException(status_code=500, detail=f"TTS synthesis failed: {str(e)}")
 
 
+@router.post("/synthesize/stream")
+async def synthesize_text_stream(request: TTSRequest):
+    """
+    Synthesize text to speech, streaming audio as the provider produces it.
+
+    The audio is also saved to storage for later replay; its URL is returned
+    in the X-Audio-Url header. Google audio starts with a streaming WAV header.
+    """
+    text_preview = request.text[:50] + "..." if len(request.text) > 50 else request.text
+    logger.info(f"TTS stream request: provider={request.provider}, voice={request.voice_id}, text='{text_preview}'")
+
+    tts_service = get_tts_service()
+
+    try:
+        audio_url, content_type, chunks = tts_service.stream(
+            text=request.text,
+            voice_id=request.voice_id,
+            provider=request.provider,
+            ritual_id=request.ritual_id,
+            segment_id=request.segment_id,
+            speed=request.speed,
+        )
+        # Wait for the first chunk so provider errors still map to an HTTP status
+        first_chunk = await anext(chunks, b"")
+    except ValueError as e:
+        logger.warning(f"TTS bad request: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception(f"TTS stream failed: {e}")
+        raise HTTPException(status_code=500, detail=f"TTS synthesis failed: {str(e)}")
+
+    async def body():
+        if first_chunk:
+            yield first_chunk
+        async for chunk in chunks:
+            yield chunk
+        logger.info(f"TTS stream complete: url={audio_url}")
+
+    return StreamingResponse(body(), media_type=content_type, headers={"X-Audio-Url": audio_url})
+
+
 @router.get("/voices", response_model=List[Voice])
 async def list_voices():
     """List all available TTS voices."""
@@ -90,6 +181,15 @@ async def list_voices():
     return voices
 
 
+@router.get("/cache/stats", response_model=TTSCacheStats)
+async def get_cache_stats():
+    """TTS result cache hit/miss counters and size."""
+    cache = get_tts_service().cache
+    if cache is None:
+        return TTSCacheStats(enabled=False)
+    return TTSCacheStats(enabled=True, **cache.stats())
+
+
 @router.get("/voices/{provider}", response_model=List[Voice])
 async def list_provider_voices(provider: str):
     """List voices for a specific provider."""
@@ -107,15 +207,16 @@ async def list_provider_voices(provider: str):
 
 
 @router.get("/audio-status/{ritual_id}", response_model=RitualAudioStatusResponse)
-async def get_ritual_audio_status(ritual_id: str):
+async def get_ritual_audio_status(ritual_id: str, request: Request):
     """
     Check audio generation status for a ritual.
     Returns count of total, generated, and missing audio files.
+    The ETag changes with the status; If-None-Match gets a 304 until then.
     """
     logger.debug(f"Checking audio status for ritual {ritual_id}")
-    storage = get_storage_service()
+    storage = get_async_storage_service()
 
-    status_info = storage.get_ritual_audio_status(ritual_id)
+    status_info = await storage.get_ritual_audio_status(ritual_id)
     if not status_info.get("exists"):
         raise HTTPException(status_code=404, detail="Ritual not found")
 
@@ -132,30 +233,58 @@ async def get_ritual_audio_status(ritual_id: str):
 
     logger.debug(f"Audio status for {ritual_id}: {generated}/{total} ({status})")
 
-    return RitualAudioStatusResponse(
+    job = get_audio_job_manager().get_latest_job(ritual_id)
+
+    body = RitualAudioStatusResponse(
         ritual_id=ritual_id,
         total=total,
         generated=generated,
         missing=missing,
         status=status,
+        # An active job is authoritative: the ritual's own status is saved by the job task, a moment later
+        audio_status="generating" if job and job.is_active else status_info.get("audio_status"),
+        job_id=job.id if job else None,
+        job_status=job.status if job else None,
     )
+    return json_response(request, body.model_dump_json(by_alias=True))
 
 
-@router.post("/generate-ritual-audio", response_model=GenerateRitualAudioResponse)
-async def generate_ritual_audio(request: GenerateRitualAudioRequest):
+def _sse_response(job_id: str) -> StreamingResponse:
+    """Stream a job's progress events as Server-Sent Events."""
+    manager = get_audio_job_manager()
+
+    async def event_stream():
+        async for event, payload in manager.stream_events(job_id):
+            yield f"event: {event}\ndata: {payload}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/audio-status/{ritual_id}/events")
+async def stream_ritual_audio_status(ritual_id: str):
     """
-    Generate TTS audio for text segments in a ritual.
+    Stream audio generation progress for a ritual (Server-Sent Events).
 
-    Only generates audio for segments that don't already have audio files.
-    Skips segments where audio already exists.
+    Follows the ritual's latest audio job: a "snapshot" event, then a
+    "segment" event per skipped/generated/failed segment, then a "summary".
     """
-    logger.info(f"Generating audio for ritual {request.ritual_id} (voice={request.voice_id}, provider={request.provider})")
+    job = get_audio_job_manager().get_latest_job(ritual_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="No audio job for ritual")
+    return _sse_response(job.id)
+
 
-    storage = get_storage_service()
+async def _start_audio_job(request: GenerateRitualAudioRequest) -> AudioJob:
+    """Validate a ritual audio request and start (or join) its background job."""
+    storage = get_async_storage_service()
     tts_service = get_tts_service()
 
     # Load the ritual
-    ritual = storage.load_ritual(request.ritual_id)
+    ritual = await storage.load_ritual(request.ritual_id)
     if not ritual:
         logger.warning(f"Ritual not found: {request.ritual_id}")
         raise HTTPException(status_code=404, detail="Ritual not found")
@@ -172,59 +301,241 @@ async def generate_ritual_audio(request: GenerateRitualAudioRequest):
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    # Count segments and generate audio (skip existing)
-    total_segments = 0
-    generated_count = 0
-    skipped_count = 0
-
-    for section in ritual.sections:
-        for segment in section.segments:
-            if segment.type == "text" and segment.text:
-                total_segments += 1
-
-                # Skip if audio already exists
-                if storage.audio_exists(ritual.id, segment.id):
-                    skipped_count += 1
-                    logger.debug(f"Skipping segment {segment.id}: audio already exists")
-                    continue
-
-                try:
-                    # Generate audio and save to the pre-defined path
-                    audio_url, duration = await tts_service.synthesize(
-                        text=segment.text,
-                        voice_id=request.voice_id,
-                        provider=request.provider,
-                        ritual_id=ritual.id,
-                        segment_id=segment.id,
-                    )
-                    # Update segment with actual duration
-                    segment.actual_duration_seconds = duration
-                    generated_count += 1
-                    logger.debug(f"Generated audio for segment {segment.id}: {duration:.1f}s")
-                except Exception as e:
-                    logger.warning(f"Failed to generate audio for segment {segment.id}: {e}")
-                    # Continue with other segments
-
-    # Update ritual status and save
-    ritual.voice_id = request.voice_id
-    total_existing = skipped_count + generated_count
-    if total_existing == total_segments:
-        ritual.audio_status = "ready"
-        status = "ready"
-    elif total_existing > 0:
-        ritual.audio_status = "ready"  # Partial is still usable
-        status = "partial"
-    else:
-        ritual.audio_status = "error"
-        status = "error"
+    return await get_audio_job_manager().start_job(ritual, request.voice_id, request.provider)
+
+
+@router.post("/generate-ritual-audio", response_model=GenerateRitualAudioResponse)
+async def generate_ritual_audio(request: GenerateRitualAudioRequest):
+    """
+    Generate TTS audio for text segments in a ritual.
+
+    Only generates audio for segments that don't already have audio files.
+    Skips segments where audio already exists. Missing segments are
+    synthesized concurrently, bounded by the provider's concurrency limit.
+
+    Runs as a background job and waits for it; the job keeps running if the
+    client disconnects. Use POST /audio-jobs to get a job ID without waiting.
+    """
+    logger.info(f"Generating audio for ritual {request.ritual_id} (voice={request.voice_id}, provider={request.provider})")
 
-    storage.save_ritual(ritual)
-    logger.info(f"Audio generation for ritual {ritual.id}: generated={generated_count}, skipped={skipped_count}, total={total_segments}")
+    manager = get_audio_job_manager()
+    job = await _start_audio_job(request)
+    job = await manager.wait(job.id)
 
     return GenerateRitualAudioResponse(
+        ritual_id=job.ritual_id,
+        segments_generated=job.generated,
+        segments_total=job.total,
+        segments_skipped=job.skipped,
+        segments_failed=job.failed,
+        status=job.result or "error",
+        job_id=job.id,
+    )
+
+
+@router.post("/audio-jobs", response_model=AudioJob, status_code=202)
+async def create_audio_job(request: GenerateRitualAudioRequest):
+    """
+    Start generating audio for a ritual in the background.
+
+    Returns immediately with the job; poll GET /audio-jobs/{job_id} for
+    per-segment progress. If a job is already running for the ritual,
+    that job is returned.
+    """
+    logger.info(f"Queueing audio job for ritual {request.ritual_id} (voice={request.voice_id}, provider={request.provider})")
+    return await _start_audio_job(request)
+
+
+@router.get("/audio-jobs/{job_id}", response_model=AudioJob)
+async def get_audio_job(job_id: str):
+    """Get progress of an audio generation job."""
+    job = await get_audio_job_manager().get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/audio-jobs/{job_id}/events")
+async def stream_audio_job(job_id: str):
+    """Stream progress events for an audio job (Server-Sent Events)."""
+    if not await get_audio_job_manager().get_job(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _sse_response(job_id)
+
+
+@router.delete("/audio-jobs/{job_id}", response_model=AudioJob)
+async def cancel_audio_job(job_id: str):
+    """Cancel an audio generation job. Audio already generated is kept."""
+    logger.info(f"Cancel requested for audio job {job_id}")
+    job = await get_audio_job_manager().cancel_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/verify-ritual-audio/{ritual_id}", response_model=VerifyRitualAudioResponse)
+async def verify_ritual_audio(ritual_id: str, request: Optional[VerifyRitualAudioRequest] = None):
+    """
+    Check a ritual's audio files against the sizes and checksums recorded
+    when they were written.
+
+    With repair, corrupt or truncated files are deleted and, if a provider
+    is given, an audio job is started; it regenerates only those segments,
+    since all others still have audio.
+    """
+    request = request or VerifyRitualAudioRequest()
+    storage = get_async_storage_service()
+    if not await storage.ritual_exists(ritual_id):
+        raise HTTPException(status_code=404, detail="Ritual not found")
+
+    result = await storage.verify_ritual_audio(ritual_id, request.repair)
+    logger.info(f"Verified audio for ritual {ritual_id}: {result['ok']}/{result['checked']} ok")
+
+    job_id = None
+    if result["removed"]:
+        ritual = await storage.load_ritual(ritual_id, readonly=True)
+        voice_id = request.voice_id or ritual.voice_id or "sarah"
+
+        # The TTS cache shares inodes with segment files, so drop those blobs too
+        tts_service = get_tts_service()
+        texts = {segment.id: segment.text for section in ritual.sections for segment in section.segments}
+        for segment_id in result["removed"]:
+            if texts.get(segment_id):
+                for provider in [request.provider] if request.provider else ["elevenlabs", "google"]:
+                    tts_service.discard_cached(texts[segment_id], voice_id, provider)
+
+        if request.provider:
+            job = await _start_audio_job(GenerateRitualAudioRequest(
+                ritual_id=ritual_id, voice_id=voice_id, provider=request.provider,
+            ))
+            job_id = job.id
+
+    return VerifyRitualAudioResponse(
+        ritual_id=ritual_id,
+        checked=result["checked"],
+        ok=result["ok"],
+        corrupt=result["corrupt"],
+        removed=result["removed"],
+        job_id=job_id,
+    )
+
+
+@router.post("/render/{ritual_id}", response_model=RenderRitualResponse)
+async def render_ritual_audio(ritual_id: str, force: bool = False):
+    """
+    Render a ritual's segment audio and silences into one master file.
+
+    Also renders one file per section and records the URLs and durations
+    on the ritual and its sections. Renders whose segments are unchanged
+    since the last call are reused unless force is set. Requires audio for
+    every text segment (see /generate-ritual-audio).
+    """
+    logger.info(f"Rendering audio for ritual {ritual_id} (force={force})")
+    try:
+        # CPU/disk-bound; keep it off the event loop
+        result = await asyncio.to_thread(get_ritual_renderer().render, ritual_id, force)
+    except MissingAudioError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if result is None:
+        raise HTTPException(status_code=404, detail="Ritual not found")
+
+    ritual, rendered = result
+    return RenderRitualResponse(
         ritual_id=ritual.id,
-        segments_generated=generated_count,
-        segments_total=total_segments,
-        segments_skipped=skipped_count,
-        status=status,
+        audio_url=ritual.audio_url,
+        audio_duration_seconds=ritual.audio_duration_seconds,
+        sections_rendered=[name for name in rendered if name != MASTER_NAME],
+        master_rendered=MASTER_NAME in rendered,
     )
+
+
+@router.get("/ritual-stream/{ritual_id}")
+async def stream_ritual(ritual_id: str, request: Request):
+    """
+    Stream a ritual's audio as one continuous file without rendering it.
+
+    Segment audio and silences are mapped onto byte offsets on the fly, so
+    the response supports HTTP Range requests (seeking) like a static file.
+    Requires audio for every text segment; audio dropped by quota eviction
+    is regenerated first.
+    """
+    storage = get_async_storage_service()
+    ritual = await storage.load_ritual(ritual_id, readonly=True)
+    if not ritual:
+        raise HTTPException(status_code=404, detail="Ritual not found")
+
+    try:
+        try:
+            # Stats every segment file, and walks MP3 frames when (re)building the index
+            index = await asyncio.to_thread(get_ritual_stream_service().get_index, ritual)
+        except MissingAudioError:
+            if ritual.audio_evicted_at is None or not await _restore_evicted(ritual_id):
+                raise
+            index = await asyncio.to_thread(get_ritual_stream_service().get_index, ritual)
+    except MissingAudioError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await storage.touch_audio_access(ritual_id)
+
+    etag = f'"{index.fingerprint}"'
+    headers = {"Accept-Ranges": "bytes", "ETag": etag}
+
+    byte_range = _parse_range(request.headers.get("range"), index.total_size)
+    if_range = request.headers.get("if-range")
+    if byte_range is None or (if_range is not None and if_range != etag):
+        headers["Content-Length"] = str(index.total_size)
+        return StreamingResponse(index.read(0, index.total_size), media_type=index.content_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Length"] = str(end - start)
+    headers["Content-Range"] = f"bytes {start}-{end - 1}/{index.total_size}"
+    return StreamingResponse(index.read(start, end), status_code=206, media_type=index.content_type, headers=headers)
+
+
+async def _restore_evicted(ritual_id: str) -> bool:
+    """Regenerate a ritual's evicted audio, bounded by the restore timeout."""
+    try:
+        return await asyncio.wait_for(
+            get_audio_job_manager().restore_evicted(ritual_id),
+            get_settings().audio_restore_timeout_seconds,
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="Audio is being regenerated", headers={"Retry-After": "5"})
+
+
+def _parse_range(header: Optional[str], total_size: int) -> Optional[tuple[int, int]]:
+    """
+    Parse a single-range Range header into [start, end).
+
+    Returns None when the whole body should be sent: no header, one we
+    don't handle such as multiple ranges, or an invalid range-spec (e.g.
+    `bytes=5-3`), which RFC 9110 says to ignore. Raises 416 only for a
+    valid range that selects nothing (starting at or past the end, or an
+    empty suffix).
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    if not (first or last) or (first and not first.isdecimal()) or (last and not last.isdecimal()):
+        return None  # Malformed
+    if first:
+        start = int(first)
+        if last and int(last) < start:
+            return None  # last-pos before first-pos: invalid, not unsatisfiable
+        end = int(last) + 1 if last else total_size
+    else:
+        start = max(0, total_size - int(last))  # Suffix range: the last N bytes
+        end = total_size if int(last) else start
+
+    end = min(end, total_size)
+    if start >= end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{total_size}"},
+        )
+    return start, end
@@ -2,6 +2,7 @@
 
 from pathlib import Path
 from functools import lru_cache
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -15,6 +16,31 @@ class Settings(BaseSettings):
 
     # Storage
     storage_path: Path = Path(__file__).parent.parent / "storage"
+    # Where rituals are kept: "files" (one JSON file each) or "sqlite" (a WAL-mode database)
+    storage_backend: Literal["files", "sqlite"] = "files"
+    sqlite_path: Optional[Path] = None  # Defaults to {storage_path}/rituals.db
+    # On-disk layout of ritual files and audio: "flat" ({id}) or "sharded" (ab/cd/{id}, for large libraries)
+    storage_layout: Literal["flat", "sharded"] = "flat"
+    ritual_cache_size: int = 256  # Parsed rituals kept in memory (0 disables)
+    storage_io_workers: int = 8  # Threads running storage I/O for async request handlers
+
+    # TTS concurrency (max in-flight synthesis calls per provider)
+    elevenlabs_max_concurrency: int = 4
+    google_max_concurrency: int = 2
+
+    # TTS cache (content-addressed blobs shared across rituals)
+    tts_cache_enabled: bool = True
+    tts_cache_max_bytes: int = 1024 * 1024 * 1024  # 1 GiB
+
+    # Background maintenance (temp audio GC, orphaned audio, deferred deletes)
+    maintenance_enabled: bool = True
+    maintenance_interval_seconds: int = 600
+    temp_audio_ttl_seconds: int = 24 * 3600  # Ad-hoc synthesis audio is deleted after this long
+    orphan_audio_grace_seconds: int = 3600  # Audio without a ritual is kept this long (it may be about to be saved)
+    audio_job_ttl_seconds: int = 24 * 3600  # Finished audio jobs are forgotten (in memory and on disk) after this long
+    # Ritual audio budget; least recently played/updated rituals lose their audio beyond it (None = unlimited)
+    audio_quota_bytes: Optional[int] = None
+    audio_restore_timeout_seconds: float = 60  # How long a request for evicted audio waits for regeneration
 
     # Server
     cors_origins: list[str] = ["http://localhost:5173", "http://localhost:3000"]
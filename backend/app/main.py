@@ -1,14 +1,17 @@
 """FastAPI application entry point."""
 
 import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
 
 from .config import get_settings
 from .logging_config import setup_logging, get_logger, RequestLogger
-from .api import rituals_router, tts_router, generation_router
+from .api import rituals_router, tts_router, generation_router, maintenance_router, AudioFiles
+from .services.async_storage import shutdown_storage_executor
+from .services.maintenance import get_maintenance_scheduler
+from .services.storage import get_storage_service
 
 # Initialize logging first
 setup_logging(level="DEBUG", enable_file_logging=True)
@@ -17,10 +20,43 @@ request_logger = RequestLogger(get_logger("requests"))
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Log startup information, start background maintenance, and clean up on shutdown."""
+    logger.info("=" * 60)
+    logger.info("Koru Backend Starting")
+    logger.info("=" * 60)
+    logger.info(f"Storage path: {settings.storage_path}")
+    logger.info(f"CORS origins: {settings.cors_origins}")
+    logger.info(f"OpenAI configured: {'Yes' if settings.openai_api_key else 'No'}")
+    logger.info(f"ElevenLabs configured: {'Yes' if settings.elevenlabs_api_key else 'No'}")
+    logger.info(f"Google TTS configured: {'Yes' if settings.gemini_api_key else 'No'}")
+
+    # Open storage now (for the file backend, this reconciles the ritual index with disk)
+    storage = get_storage_service()
+    logger.info(
+        f"Storage backend: {settings.storage_backend} ({settings.storage_layout} layout), "
+        f"{storage.count_rituals()} rituals"
+    )
+    logger.info("=" * 60)
+
+    scheduler = get_maintenance_scheduler()
+    if settings.maintenance_enabled:
+        scheduler.start()
+
+    yield
+
+    await scheduler.stop()
+    shutdown_storage_executor()  # Finish pending storage I/O
+    logger.info("Koru Backend Shutting Down")
+
+
 app = FastAPI(
     title="Koru API",
     description="Backend API for Koru Meditation App",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -30,6 +66,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Audio-Url", "X-Next-Cursor", "Accept-Ranges", "Content-Range", "Content-Length", "ETag"],
 )
 
 
@@ -66,35 +103,16 @@ async def log_requests(request: Request, call_next):
         )
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Log startup information."""
-    logger.info("=" * 60)
-    logger.info("Koru Backend Starting")
-    logger.info("=" * 60)
-    logger.info(f"Storage path: {settings.storage_path}")
-    logger.info(f"CORS origins: {settings.cors_origins}")
-    logger.info(f"OpenAI configured: {'Yes' if settings.openai_api_key else 'No'}")
-    logger.info(f"ElevenLabs configured: {'Yes' if settings.elevenlabs_api_key else 'No'}")
-    logger.info(f"Google TTS configured: {'Yes' if settings.gemini_api_key else 'No'}")
-    logger.info("=" * 60)
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Log shutdown."""
-    logger.info("Koru Backend Shutting Down")
-
-
 # API routes
 app.include_router(rituals_router, prefix="/api/rituals", tags=["rituals"])
 app.include_router(tts_router, prefix="/api/tts", tags=["tts"])
 app.include_router(generation_router, prefix="/api/generate", tags=["generation"])
+app.include_router(maintenance_router, prefix="/api/maintenance", tags=["maintenance"])
 
-# Serve audio files
+# Serve audio files (resolved through storage, whatever the on-disk layout)
 audio_path = settings.storage_path / "audio"
 audio_path.mkdir(parents=True, exist_ok=True)
-app.mount("/api/audio", StaticFiles(directory=str(audio_path)), name="audio")
+app.mount("/api/audio", AudioFiles(directory=str(audio_path)), name="audio")
 
 
 @app.get("/health")
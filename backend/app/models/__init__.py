@@ -1,13 +1,25 @@
-from .ritual import Ritual, RitualSection, Segment, RitualCreate, RitualResponse
-from .tts import TTSRequest, TTSResponse, Voice
+from .ritual import Ritual, RitualSection, Segment, RitualSummary, RitualSearchHit, RitualCacheStats, RitualCreate, RitualResponse
+from .tts import TTSRequest, TTSResponse, TTSCacheStats, Voice
+from .audio_job import AudioJob, SegmentProgress
+from .maintenance import MaintenanceStats, MaintenanceTaskStats
+from .library import LibraryImportResult
 
 __all__ = [
     "Ritual",
     "RitualSection",
     "Segment",
+    "RitualSummary",
+    "RitualSearchHit",
+    "RitualCacheStats",
     "RitualCreate",
     "RitualResponse",
     "TTSRequest",
     "TTSResponse",
+    "TTSCacheStats",
     "Voice",
+    "AudioJob",
+    "SegmentProgress",
+    "MaintenanceStats",
+    "MaintenanceTaskStats",
+    "LibraryImportResult",
 ]
@@ -0,0 +1,52 @@
+"""Background audio-generation job models."""
+
+from datetime import datetime, timezone
+from typing import Literal, Optional
+from pydantic import BaseModel, Field
+import uuid
+
+
+def utc_now_iso() -> str:
+    """Current UTC time as an ISO-8601 string with a Z suffix."""
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class SegmentProgress(BaseModel):
+    """Progress of a single text segment within an audio job."""
+
+    segment_id: str = Field(alias="segmentId")
+    status: Literal["pending", "generating", "generated", "skipped", "failed", "cancelled"] = "pending"
+    duration_seconds: Optional[float] = Field(None, alias="durationSeconds")
+    error: Optional[str] = None
+
+    class Config:
+        populate_by_name = True
+
+
+class AudioJob(BaseModel):
+    """Background job generating TTS audio for a ritual's text segments."""
+
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    ritual_id: str = Field(alias="ritualId")
+    voice_id: str = Field(alias="voiceId")
+    provider: Literal["elevenlabs", "google"]
+    status: Literal["queued", "running", "completed", "cancelled", "failed"] = "queued"
+    result: Optional[Literal["ready", "partial", "error"]] = None
+    segments: list[SegmentProgress] = []
+    total: int = 0
+    generated: int = 0
+    skipped: int = 0
+    failed: int = 0
+    eta_seconds: Optional[float] = Field(None, alias="etaSeconds")
+    error: Optional[str] = None
+    created_at: str = Field(default_factory=utc_now_iso, alias="createdAt")
+    started_at: Optional[str] = Field(None, alias="startedAt")
+    finished_at: Optional[str] = Field(None, alias="finishedAt")
+
+    class Config:
+        populate_by_name = True
+
+    @property
+    def is_active(self) -> bool:
+        """Whether the job is still queued or running."""
+        return self.status in ("queued", "running")
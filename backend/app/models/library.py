@@ -0,0 +1,17 @@
+"""Models for bulk export and import of the ritual library."""
+
+from pydantic import BaseModel, Field
+
+
+class LibraryImportResult(BaseModel):
+    """Outcome of a library import."""
+
+    rituals_imported: int = Field(alias="ritualsImported")
+    rituals_skipped: int = Field(alias="ritualsSkipped")  # Already stored and at least as recent
+    audio_imported: int = Field(0, alias="audioImported")
+    audio_skipped: int = Field(0, alias="audioSkipped")  # Identical file already stored
+    failed: int
+    errors: list[str] = []  # The first few failures
+
+    class Config:
+        populate_by_name = True
@@ -0,0 +1,33 @@
+"""Models for storage maintenance."""
+
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class MaintenanceTaskStats(BaseModel):
+    """Counters for one maintenance task."""
+
+    runs: int
+    errors: int
+    files: int
+    bytes_reclaimed: int = Field(alias="bytesReclaimed")
+
+    class Config:
+        populate_by_name = True
+
+
+class MaintenanceStats(BaseModel):
+    """Maintenance scheduler counters."""
+
+    running: bool
+    interval_seconds: float = Field(alias="intervalSeconds")
+    runs: int
+    last_run_at: Optional[float] = Field(None, alias="lastRunAt")
+    last_duration_seconds: float = Field(alias="lastDurationSeconds")
+    bytes_reclaimed: int = Field(alias="bytesReclaimed")
+    rituals_evicted: int = Field(0, alias="ritualsEvicted")
+    tasks: dict[str, MaintenanceTaskStats]
+
+    class Config:
+        populate_by_name = True
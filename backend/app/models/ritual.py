@@ -51,9 +51,16 @@ class Ritual(BaseModel):
     is_template: bool = Field(False, alias="isTemplate")
     generated_from: Optional[str] = Field(None, alias="generatedFrom")
     voice_id: Optional[str] = Field(None, alias="voiceId")
+    audio_provider: Optional[Literal["elevenlabs", "google"]] = Field(None, alias="audioProvider")
     audio_status: Literal["pending", "generating", "ready", "error"] = Field(
         "pending", alias="audioStatus"
     )
+    # Set when segment audio was dropped to stay within the storage quota; it's regenerated on request
+    audio_evicted_at: Optional[str] = Field(None, alias="audioEvictedAt")
+    # Rendered master audio of the whole ritual (see RitualSection for per-section renders)
+    audio_url: Optional[str] = Field(None, alias="audioUrl")
+    audio_duration_seconds: Optional[float] = Field(None, alias="audioDurationSeconds")
+    audio_generated_at: Optional[str] = Field(None, alias="audioGeneratedAt")
     created_at: str = Field(
         default_factory=lambda: datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
         alias="createdAt",
@@ -67,6 +74,45 @@ class Ritual(BaseModel):
         populate_by_name = True
 
 
+class RitualSummary(BaseModel):
+    """Listing projection of a ritual, without its sections."""
+
+    id: str
+    title: str
+    duration: int
+    tone: Literal["gentle", "neutral", "coach"]
+    tags: list[str] = []
+    is_template: bool = Field(False, alias="isTemplate")
+    audio_status: Literal["pending", "generating", "ready", "error"] = Field("pending", alias="audioStatus")
+    created_at: str = Field(alias="createdAt")
+    updated_at: str = Field(alias="updatedAt")
+
+    class Config:
+        populate_by_name = True
+
+
+class RitualSearchHit(RitualSummary):
+    """Search result: a ritual summary ranked by relevance, with an excerpt of the match."""
+
+    score: float
+    snippet: str  # HTML-escaped text with matched words wrapped in <mark></mark>
+
+
+class RitualCacheStats(BaseModel):
+    """Parsed-ritual cache counters."""
+
+    hits: int
+    misses: int
+    hit_rate: float = Field(alias="hitRate")
+    invalidations: int
+    evictions: int
+    entries: int
+    max_entries: int = Field(alias="maxEntries")
+
+    class Config:
+        populate_by_name = True
+
+
 class RitualCreate(BaseModel):
     """Request model for creating a ritual via generation."""
 
@@ -3,7 +3,7 @@
 import pytest
 from pydantic import ValidationError
 
-from app.models.tts import Voice, TTSRequest, TTSResponse, TTSResult
+from app.models.tts import Voice, TTSRequest, TTSResponse
 
 
 @pytest.mark.offline
@@ -91,23 +91,3 @@ class TestTTSResponse:
         assert "audioUrl" in data
         assert "durationSeconds" in data
 
-
-@pytest.mark.offline
-class TestTTSResult:
-    """Tests for internal TTSResult model."""
-
-    def test_result(self):
-        """Basic result creation."""
-        result = TTSResult(
-            audio_bytes=b"test audio data",
-            duration_seconds=1.5,
-            content_type="audio/mpeg"
-        )
-        assert result.audio_bytes == b"test audio data"
-        assert result.duration_seconds == 1.5
-        assert result.content_type == "audio/mpeg"
-
-    def test_default_content_type(self):
-        """Default content type is audio/mpeg."""
-        result = TTSResult(audio_bytes=b"data", duration_seconds=1.0)
-        assert result.content_type == "audio/mpeg"
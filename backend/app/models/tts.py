@@ -38,9 +38,18 @@ class TTSResponse(BaseModel):
         populate_by_name = True
 
 
-class TTSResult(BaseModel):
-    """Internal TTS result from providers."""
+class TTSCacheStats(BaseModel):
+    """TTS result cache counters."""
+
+    enabled: bool
+    hits: int = 0
+    misses: int = 0
+    hit_rate: float = Field(0.0, alias="hitRate")
+    bytes_saved: int = Field(0, alias="bytesSaved")
+    entries: int = 0
+    bytes: int = 0
+    max_bytes: int = Field(0, alias="maxBytes")
+    evictions: int = 0
 
-    audio_bytes: bytes
-    duration_seconds: float
-    content_type: str = "audio/mpeg"
+    class Config:
+        populate_by_name = True
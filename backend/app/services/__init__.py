@@ -1,5 +1,6 @@
 from .storage import StorageService
 from .tts_service import TTSService
+from .tts_cache import TTSCache
 from .elevenlabs_tts import ElevenLabsTTSProvider
 from .google_tts import GoogleTTSProvider
 from .openai_provider import OpenAIProvider
@@ -7,6 +8,7 @@ from .openai_provider import OpenAIProvider
 __all__ = [
     "StorageService",
     "TTSService",
+    "TTSCache",
     "ElevenLabsTTSProvider",
     "GoogleTTSProvider",
     "OpenAIProvider",
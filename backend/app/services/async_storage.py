@@ -0,0 +1,150 @@
+"""Async access to storage for request handlers."""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterator, Optional, TypeVar
+
+from ..config import get_settings
+from ..models.ritual import Ritual
+from .library_transfer import export_ndjson, export_tar
+from .ritual_index import RitualIndexEntry
+from .ritual_search import SearchHit
+from .storage import StorageService, get_storage_service
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_storage_executor() -> ThreadPoolExecutor:
+    """Get or create the thread pool that runs storage I/O."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=get_settings().storage_io_workers,
+            thread_name_prefix="storage-io",
+        )
+    return _executor
+
+
+async def run_storage_io(fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run a blocking storage call on the storage I/O pool.
+
+    For background code (audio jobs, TTS synthesis) that holds a sync
+    StorageService but runs on the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_storage_executor(), functools.partial(fn, *args, **kwargs))
+
+
+def shutdown_storage_executor() -> None:
+    """Wait for pending storage I/O and stop the pool (it's recreated on next use)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+class AsyncStorageService:
+    """
+    Awaitable versions of the StorageService calls made by API routes.
+
+    Each call runs the sync method on a dedicated thread pool, so file and
+    database I/O (fsyncs, index and search updates, moving a deleted
+    ritual's audio to the trash) never blocks the event loop, and a slow
+    disk can't starve the default executor used for rendering. Scripts
+    use the sync StorageService; background tasks wrap it with
+    run_storage_io.
+    """
+
+    def __init__(self, storage_service: Optional[StorageService] = None):
+        self._storage = storage_service
+
+    @property
+    def storage(self) -> StorageService:
+        return self._storage or get_storage_service()
+
+    async def _run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        return await run_storage_io(fn, *args, **kwargs)
+
+    async def iterate(self, iterator: Iterator[T]) -> AsyncIterator[T]:
+        """Consume a blocking iterator (e.g. an export stream) on the storage I/O pool."""
+        done = object()
+        while (item := await self._run(next, iterator, done)) is not done:
+            yield item
+
+    def export_library(self, audio: bool = False) -> AsyncIterator[bytes]:
+        """The library as NDJSON, or as a tar with segment audio (see library_transfer), read on the storage I/O pool."""
+        return self.iterate(export_tar(self.storage) if audio else export_ndjson(self.storage))
+
+    async def save_ritual(self, ritual: Ritual, if_match: Optional[list[str]] = None) -> str:
+        return await self._run(self.storage.save_ritual, ritual, if_match)
+
+    async def load_ritual(self, ritual_id: str, readonly: bool = False) -> Optional[Ritual]:
+        return await self._run(self.storage.load_ritual, ritual_id, readonly)
+
+    async def load_rituals(self, ritual_ids: list[str], readonly: bool = False) -> list[Ritual]:
+        return await self._run(self.storage.load_rituals, ritual_ids, readonly)
+
+    async def ritual_exists(self, ritual_id: str) -> bool:
+        return await self._run(self.storage.ritual_exists, ritual_id)
+
+    async def delete_ritual(self, ritual_id: str) -> bool:
+        return await self._run(self.storage.delete_ritual, ritual_id)
+
+    async def page_ritual_summaries(
+        self, **kwargs
+    ) -> tuple[list[RitualIndexEntry], Optional[tuple[str, str]]]:
+        return await self._run(self.storage.page_ritual_summaries, **kwargs)
+
+    async def search_rituals(self, query: str, limit: int = 20, offset: int = 0) -> list[SearchHit]:
+        return await self._run(self.storage.search_rituals, query, limit, offset)
+
+    async def get_ritual_summaries(self, ritual_ids: list[str]) -> list[RitualIndexEntry]:
+        """Summaries of the given rituals in order, skipping unknown IDs."""
+
+        def get_all() -> list[RitualIndexEntry]:
+            entries = [self.storage.get_ritual_summary(ritual_id) for ritual_id in dict.fromkeys(ritual_ids)]
+            return [entry for entry in entries if entry is not None]
+
+        return await self._run(get_all)
+
+    async def save_audio(
+        self,
+        ritual_id: str,
+        segment_id: str,
+        audio_bytes: bytes,
+        extension: str = "mp3",
+        synthesis_key: Optional[str] = None,
+    ) -> str:
+        return await self._run(self.storage.save_audio, ritual_id, segment_id, audio_bytes, extension, synthesis_key)
+
+    async def audio_exists(self, ritual_id: str, segment_id: str) -> bool:
+        return await self._run(self.storage.audio_exists, ritual_id, segment_id)
+
+    async def get_ritual_audio_status(self, ritual_id: str) -> dict:
+        return await self._run(self.storage.get_ritual_audio_status, ritual_id)
+
+    async def remove_segment_audio(self, ritual_id: str, segment_ids: list[str]) -> list[str]:
+        return await self._run(self.storage.remove_segment_audio, ritual_id, segment_ids)
+
+    async def touch_audio_access(self, ritual_id: str) -> None:
+        """Record that a ritual's audio was just served (see AudioAccessLog)."""
+        await self._run(self.storage.audio_access.touch, ritual_id)
+
+    async def verify_ritual_audio(self, ritual_id: str, repair: bool = False) -> dict:
+        return await self._run(self.storage.verify_ritual_audio, ritual_id, repair)
+
+
+# Singleton instance
+_async_storage_service: Optional[AsyncStorageService] = None
+
+
+def get_async_storage_service() -> AsyncStorageService:
+    """Get or create async storage service instance."""
+    global _async_storage_service
+    if _async_storage_service is None:
+        _async_storage_service = AsyncStorageService()
+    return _async_storage_service
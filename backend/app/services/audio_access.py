@@ -0,0 +1,78 @@
+"""Record of when each ritual's audio was last served."""
+
+import fcntl
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Optional
+
+from ..logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class AudioAccessLog:
+    """
+    Last time each ritual's audio was served, for quota eviction.
+
+    touch() is called on every audio response (segment files, renders and
+    the ritual stream) and every audio write, and only updates memory.
+    flush() merges the pending times into a JSON file shared by all worker
+    processes (keeping the latest time per ritual), so eviction decisions
+    see plays served by any process and survive restarts.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock_file = path.with_name(f".{path.name}.lock")
+        self._pending: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def touch(self, ritual_id: str, at: Optional[float] = None) -> None:
+        """Record that a ritual's audio was served."""
+        with self._lock:
+            self._pending[ritual_id] = at if at is not None else time.time()
+
+    def _read(self) -> dict[str, float]:
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            logger.warning(f"Ignoring unreadable audio access log {self.path}")
+            return {}
+
+    def flush(self, keep: Optional[Callable[[str], bool]] = None) -> dict[str, float]:
+        """
+        Persist pending access times; returns the merged times of all rituals.
+
+        With keep, rituals it returns false for are dropped from the file.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_file, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                times = self._read()
+                for ritual_id, at in pending.items():
+                    times[ritual_id] = max(at, times.get(ritual_id, 0.0))
+                dropped = [ritual_id for ritual_id in times if keep is not None and not keep(ritual_id)]
+                for ritual_id in dropped:
+                    del times[ritual_id]
+                if pending or dropped:
+                    self._write(times)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        return times
+
+    def _write(self, times: dict[str, float]) -> None:
+        temp_path = self.path.with_name(f".{self.path.name}.{uuid.uuid4().hex}.part")
+        with open(temp_path, "w") as f:
+            json.dump(times, f, separators=(",", ":"))
+        os.replace(temp_path, self.path)
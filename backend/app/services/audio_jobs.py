@@ -0,0 +1,431 @@
+"""Background audio-generation jobs for rituals."""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Optional
+
+from ..config import get_settings
+from ..logging_config import get_logger
+from ..models.audio_job import AudioJob, SegmentProgress, utc_now_iso
+from ..models.ritual import Ritual
+from .async_storage import run_storage_io
+from .storage import StorageService, get_storage_service
+from .tts_service import ProviderType, TTSService, get_tts_service
+
+logger = get_logger(__name__)
+
+# (event name, JSON payload) pair delivered to stream subscribers
+JobEvent = tuple[str, str]
+
+# Used to regenerate evicted audio of rituals that don't record their voice or provider
+DEFAULT_VOICE_ID = "sarah"
+DEFAULT_PROVIDER: ProviderType = "elevenlabs"
+
+# Finished jobs kept in memory beyond each ritual's latest one (older ones are read back from storage)
+MAX_FINISHED_JOBS = 256
+
+
+class AudioJobManager:
+    """
+    Runs ritual audio generation as background tasks and tracks progress.
+
+    Storage calls (manifests, job progress, ritual updates) run on the
+    storage I/O pool, so jobs never block the event loop on disk.
+
+    Finished jobs stay in memory for job_ttl_seconds, except that beyond
+    the newest MAX_FINISHED_JOBS only each ritual's latest job is kept;
+    get_job reads forgotten ones back from their progress file.
+    """
+
+    def __init__(
+        self,
+        tts_service: Optional[TTSService] = None,
+        storage_service: Optional[StorageService] = None,
+        job_ttl_seconds: Optional[float] = None,
+    ):
+        self._tts = tts_service
+        self._storage = storage_service
+        self.job_ttl_seconds = job_ttl_seconds if job_ttl_seconds is not None else get_settings().audio_job_ttl_seconds
+        self._jobs: dict[str, AudioJob] = {}
+        self._finished: OrderedDict[str, float] = OrderedDict()  # job_id -> monotonic finish time, oldest first
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._ritual_jobs: dict[str, str] = {}  # ritual_id -> latest job_id
+        self._subscribers: dict[str, list[asyncio.Queue]] = {}  # job_id -> event queues
+        self._save_locks: dict[str, asyncio.Lock] = {}  # job_id -> lock ordering progress writes
+
+    @property
+    def tts(self) -> TTSService:
+        return self._tts or get_tts_service()
+
+    @property
+    def storage(self) -> StorageService:
+        return self._storage or get_storage_service()
+
+    async def start_job(self, ritual: Ritual, voice_id: str, provider: ProviderType) -> AudioJob:
+        """
+        Start generating audio for a ritual in the background.
+
+        If a job is already active for the ritual, that job is returned instead.
+        Segments whose audio is current are marked as skipped up front. Audio
+        is current if it was synthesized from the segment's present text with
+        this voice and provider (per the synthesis key in the audio manifest);
+        files recorded without a key predate tagging and are kept.
+        """
+        active = self.get_latest_job(ritual.id)
+        if active and active.is_active:
+            logger.info(f"Audio job {active.id} already active for ritual {ritual.id}")
+            return active
+
+        segments = []
+        audio = await run_storage_io(self.storage.segment_audio, ritual.id)
+        manifest = await run_storage_io(self.storage.load_audio_manifest, ritual.id) if audio else {}
+        for section in ritual.sections:
+            for segment in section.segments:
+                if segment.type == "text" and segment.text:
+                    current = segment.id in audio and self._is_current(
+                        manifest.get(audio[segment.id].name, {}), segment.text, voice_id, provider
+                    )
+                    segments.append(SegmentProgress(
+                        segment_id=segment.id,
+                        status="skipped" if current else "pending",
+                    ))
+
+        active = self.get_latest_job(ritual.id)
+        if active and active.is_active:
+            return active  # Started by a concurrent request while the manifest was read
+
+        job = AudioJob(ritual_id=ritual.id, voice_id=voice_id, provider=provider, segments=segments)
+        self._update_counts(job)
+        self._jobs[job.id] = job
+        self._ritual_jobs[ritual.id] = job.id
+
+        # The task persists the job before it does anything else
+        task = asyncio.create_task(self._run(job, ritual))
+        self._tasks[job.id] = task
+        # Dropped however the task ends, including cancellation before it ever ran
+        task.add_done_callback(lambda _, job_id=job.id: self._tasks.pop(job_id, None))
+        logger.info(f"Started audio job {job.id} for ritual {ritual.id}: {job.total - job.skipped} to generate")
+        return job
+
+    def _is_current(self, entry: dict, text: str, voice_id: str, provider: ProviderType) -> bool:
+        """Whether a segment's manifest entry matches the synthesis it would get now."""
+        recorded = entry.get("synthesis_key")
+        return recorded is None or recorded == self.tts.synthesis_key(text, voice_id, provider)
+
+    async def restore_evicted(self, ritual_id: str, segment_id: Optional[str] = None) -> bool:
+        """
+        Regenerate a ritual's audio after quota eviction.
+
+        Starts (or joins) a job with the voice and provider the audio was
+        last made with, then waits for the given segment, or for the whole
+        job without one. Returns false if the ritual's audio wasn't evicted
+        or couldn't be regenerated.
+        """
+        ritual = await run_storage_io(self.storage.load_ritual, ritual_id)
+        if ritual is None or ritual.audio_evicted_at is None:
+            return False
+
+        logger.info(f"Regenerating evicted audio for ritual {ritual_id}")
+        job = await self.start_job(ritual, ritual.voice_id or DEFAULT_VOICE_ID, ritual.audio_provider or DEFAULT_PROVIDER)
+        if segment_id is None:
+            job = await self.wait(job.id)
+            return job is not None and job.result in ("ready", "partial")
+
+        async for event, payload in self.stream_events(job.id):
+            if event == "segment":
+                progress = json.loads(payload)
+                if progress["segmentId"] == segment_id:
+                    return progress["status"] in ("generated", "skipped")
+        return False
+
+    async def get_job(self, job_id: str) -> Optional[AudioJob]:
+        """Get a job by ID, falling back to the persisted copy."""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+
+        job = await run_storage_io(self.storage.load_audio_job, job_id)
+        if job is not None and job.is_active:
+            # Persisted as active but not running here: the process that owned it is gone
+            job.status = "failed"
+            job.error = "Job interrupted before completion"
+            await run_storage_io(self.storage.save_audio_job, job)
+        return job
+
+    def get_latest_job(self, ritual_id: str) -> Optional[AudioJob]:
+        """Get the most recent job started for a ritual in this process."""
+        job_id = self._ritual_jobs.get(ritual_id)
+        return self._jobs.get(job_id) if job_id else None
+
+    async def wait(self, job_id: str) -> Optional[AudioJob]:
+        """
+        Wait for a job to finish.
+
+        The job task is shielded, so cancelling the waiter (e.g. a client
+        disconnect) does not cancel the job itself.
+        """
+        task = self._tasks.get(job_id)
+        if task is not None:
+            await asyncio.shield(task)
+        return await self.get_job(job_id)
+
+    async def cancel_job(self, job_id: str) -> Optional[AudioJob]:
+        """Cancel a running job; returns the job in its final state."""
+        task = self._tasks.get(job_id)
+        if task is not None and not task.done():
+            logger.info(f"Cancelling audio job {job_id}")
+            task.cancel()
+            await asyncio.wait([task])
+
+        job = self._jobs.get(job_id)
+        if job is not None and job.is_active:
+            # Cancelled before the task got to run, so it never finalized itself
+            self._mark_cancelled(job)
+            await self._finalize(job)
+        return await self.get_job(job_id)
+
+    async def stream_events(self, job_id: str) -> AsyncIterator[JobEvent]:
+        """
+        Yield progress events for a job until it finishes.
+
+        Starts with a "snapshot" of the current job state, then one "segment"
+        event per segment that is skipped, generated or failed (segments that
+        settled before subscribing are replayed first), and ends with a
+        "summary". All subscribers share the events published by the single
+        job task, so adding subscribers adds no synthesis or storage work.
+        """
+        job = await self.get_job(job_id)
+        if job is None:
+            return
+
+        # Capture snapshot and replay synchronously so no event is missed or repeated
+        snapshot = self._encode(job)
+        replay = [
+            self._encode_segment(job, progress)
+            for progress in job.segments
+            if progress.status in ("skipped", "generated", "failed")
+        ]
+
+        if not job.is_active:
+            yield "snapshot", snapshot
+            for payload in replay:
+                yield "segment", payload
+            yield "summary", self._encode(job)
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, []).append(queue)
+        try:
+            yield "snapshot", snapshot
+            for payload in replay:
+                yield "segment", payload
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                yield event
+        finally:
+            subscribers = self._subscribers.get(job_id, [])
+            if queue in subscribers:
+                subscribers.remove(queue)
+
+    def _publish(self, job: AudioJob, event: str, payload: str) -> None:
+        """Fan an already-encoded event out to every subscriber of a job."""
+        for queue in self._subscribers.get(job.id, []):
+            queue.put_nowait((event, payload))
+
+    def _publish_segment(self, job: AudioJob, progress: SegmentProgress) -> None:
+        """Publish a segment's final state to the job's subscribers."""
+        if self._subscribers.get(job.id):
+            self._publish(job, "segment", self._encode_segment(job, progress))
+
+    @staticmethod
+    def _encode_segment(job: AudioJob, progress: SegmentProgress) -> str:
+        """Encode a segment's state together with the job's counters."""
+        return json.dumps({
+            "jobId": job.id,
+            "ritualId": job.ritual_id,
+            **progress.model_dump(by_alias=True),
+            "total": job.total,
+            "generated": job.generated,
+            "skipped": job.skipped,
+            "failed": job.failed,
+            "etaSeconds": job.eta_seconds,
+        })
+
+    @staticmethod
+    def _encode(job: AudioJob) -> str:
+        return json.dumps(job.model_dump(by_alias=True))
+
+    async def _save_job(self, job: AudioJob) -> None:
+        """
+        Persist a job's progress on the storage I/O pool.
+
+        Saves of a job run one at a time, in call order, each writing a
+        snapshot taken when its turn comes, so the file never goes back to
+        an older state and the thread never sees the job mid-update.
+        """
+        async with self._save_locks.setdefault(job.id, asyncio.Lock()):
+            await run_storage_io(self.storage.save_audio_job, job.model_copy(deep=True))
+
+    async def _run(self, job: AudioJob, ritual: Ritual) -> None:
+        """Synthesize all pending segments of a job and finalize the ritual."""
+        started = time.monotonic()
+        job.status = "running"
+        job.started_at = utc_now_iso()
+        await self._save_job(job)
+
+        ritual.audio_status = "generating"
+        await run_storage_io(self.storage.save_ritual, ritual)
+
+        segment_texts = {
+            segment.id: segment.text
+            for section in ritual.sections
+            for segment in section.segments
+        }
+
+        async def synthesize_segment(progress: SegmentProgress) -> None:
+            progress.status = "generating"
+            try:
+                # Generate audio and save to the pre-defined path
+                _, duration = await self.tts.synthesize(
+                    text=segment_texts[progress.segment_id],
+                    voice_id=job.voice_id,
+                    provider=job.provider,
+                    ritual_id=job.ritual_id,
+                    segment_id=progress.segment_id,
+                )
+                progress.status = "generated"
+                progress.duration_seconds = duration
+                logger.debug(f"Generated audio for segment {progress.segment_id}: {duration:.1f}s")
+            except Exception as e:
+                progress.status = "failed"
+                progress.error = str(e)
+                logger.warning(f"Failed to generate audio for segment {progress.segment_id}: {e}")
+
+            self._update_counts(job, started)
+            self._publish_segment(job, progress)
+            await self._save_job(job)
+
+        pending = [p for p in job.segments if p.status == "pending"]
+        try:
+            # Synthesize concurrently; TTSService bounds in-flight calls per provider
+            await asyncio.gather(*(synthesize_segment(p) for p in pending))
+            job.status = "completed"
+        except asyncio.CancelledError:
+            self._mark_cancelled(job)
+        except Exception as e:
+            logger.exception(f"Audio job {job.id} failed: {e}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            try:
+                await self._finalize(job)
+            finally:
+                self._tasks.pop(job.id, None)
+
+    def _mark_cancelled(self, job: AudioJob) -> None:
+        """Mark a job and its unfinished segments as cancelled."""
+        job.status = "cancelled"
+        for progress in job.segments:
+            if progress.status in ("pending", "generating"):
+                progress.status = "cancelled"
+
+    async def _finalize(self, job: AudioJob) -> None:
+        """Record final counts and apply segment durations and audio URLs to the stored ritual."""
+        self._update_counts(job)
+        job.eta_seconds = None
+        job.finished_at = utc_now_iso()
+
+        total_existing = job.skipped + job.generated
+        if total_existing == job.total:
+            job.result = "ready"
+        elif total_existing > 0:
+            job.result = "partial"
+        else:
+            job.result = "error"
+
+        try:
+            await run_storage_io(self._apply_to_ritual, job)
+            await self._save_job(job)
+        finally:
+            self._save_locks.pop(job.id, None)
+            self._finished[job.id] = time.monotonic()
+            self._prune()
+
+            self._publish(job, "summary", self._encode(job))
+            for queue in self._subscribers.pop(job.id, []):
+                queue.put_nowait(None)
+        logger.info(
+            f"Audio job {job.id} {job.status} for ritual {job.ritual_id}: generated={job.generated}, "
+            f"skipped={job.skipped}, failed={job.failed}, total={job.total}"
+        )
+
+    def _prune(self) -> None:
+        """Forget finished jobs past the TTL, and beyond the cap all but each ritual's latest."""
+        now = time.monotonic()
+        for job_id, finished in list(self._finished.items()):
+            job = self._jobs[job_id]
+            latest = self._ritual_jobs.get(job.ritual_id) == job_id
+            if now - finished >= self.job_ttl_seconds or (len(self._finished) > MAX_FINISHED_JOBS and not latest):
+                del self._finished[job_id]
+                del self._jobs[job_id]
+                if latest:
+                    del self._ritual_jobs[job.ritual_id]
+
+    def _apply_to_ritual(self, job: AudioJob) -> None:
+        """Record a finished job's audio in the stored ritual (runs on the storage I/O pool)."""
+        # Reload so edits made while the job ran are not overwritten
+        ritual = self.storage.load_ritual(job.ritual_id)
+        if ritual is not None:
+            durations = {
+                p.segment_id: p.duration_seconds
+                for p in job.segments
+                if p.status == "generated"
+            }
+            # Segments edited since their last audio have no URL (see ritual_patch); point them at the new file
+            audio = self.storage.segment_audio(job.ritual_id)
+            for section in ritual.sections:
+                for segment in section.segments:
+                    if segment.id in durations:
+                        segment.actual_duration_seconds = durations[segment.id]
+                    if segment.type == "text" and segment.id in audio:
+                        segment.audio_url = self.storage.audio_url(
+                            job.ritual_id, segment.id, audio[segment.id].suffix.lstrip(".")
+                        )
+
+            ritual.voice_id = job.voice_id
+            ritual.audio_provider = job.provider
+            ritual.audio_status = "error" if job.result == "error" else "ready"  # Partial is still usable
+            if job.result != "error":
+                ritual.audio_evicted_at = None
+            self.storage.save_ritual(ritual)
+
+    def _update_counts(self, job: AudioJob, started: Optional[float] = None) -> None:
+        """Recompute job counters and, when running, the ETA."""
+        job.total = len(job.segments)
+        job.generated = sum(1 for p in job.segments if p.status == "generated")
+        job.skipped = sum(1 for p in job.segments if p.status == "skipped")
+        job.failed = sum(1 for p in job.segments if p.status == "failed")
+
+        if started is not None:
+            done = job.generated + job.failed
+            remaining = job.total - job.skipped - done
+            if done and remaining:
+                job.eta_seconds = (time.monotonic() - started) / done * remaining
+            elif not remaining:
+                job.eta_seconds = 0.0
+
+
+# Singleton instance
+_audio_job_manager: Optional[AudioJobManager] = None
+
+
+def get_audio_job_manager() -> AudioJobManager:
+    """Get or create audio job manager instance."""
+    global _audio_job_manager
+    if _audio_job_manager is None:
+        _audio_job_manager = AudioJobManager()
+    return _audio_job_manager
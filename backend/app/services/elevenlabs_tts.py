@@ -1,11 +1,12 @@
 """ElevenLabs TTS provider."""
 
-from typing import Optional
+import threading
+from typing import AsyncIterator, Optional
 
-from elevenlabs.client import ElevenLabs
+from elevenlabs.client import AsyncElevenLabs
 
 from ..config import get_settings
-from ..models.tts import TTSResult, Voice
+from ..models.tts import Voice
 
 # Voice IDs mapping
 ELEVENLABS_VOICES = {
@@ -45,18 +46,26 @@ ELEVENLABS_VOICES = {
 class ElevenLabsTTSProvider:
     """ElevenLabs TTS provider implementation."""
 
+    content_type = "audio/mpeg"
+    extension = "mp3"
+    model = "eleven_multilingual_v2"
+    bitrate = 128_000  # Bits per second of the requested mp3_44100_128 output
+
     def __init__(self, api_key: Optional[str] = None):
         settings = get_settings()
         self.api_key = api_key if api_key is not None else settings.elevenlabs_api_key
-        self._client: Optional[ElevenLabs] = None
+        self._client: Optional[AsyncElevenLabs] = None
+        self._client_lock = threading.Lock()
 
     @property
-    def client(self) -> ElevenLabs:
-        """Lazy-initialize ElevenLabs client."""
+    def client(self) -> AsyncElevenLabs:
+        """Lazy-initialize the async ElevenLabs client (thread-safe)."""
         if self._client is None:
-            if not self.api_key:
-                raise ValueError("ElevenLabs API key not configured")
-            self._client = ElevenLabs(api_key=self.api_key)
+            with self._client_lock:
+                if self._client is None:
+                    if not self.api_key:
+                        raise ValueError("ElevenLabs API key not configured")
+                    self._client = AsyncElevenLabs(api_key=self.api_key)
         return self._client
 
     def get_voice_id(self, voice_name: str) -> str:
@@ -67,32 +76,25 @@ class ElevenLabsTTSProvider:
         # If it's already a voice ID, return as-is
         return voice_name
 
-    async def synthesize(self, text: str, voice_id: str = "sarah", speed: float = 1.0) -> TTSResult:
-        """Synthesize text to speech."""
+    async def stream(self, text: str, voice_id: str = "sarah", speed: float = 1.0) -> AsyncIterator[bytes]:
+        """Stream MP3 audio chunks as ElevenLabs produces them."""
         actual_voice_id = self.get_voice_id(voice_id)
 
-        # Generate audio
+        # Async client, so the event loop is never blocked
         audio_generator = self.client.text_to_speech.convert(
             text=text,
             voice_id=actual_voice_id,
-            model_id="eleven_multilingual_v2",
+            model_id=self.model,
             output_format="mp3_44100_128",
         )
-
-        # Collect audio bytes from generator
-        audio_bytes = b""
-        for chunk in audio_generator:
-            audio_bytes += chunk
-
-        # Calculate approximate duration (rough estimate for MP3)
-        # For more accurate duration, we'd need to decode the audio
-        duration_seconds = len(audio_bytes) / (44100 * 128 / 8)  # Rough estimate
-
-        return TTSResult(
-            audio_bytes=audio_bytes,
-            duration_seconds=duration_seconds,
-            content_type="audio/mpeg",
-        )
+        async for chunk in audio_generator:
+            if chunk:
+                yield chunk
+
+    def estimate_duration(self, num_bytes: int) -> float:
+        """Approximate duration of an MP3 stream of num_bytes from its constant bitrate."""
+        # Fallback only: TTSService reads the exact duration from the frame headers
+        return num_bytes * 8 / self.bitrate
 
     def get_voices(self) -> list[Voice]:
         """Get available voices."""
@@ -1,14 +1,14 @@
 """Google Gemini TTS provider."""
 
-import io
-import wave
-from typing import Optional
+import threading
+from typing import AsyncIterator, Optional
 
 from google import genai
 from google.genai import types
 
 from ..config import get_settings
-from ..models.tts import TTSResult, Voice
+from ..models.tts import Voice
+from .wav import WAV_HEADER_SIZE, wav_header
 
 # Voice IDs mapping
 GOOGLE_VOICES = {
@@ -30,18 +30,26 @@ GOOGLE_VOICES = {
 class GoogleTTSProvider:
     """Google Gemini TTS provider implementation."""
 
+    content_type = "audio/wav"
+    extension = "wav"
+    model = "gemini-2.5-pro-preview-tts"
+    sample_rate = 24000  # 16-bit mono PCM
+
     def __init__(self, api_key: Optional[str] = None):
         settings = get_settings()
         self.api_key = api_key if api_key is not None else settings.gemini_api_key
         self._client = None
+        self._client_lock = threading.Lock()
 
     @property
     def client(self):
-        """Lazy-initialize Google genai client."""
+        """Lazy-initialize Google genai client (thread-safe)."""
         if self._client is None:
-            if not self.api_key:
-                raise ValueError("Google Gemini API key not configured")
-            self._client = genai.Client(api_key=self.api_key)
+            with self._client_lock:
+                if self._client is None:
+                    if not self.api_key:
+                        raise ValueError("Google Gemini API key not configured")
+                    self._client = genai.Client(api_key=self.api_key)
         return self._client
 
     def get_voice_id(self, voice_name: str) -> str:
@@ -52,25 +60,15 @@ class GoogleTTSProvider:
         # If it's already a voice ID, return as-is
         return voice_name
 
-    def _pcm_to_wav(self, pcm_data: bytes, sample_rate: int = 24000) -> bytes:
-        """Convert raw PCM data to WAV format."""
-        buffer = io.BytesIO()
-        with wave.open(buffer, 'wb') as wav_file:
-            wav_file.setnchannels(1)  # Mono
-            wav_file.setsampwidth(2)  # 16-bit
-            wav_file.setframerate(sample_rate)
-            wav_file.writeframes(pcm_data)
-        return buffer.getvalue()
-
-    async def synthesize(self, text: str, voice_id: str = "aoede", speed: float = 1.0) -> TTSResult:
-        """Synthesize text to speech."""
+    def _build_request(self, text: str, voice_id: str) -> dict:
+        """Build the generate_content arguments for a TTS request."""
         actual_voice_id = self.get_voice_id(voice_id)
 
         # Build meditation-style prompt
         prompt = f'[meditative, slow, hushed, gentle, low pitch]\n\n"{text}"'
 
-        response = self.client.models.generate_content(
-            model="gemini-2.5-pro-preview-tts",
+        return dict(
+            model=self.model,
             contents=prompt,
             config=types.GenerateContentConfig(
                 temperature=1,
@@ -82,26 +80,29 @@ class GoogleTTSProvider:
                         )
                     )
                 )
-            )
+            ),
         )
 
-        # Extract audio data
-        audio_data = b""
-        for part in response.candidates[0].content.parts:
-            if part.inline_data:
-                audio_data += part.inline_data.data
-
-        # Convert PCM to WAV
-        wav_data = self._pcm_to_wav(audio_data)
-
-        # Calculate duration (16-bit mono at 24kHz)
-        duration_seconds = len(audio_data) / (24000 * 2)  # 2 bytes per sample
-
-        return TTSResult(
-            audio_bytes=wav_data,
-            duration_seconds=duration_seconds,
-            content_type="audio/wav",
-        )
+    async def stream(self, text: str, voice_id: str = "aoede", speed: float = 1.0) -> AsyncIterator[bytes]:
+        """
+        Stream WAV audio as Gemini produces PCM.
+
+        A streaming WAV header (unknown length) is yielded first so clients
+        can start playback before the total size is known.
+        """
+        responses = await self.client.aio.models.generate_content_stream(**self._build_request(text, voice_id))
+        yield wav_header(self.sample_rate)
+
+        async for response in responses:
+            if not response.candidates or not response.candidates[0].content:
+                continue
+            for part in response.candidates[0].content.parts or []:
+                if part.inline_data and part.inline_data.data:
+                    yield part.inline_data.data
+
+    def estimate_duration(self, num_bytes: int) -> float:
+        """Duration of a WAV stream of num_bytes (16-bit mono PCM)."""
+        return max(0, num_bytes - WAV_HEADER_SIZE) / (self.sample_rate * 2)  # 2 bytes per sample
 
     def get_voices(self) -> list[Voice]:
         """Get available voices."""
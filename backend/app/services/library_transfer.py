@@ -0,0 +1,287 @@
+"""Bulk export and import of the ritual library (NDJSON, or a tar with audio)."""
+
+import hashlib
+import io
+import json
+import tarfile
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import IO, Callable, Iterable, Iterator, Optional
+
+from ..logging_config import get_logger
+from ..models.ritual import Ritual
+from .storage import AUDIO_EXTENSIONS, AUDIO_MANIFEST_NAME, TEMP_AUDIO_ID, StorageService
+
+logger = get_logger(__name__)
+
+# Exported bytes are yielded in chunks of about this size
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+# Rituals validated and saved per import task
+IMPORT_BATCH_SIZE = 100
+
+DEFAULT_IMPORT_WORKERS = 4
+
+# Errors listed in an import result (the rest are only counted)
+MAX_REPORTED_ERRORS = 20
+
+Task = Callable[[], dict]
+
+
+def export_ndjson(storage: StorageService) -> Iterator[bytes]:
+    """
+    Every ritual as one line of JSON, newest first.
+
+    Rituals are read one batch at a time, so memory use doesn't depend on
+    the size of the library.
+    """
+    buffer = bytearray()
+    for ritual in storage.iter_rituals():
+        buffer += ritual.model_dump_json(by_alias=True).encode("utf-8") + b"\n"
+        if len(buffer) >= EXPORT_CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+class _TarBuffer:
+    """Write-only file object collecting tar output until it's yielded."""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def write(self, chunk: bytes) -> int:
+        self.data += chunk
+        return len(chunk)
+
+    def take(self) -> Iterator[bytes]:
+        """Yield what was written since the last call, if anything."""
+        if self.data:
+            yield bytes(self.data)
+            self.data.clear()
+
+
+def export_tar(storage: StorageService) -> Iterator[bytes]:
+    """
+    Every ritual with its segment audio, as an uncompressed tar stream.
+
+    Each ritual is a `rituals/{id}.json` member, followed by its audio
+    manifest and segment files under `audio/{id}/` (rendered audio can be
+    re-rendered and is left out). At most one file is buffered at a time.
+    """
+    buffer = _TarBuffer()
+    with tarfile.open(fileobj=buffer, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+        for ritual in storage.iter_rituals():
+            data = ritual.model_dump_json(by_alias=True).encode("utf-8")
+            info = tarfile.TarInfo(f"rituals/{ritual.id}.json")
+            info.size = len(data)
+            info.mtime = int(time.time())
+            tar.addfile(info, io.BytesIO(data))
+            yield from buffer.take()
+
+            segment_files = storage.segment_audio(ritual.id)
+            if not segment_files:
+                continue
+            directory = storage.ritual_audio_dir(ritual.id)
+            for path in [directory / AUDIO_MANIFEST_NAME, *segment_files.values()]:
+                try:
+                    with open(path, "rb") as f:
+                        info = tar.gettarinfo(arcname=f"audio/{ritual.id}/{path.name}", fileobj=f)
+                        info.uid = info.gid = 0
+                        info.uname = info.gname = ""
+                        tar.addfile(info, f)
+                except FileNotFoundError:
+                    continue  # Evicted or regenerated while exporting
+                yield from buffer.take()
+    yield from buffer.take()
+
+
+def is_tar(header: bytes) -> bool:
+    """Whether data starting with these bytes (at least 512) is a tar archive rather than NDJSON."""
+    return header[257:262] == b"ustar"
+
+
+def _safe_name(name: str) -> bool:
+    """Whether an ID from an import can be used as a file or directory name."""
+    return bool(name) and not name.startswith(".") and "/" not in name and "\\" not in name
+
+
+class _ImportResult:
+    """Counters of one import, merged from the results of its tasks."""
+
+    def __init__(self):
+        self.counts = {
+            "rituals_imported": 0,
+            "rituals_skipped": 0,
+            "audio_imported": 0,
+            "audio_skipped": 0,
+            "failed": 0,
+        }
+        self.errors: list[str] = []
+
+    def merge(self, result: dict) -> None:
+        for name in self.counts:
+            self.counts[name] += result.get(name, 0)
+        self.errors.extend(result.get("errors", ())[:MAX_REPORTED_ERRORS - len(self.errors)])
+
+    def to_dict(self) -> dict:
+        return {**self.counts, "errors": self.errors}
+
+
+def _run_tasks(
+    tasks: Iterable[Task],
+    workers: int,
+    progress: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """
+    Run import tasks on a thread pool, at most 2 * workers at a time.
+
+    Tasks are pulled from the iterable only as earlier ones finish, so the
+    input is read at the pace it's imported and memory use stays bounded.
+    """
+    result = _ImportResult()
+
+    def collect(done: set[Future]) -> None:
+        for future in done:
+            result.merge(future.result())
+        if progress:
+            progress(result.to_dict())
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="import") as pool:
+        pending: set[Future] = set()
+        for task in tasks:
+            pending.add(pool.submit(task))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        if pending:
+            collect(wait(pending)[0])
+    return result.to_dict()
+
+
+def _save_rituals(storage: StorageService, lines: list[tuple[str, bytes]]) -> dict:
+    """
+    Validate and save a batch of exported rituals.
+
+    A ritual is skipped if the stored copy is at least as recent (by
+    updatedAt), which makes importing the same export twice a no-op and
+    lets an interrupted import be rerun from the start.
+    """
+    result = {"rituals_imported": 0, "rituals_skipped": 0, "failed": 0, "errors": []}
+    rituals = []
+    for where, line in lines:
+        try:
+            ritual = Ritual.model_validate_json(line)
+            if not _safe_name(ritual.id) or ritual.id == TEMP_AUDIO_ID:
+                raise ValueError(f"invalid ritual ID {ritual.id!r}")
+        except ValueError as e:
+            result["failed"] += 1
+            result["errors"].append(f"{where}: {e}")
+            continue
+        existing = storage.get_ritual_summary(ritual.id)
+        if existing is not None and existing.updated_at >= ritual.updated_at:
+            result["rituals_skipped"] += 1
+        else:
+            rituals.append(ritual)
+    result["rituals_imported"] = storage.save_rituals(rituals)
+    return result
+
+
+def _save_audio(storage: StorageService, ritual_id: str, name: str, data: bytes, synthesis_key: Optional[str]) -> dict:
+    """Save one exported segment file, unless the same bytes are already stored."""
+    recorded = storage.load_audio_manifest(ritual_id).get(name, {})
+    if recorded.get("sha256") == hashlib.sha256(data).hexdigest():
+        return {"audio_skipped": 1}
+    segment_id, _, extension = name.rpartition(".")
+    storage.save_audio(ritual_id, segment_id, data, extension, synthesis_key)
+    return {"audio_imported": 1}
+
+
+def import_ndjson(
+    storage: StorageService,
+    lines: Iterable[bytes],
+    workers: int = DEFAULT_IMPORT_WORKERS,
+    progress: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """
+    Import rituals from NDJSON (as written by export_ndjson).
+
+    Batches of lines are validated and saved on `workers` threads. Invalid
+    lines are counted and reported without stopping the import. Returns the
+    counts of imported, skipped and failed rituals and the first errors.
+    """
+
+    def tasks() -> Iterator[Task]:
+        batch: list[tuple[str, bytes]] = []
+        for number, line in enumerate(lines, start=1):
+            if line.strip():
+                batch.append((f"line {number}", line))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                yield lambda batch=batch: _save_rituals(storage, batch)
+                batch = []
+        if batch:
+            yield lambda: _save_rituals(storage, batch)
+
+    result = _run_tasks(tasks(), workers, progress)
+    logger.info(f"Imported {result['rituals_imported']} rituals ({result['rituals_skipped']} unchanged, {result['failed']} failed)")
+    return result
+
+
+def import_tar(
+    storage: StorageService,
+    fileobj: IO[bytes],
+    workers: int = DEFAULT_IMPORT_WORKERS,
+    progress: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """
+    Import rituals and audio from a tar stream (as written by export_tar).
+
+    Members are read in order; each ritual and each segment file is saved on
+    one of `workers` threads. Audio is only imported for rituals in the
+    archive, and files whose checksum matches the stored copy are skipped,
+    so like import_ndjson this can be rerun after an interruption.
+    """
+
+    def tasks() -> Iterator[Task]:
+        try:
+            yield from read_members()
+        except tarfile.TarError as e:
+            # Truncated upload or not a tar; what was read so far is kept, so the import can be rerun
+            yield lambda error=f"archive: {e}": {"failed": 1, "errors": [error]}
+
+    def read_members() -> Iterator[Task]:
+        ritual_id: Optional[str] = None  # Ritual whose audio members follow
+        manifest: dict[str, dict] = {}
+        with tarfile.open(fileobj=fileobj, mode="r|") as tar:
+            for member in tar:
+                if not member.isfile():
+                    continue
+                kind, _, rest = member.name.partition("/")
+                data = tar.extractfile(member).read()
+                if kind == "rituals" and rest.endswith(".json"):
+                    ritual_id, manifest = rest[:-len(".json")], {}
+                    yield lambda where=member.name, data=data: _save_rituals(storage, [(where, data)])
+                    continue
+
+                owner, _, name = rest.partition("/")
+                segment_id, _, extension = name.rpartition(".")
+                if kind != "audio" or owner != ritual_id or not _safe_name(owner) or owner == TEMP_AUDIO_ID:
+                    yield lambda where=member.name: {"failed": 1, "errors": [f"{where}: not part of an exported ritual"]}
+                elif name == AUDIO_MANIFEST_NAME:
+                    try:
+                        manifest = json.loads(data)
+                    except ValueError:
+                        manifest = {}
+                elif _safe_name(segment_id) and extension in AUDIO_EXTENSIONS:
+                    synthesis_key = manifest.get(name, {}).get("synthesis_key")
+                    yield lambda ritual_id=ritual_id, name=name, data=data, key=synthesis_key: _save_audio(
+                        storage, ritual_id, name, data, key
+                    )
+
+    result = _run_tasks(tasks(), workers, progress)
+    logger.info(
+        f"Imported {result['rituals_imported']} rituals ({result['rituals_skipped']} unchanged) and "
+        f"{result['audio_imported']} audio files ({result['audio_skipped']} unchanged), {result['failed']} failed"
+    )
+    return result
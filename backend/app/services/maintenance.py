@@ -0,0 +1,154 @@
+"""Periodic background maintenance of stored audio."""
+
+import asyncio
+import time
+from typing import Callable, Optional
+
+from ..config import get_settings
+from ..logging_config import get_logger
+from .async_storage import get_storage_executor
+from .storage import StorageService, get_storage_service
+
+logger = get_logger(__name__)
+
+# Tasks in the order each pass runs them (orphans and evicted audio are tombstoned before the purge)
+TASKS = ("temp_audio", "audio_jobs", "orphans", "audio_quota", "tombstones")
+
+
+def _or_setting(value, setting):
+    """An explicit argument (even 0), else the configured value."""
+    return setting if value is None else value
+
+
+class MaintenanceScheduler:
+    """
+    Runs storage maintenance tasks periodically in the background.
+
+    Each pass deletes temp audio and finished audio job files older than
+    their TTLs, tombstones audio
+    directories whose ritual is gone, evicts the audio of the least recently
+    used rituals if over the audio quota, then purges tombstones (including
+    the audio of deleted rituals). Passes run on the storage I/O pool, never
+    overlap, and a failing task is logged without stopping the others.
+    Counters are kept per task for monitoring. Arguments left as None
+    come from settings; an audio quota of 0 disables eviction.
+    """
+
+    def __init__(
+        self,
+        storage_service: Optional[StorageService] = None,
+        interval_seconds: Optional[float] = None,
+        temp_audio_ttl_seconds: Optional[float] = None,
+        orphan_grace_seconds: Optional[float] = None,
+        audio_quota_bytes: Optional[int] = None,
+        audio_job_ttl_seconds: Optional[float] = None,
+    ):
+        settings = get_settings()
+        self._storage = storage_service
+        self.interval_seconds = _or_setting(interval_seconds, settings.maintenance_interval_seconds)
+        self.temp_audio_ttl_seconds = _or_setting(temp_audio_ttl_seconds, settings.temp_audio_ttl_seconds)
+        self.orphan_grace_seconds = _or_setting(orphan_grace_seconds, settings.orphan_audio_grace_seconds)
+        self.audio_quota_bytes = _or_setting(audio_quota_bytes, settings.audio_quota_bytes)
+        self.audio_job_ttl_seconds = _or_setting(audio_job_ttl_seconds, settings.audio_job_ttl_seconds)
+
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.runs = 0
+        self.last_run_at: Optional[float] = None
+        self.last_duration_seconds = 0.0
+        self.tasks = {name: {"runs": 0, "errors": 0, "files": 0, "bytes_reclaimed": 0} for name in TASKS}
+        self.rituals_evicted = 0
+
+    @property
+    def storage(self) -> StorageService:
+        return self._storage or get_storage_service()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start running passes every interval (the first one right away)."""
+        if not self.running:
+            self._task = asyncio.create_task(self._loop())
+            logger.info(f"Maintenance scheduler started (every {self.interval_seconds:g}s)")
+
+    async def stop(self) -> None:
+        """Stop the scheduler (a storage task already running finishes on the I/O pool)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval_seconds)
+
+    async def run_once(self) -> dict:
+        """Run one maintenance pass now; returns each task's result."""
+        async with self._lock:
+            started = time.perf_counter()
+            storage = self.storage
+            steps: dict[str, Callable[[], dict]] = {
+                "temp_audio": lambda: storage.gc_temp_audio(self.temp_audio_ttl_seconds),
+                "audio_jobs": lambda: storage.gc_audio_jobs(self.audio_job_ttl_seconds),
+                "orphans": lambda: storage.remove_orphan_audio(self.orphan_grace_seconds),
+                "audio_quota": lambda: (
+                    storage.enforce_audio_quota(self.audio_quota_bytes) if self.audio_quota_bytes else {}
+                ),
+                "tombstones": storage.purge_tombstones,
+            }
+
+            loop = asyncio.get_running_loop()
+            results = {}
+            for name in TASKS:
+                counters = self.tasks[name]
+                counters["runs"] += 1
+                try:
+                    result = await loop.run_in_executor(get_storage_executor(), steps[name])
+                except Exception:
+                    counters["errors"] += 1
+                    logger.exception(f"Maintenance task {name} failed")
+                    continue
+                # Evicted audio is tombstoned, so its bytes are counted when the trash is purged
+                self.rituals_evicted += len(result.get("evicted", ()))
+                counters["files"] += result.get("files", 0)
+                counters["bytes_reclaimed"] += result.get("bytes", 0)
+                results[name] = result
+
+            self.runs += 1
+            self.last_run_at = time.time()
+            self.last_duration_seconds = time.perf_counter() - started
+            reclaimed = sum(result.get("bytes", 0) for result in results.values())
+            if reclaimed:
+                logger.info(f"Maintenance reclaimed {reclaimed} bytes in {self.last_duration_seconds:.2f}s")
+            return results
+
+    def stats(self) -> dict:
+        """Pass and per-task counters for monitoring."""
+        return {
+            "running": self.running,
+            "interval_seconds": self.interval_seconds,
+            "runs": self.runs,
+            "last_run_at": self.last_run_at,
+            "last_duration_seconds": self.last_duration_seconds,
+            "bytes_reclaimed": sum(task["bytes_reclaimed"] for task in self.tasks.values()),
+            "rituals_evicted": self.rituals_evicted,
+            "tasks": {name: dict(counters) for name, counters in self.tasks.items()},
+        }
+
+
+# Singleton instance
+_maintenance_scheduler: Optional[MaintenanceScheduler] = None
+
+
+def get_maintenance_scheduler() -> MaintenanceScheduler:
+    """Get or create maintenance scheduler instance."""
+    global _maintenance_scheduler
+    if _maintenance_scheduler is None:
+        _maintenance_scheduler = MaintenanceScheduler()
+    return _maintenance_scheduler
@@ -1,11 +1,12 @@
 """OpenAI provider for ritual text generation."""
 
 import json
+import threading
 import uuid
 from datetime import datetime, timezone
 from typing import Literal, Optional
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 
 from ..config import get_settings
 from ..models.ritual import Ritual, RitualSection, Segment, RitualCreate
@@ -59,15 +60,18 @@ class OpenAIProvider:
     def __init__(self, api_key: Optional[str] = None):
         settings = get_settings()
         self.api_key = api_key if api_key is not None else settings.openai_api_key
-        self._client: Optional[OpenAI] = None
+        self._client: Optional[AsyncOpenAI] = None
+        self._client_lock = threading.Lock()
 
     @property
-    def client(self) -> OpenAI:
-        """Lazy-initialize OpenAI client."""
+    def client(self) -> AsyncOpenAI:
+        """Lazy-initialize the async OpenAI client (thread-safe)."""
         if self._client is None:
-            if not self.api_key:
-                raise ValueError("OpenAI API key not configured")
-            self._client = OpenAI(api_key=self.api_key)
+            with self._client_lock:
+                if self._client is None:
+                    if not self.api_key:
+                        raise ValueError("OpenAI API key not configured")
+                    self._client = AsyncOpenAI(api_key=self.api_key)
         return self._client
 
     def _build_user_prompt(self, request: RitualCreate) -> str:
@@ -96,7 +100,7 @@ Remember: Output ONLY valid JSON, no other text."""
         """Generate a meditation ritual based on the request."""
         user_prompt = self._build_user_prompt(request)
 
-        response = self.client.chat.completions.create(
+        response = await self.client.chat.completions.create(
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": SYSTEM_PROMPT},
@@ -0,0 +1,74 @@
+"""In-process LRU cache of parsed rituals."""
+
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+from ..models.ritual import Ritual
+
+# Identifies one written version of a ritual file: (inode, mtime_ns, size).
+# Writes replace the file via rename, so every save gets a new inode.
+FileVersion = tuple[int, int, int]
+
+
+class RitualCache:
+    """
+    Bounded LRU of parsed rituals, keyed by ID and validated by file version.
+
+    Lookups pass the current version of the ritual's file (one stat); an
+    entry from an older version is reparsed, so writes by other processes
+    are picked up. Cached rituals are shared between callers and must not be
+    mutated.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[FileVersion, Ritual]] = OrderedDict()  # LRU first
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def get(self, ritual_id: str, version: FileVersion, load: Callable[[], Ritual]) -> Ritual:
+        """Return the cached ritual for this file version, calling load() on a miss."""
+        with self._lock:
+            entry = self._entries.get(ritual_id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(ritual_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            if entry is not None:
+                self.invalidations += 1
+
+        # Parse outside the lock; if the file changed meanwhile, the next stat won't match
+        ritual = load()
+        if self.max_entries > 0:
+            with self._lock:
+                self._entries[ritual_id] = (version, ritual)
+                self._entries.move_to_end(ritual_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return ritual
+
+    def discard(self, ritual_id: str) -> None:
+        """Drop a ritual that was just written or deleted."""
+        with self._lock:
+            if self._entries.pop(ritual_id, None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> dict:
+        """Cache counters for monitoring and sizing."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
@@ -0,0 +1,334 @@
+"""Persistent summary index of stored rituals."""
+
+import bisect
+import fcntl
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from ..logging_config import get_logger
+from ..models.ritual import Ritual
+
+logger = get_logger(__name__)
+
+INDEX_VERSION = 1
+
+# Compact the log into the snapshot once it has this many entries (or more than the snapshot)
+MIN_COMPACT_ENTRIES = 1000
+
+
+class RitualIndexEntry:
+    """Summary of one stored ritual; a compact record, not a full Ritual."""
+
+    __slots__ = (
+        "id", "title", "tags", "duration", "tone", "audio_status",
+        "is_template", "created_at", "updated_at", "mtime_ns",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        title: str,
+        tags: tuple[str, ...],
+        duration: int,
+        tone: str,
+        audio_status: str,
+        is_template: bool,
+        created_at: str,
+        updated_at: str,
+        mtime_ns: int,
+    ):
+        self.id = id
+        self.title = title
+        self.tags = tags
+        self.duration = duration
+        self.tone = tone
+        self.audio_status = audio_status
+        self.is_template = is_template
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.mtime_ns = mtime_ns  # Of the ritual file this entry was read from
+
+    @classmethod
+    def from_ritual(cls, ritual: Ritual, mtime_ns: int) -> "RitualIndexEntry":
+        return cls(
+            ritual.id, ritual.title, tuple(ritual.tags), ritual.duration, ritual.tone, ritual.audio_status,
+            ritual.is_template, ritual.created_at, ritual.updated_at, mtime_ns,
+        )
+
+    @classmethod
+    def from_row(cls, row: list) -> "RitualIndexEntry":
+        entry = cls(*row)
+        entry.tags = tuple(entry.tags)
+        return entry
+
+    def to_row(self) -> list:
+        return [getattr(self, name) for name in self.__slots__]
+
+    @property
+    def sort_key(self) -> tuple[str, str]:
+        return self.created_at, self.id
+
+
+def _scan_json_files(directory: Path) -> Iterator[os.DirEntry]:
+    """JSON files under directory, descending into (shard) subdirectories."""
+    with os.scandir(directory) as it:
+        for dir_entry in it:
+            if dir_entry.name.startswith("."):
+                continue
+            if dir_entry.is_dir():
+                yield from _scan_json_files(Path(dir_entry.path))
+            elif dir_entry.name.endswith(".json"):
+                yield dir_entry
+
+
+class RitualIndex:
+    """
+    Summary index of the rituals directory, kept in memory and on disk.
+
+    The on-disk form is a snapshot (one JSON array per ritual) plus an
+    append-only log of puts and deletes, compacted into the snapshot when it
+    grows. Other processes sharing the storage directory append to the same
+    log, and each read first replays any entries it hasn't seen, so every
+    instance stays current at the cost of one stat per read. Writers
+    serialize on a lock file.
+
+    Entries are kept sorted by (created_at, id), so listing is a slice.
+    """
+
+    def __init__(self, index_path: Path, rituals_path: Path):
+        self.index_path = index_path
+        self.rituals_path = rituals_path
+        self.snapshot_file = index_path / "rituals.jsonl"
+        self.log_file = index_path / "rituals.log"
+        self.lock_file = index_path / "rituals.lock"
+        index_path.mkdir(parents=True, exist_ok=True)
+
+        self._entries: dict[str, RitualIndexEntry] = {}
+        self._order: list[tuple[str, str]] = []  # Sort keys, oldest first
+        self._snapshot_id: Optional[tuple[int, int]] = None  # (inode, mtime) of the loaded snapshot
+        self._log_offset = 0  # Bytes of the log already applied
+        self._log_entries = 0
+        self._lock = threading.RLock()
+
+        with self._lock, self._file_lock():
+            self._load()
+            self._reconcile()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._sync()
+            return len(self._entries)
+
+    def get(self, ritual_id: str) -> Optional[RitualIndexEntry]:
+        with self._lock:
+            self._sync()
+            return self._entries.get(ritual_id)
+
+    def entries(self, newest_first: bool = True) -> list[RitualIndexEntry]:
+        """All entries sorted by creation time."""
+        with self._lock:
+            self._sync()
+            order = reversed(self._order) if newest_first else self._order
+            return [self._entries[ritual_id] for _, ritual_id in order]
+
+    def page(
+        self,
+        before: Optional[tuple[str, str]] = None,
+        limit: Optional[int] = None,
+        match: Optional[Callable[[RitualIndexEntry], bool]] = None,
+    ) -> tuple[list[RitualIndexEntry], Optional[tuple[str, str]]]:
+        """
+        Entries newest first, starting after a sort key.
+
+        Args:
+            before: Only entries with a sort key below this (the previous page's cursor)
+            limit: Maximum entries to return, or None for all
+            match: Only entries this returns true for
+
+        Returns:
+            The entries, and the sort key to pass as `before` for the next
+            page (None if there are no more matching entries)
+        """
+        with self._lock:
+            self._sync()
+            position = len(self._order) if before is None else bisect.bisect_left(self._order, before)
+            entries: list[RitualIndexEntry] = []
+            while position > 0:
+                position -= 1
+                entry = self._entries[self._order[position][1]]
+                if match is not None and not match(entry):
+                    continue
+                if limit is not None and len(entries) == limit:
+                    return entries, entries[-1].sort_key
+                entries.append(entry)
+            return entries, None
+
+    def put(self, ritual: Ritual, mtime_ns: int) -> None:
+        """Record a saved ritual."""
+        entry = RitualIndexEntry.from_ritual(ritual, mtime_ns)
+        with self._lock, self._file_lock():
+            self._sync()
+            self._apply_put(entry)
+            self._append(["put", entry.to_row()])
+
+    def remove(self, ritual_id: str) -> None:
+        """Record a deleted ritual."""
+        with self._lock, self._file_lock():
+            self._sync()
+            if self._apply_remove(ritual_id):
+                self._append(["del", ritual_id])
+
+    # In-memory updates
+
+    def _apply_put(self, entry: RitualIndexEntry) -> None:
+        self._apply_remove(entry.id)
+        self._entries[entry.id] = entry
+        bisect.insort(self._order, entry.sort_key)
+
+    def _apply_remove(self, ritual_id: str) -> bool:
+        entry = self._entries.pop(ritual_id, None)
+        if entry is None:
+            return False
+        position = bisect.bisect_left(self._order, entry.sort_key)
+        del self._order[position]
+        return True
+
+    def _apply(self, op: list) -> None:
+        if op[0] == "put":
+            self._apply_put(RitualIndexEntry.from_row(op[1]))
+        elif op[0] == "del":
+            self._apply_remove(op[1])
+
+    # Persistence
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Exclusive lock shared with other processes using this index."""
+        with open(self.lock_file, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _load(self) -> None:
+        """Load the snapshot and replay the log."""
+        self._entries = {}
+        self._order = []
+        self._snapshot_id = None
+        self._log_offset = 0
+        self._log_entries = 0
+
+        if self.snapshot_file.exists():
+            stat = self.snapshot_file.stat()
+            with open(self.snapshot_file, "r") as f:
+                header = json.loads(f.readline() or "{}")
+                if header.get("version") == INDEX_VERSION:
+                    for line in f:
+                        entry = RitualIndexEntry.from_row(json.loads(line))
+                        self._entries[entry.id] = entry
+            self._snapshot_id = (stat.st_ino, stat.st_mtime_ns)
+            self._order = sorted(entry.sort_key for entry in self._entries.values())
+        self._replay_log()
+
+    def _replay_log(self) -> None:
+        """Apply log entries appended since the last read."""
+        try:
+            with open(self.log_file, "rb") as f:
+                f.seek(self._log_offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # Partially written by a concurrent append; pick it up next time
+                    self._apply(json.loads(line))
+                    self._log_offset += len(line)
+                    self._log_entries += 1
+        except FileNotFoundError:
+            pass
+
+    def _sync(self) -> None:
+        """Pick up changes written by other instances."""
+        try:
+            stat = self.snapshot_file.stat()
+            snapshot_id = (stat.st_ino, stat.st_mtime_ns)
+        except FileNotFoundError:
+            snapshot_id = None
+        if snapshot_id != self._snapshot_id:
+            self._load()  # Another instance compacted
+            return
+
+        try:
+            log_size = self.log_file.stat().st_size
+        except FileNotFoundError:
+            log_size = 0
+        if log_size != self._log_offset:
+            self._replay_log()
+
+    def _append(self, op: list) -> None:
+        line = json.dumps(op, separators=(",", ":")) + "\n"
+        with open(self.log_file, "a") as f:
+            f.write(line)
+        self._log_offset += len(line.encode("utf-8"))
+        self._log_entries += 1
+        if self._log_entries >= max(MIN_COMPACT_ENTRIES, len(self._entries)):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite the snapshot from memory and empty the log."""
+        temp_path = self.snapshot_file.with_name(f".{self.snapshot_file.name}.{uuid.uuid4().hex}.part")
+        with open(temp_path, "w") as f:
+            f.write(json.dumps({"version": INDEX_VERSION}) + "\n")
+            for entry in self._entries.values():
+                f.write(json.dumps(entry.to_row(), separators=(",", ":")) + "\n")
+        os.replace(temp_path, self.snapshot_file)
+        with open(self.log_file, "w"):
+            pass
+
+        stat = self.snapshot_file.stat()
+        self._snapshot_id = (stat.st_ino, stat.st_mtime_ns)
+        self._log_offset = 0
+        self._log_entries = 0
+        logger.debug(f"Compacted ritual index: {len(self._entries)} entries")
+
+    def _reconcile(self) -> None:
+        """
+        Bring the index in line with the rituals directory (either layout).
+
+        Only files whose mtime differs from their entry (or that have no
+        entry) are parsed; entries without a file are dropped.
+        """
+        seen = set()
+        changed = 0
+        for dir_entry in _scan_json_files(self.rituals_path):
+            ritual_id = dir_entry.name[:-len(".json")]
+            seen.add(ritual_id)
+            mtime_ns = dir_entry.stat().st_mtime_ns
+            entry = self._entries.get(ritual_id)
+            if entry is not None and entry.mtime_ns == mtime_ns:
+                continue
+
+            try:
+                with open(dir_entry.path, "r") as f:
+                    ritual = Ritual(**json.load(f))
+            except Exception:
+                if entry is not None:
+                    self._apply_remove(ritual_id)
+                    changed += 1
+                continue  # Skip invalid files, as listing always has
+            entry = RitualIndexEntry.from_ritual(ritual, mtime_ns)
+            entry.id = ritual_id  # Rituals are addressed by file name
+            self._apply_put(entry)
+            changed += 1
+
+        for ritual_id in [rid for rid in self._entries if rid not in seen]:
+            self._apply_remove(ritual_id)
+            changed += 1
+
+        if changed or self._log_entries:
+            self._compact()
+        if changed:
+            logger.info(f"Ritual index updated from disk: {changed} changed, {len(self._entries)} total")
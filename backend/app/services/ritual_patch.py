@@ -0,0 +1,236 @@
+"""Partial ritual updates with JSON Patch (RFC 6902) or JSON Merge Patch (RFC 7386)."""
+
+import copy
+from typing import Any
+
+from pydantic import ValidationError
+
+from ..models.audio_job import utc_now_iso
+from ..models.ritual import Ritual, RitualSection
+
+JSON_PATCH_TYPE = "application/json-patch+json"
+MERGE_PATCH_TYPE = "application/merge-patch+json"
+
+
+class PatchError(ValueError):
+    """The patch document is malformed or can't be applied to the ritual."""
+
+
+class PatchTestFailed(PatchError):
+    """A JSON Patch "test" operation didn't match the stored ritual."""
+
+
+class PatchValidationError(ValueError):
+    """The patched ritual is invalid; errors are in pydantic's format, located from the ritual root."""
+
+    def __init__(self, errors: list[dict]):
+        super().__init__(f"{len(errors)} validation errors")
+        self.errors = errors
+
+
+# JSON Patch
+
+def _pointer(pointer: Any) -> list[str]:
+    """Reference tokens of a JSON Pointer (RFC 6901)."""
+    if not isinstance(pointer, str) or (pointer and not pointer.startswith("/")):
+        raise PatchError(f"Invalid JSON pointer: {pointer!r}")
+    if not pointer:
+        return []
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _index(array: list, token: str, insert: bool = False) -> int:
+    if insert and token == "-":
+        return len(array)
+    if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+        raise PatchError(f"Invalid array index: {token!r}")
+    index = int(token)
+    if index > len(array) or (index == len(array) and not insert):
+        raise PatchError(f"Array index out of range: {index}")
+    return index
+
+
+def _get(document: Any, tokens: list[str]) -> Any:
+    for token in tokens:
+        if isinstance(document, list):
+            document = document[_index(document, token)]
+        elif isinstance(document, dict) and token in document:
+            document = document[token]
+        else:
+            raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+    return document
+
+
+def _add(document: Any, tokens: list[str], value: Any) -> Any:
+    if not tokens:
+        return value
+    parent = _get(document, tokens[:-1])
+    if isinstance(parent, list):
+        parent.insert(_index(parent, tokens[-1], insert=True), value)
+    elif isinstance(parent, dict):
+        parent[tokens[-1]] = value
+    else:
+        raise PatchError(f"Cannot add to a scalar at /{'/'.join(tokens[:-1])}")
+    return document
+
+
+def _remove(document: Any, tokens: list[str]) -> Any:
+    if not tokens:
+        raise PatchError("Cannot remove the whole ritual")
+    parent = _get(document, tokens[:-1])
+    if isinstance(parent, list):
+        del parent[_index(parent, tokens[-1])]
+    elif isinstance(parent, dict) and tokens[-1] in parent:
+        del parent[tokens[-1]]
+    else:
+        raise PatchError(f"Path not found: /{'/'.join(tokens)}")
+    return document
+
+
+def apply_json_patch(document: Any, operations: Any) -> Any:
+    """
+    Apply JSON Patch operations in order, modifying the document in place.
+
+    Returns the patched document (a different object only if the root was
+    replaced). Raises PatchError for malformed operations or paths that
+    don't exist, and PatchTestFailed when a "test" operation doesn't match.
+    """
+    if not isinstance(operations, list):
+        raise PatchError("A JSON Patch must be an array of operations")
+    for number, operation in enumerate(operations):
+        if not isinstance(operation, dict):
+            raise PatchError(f"Operation {number} is not an object")
+        op = operation.get("op")
+        path = _pointer(operation.get("path"))
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise PatchError(f"Operation {number} ({op}) has no value")
+
+        if op == "add":
+            document = _add(document, path, copy.deepcopy(operation["value"]))
+        elif op == "remove":
+            document = _remove(document, path)
+        elif op == "replace":
+            value = copy.deepcopy(operation["value"])
+            document = _add(_remove(document, path), path, value) if path else value
+        elif op in ("move", "copy"):
+            source = _pointer(operation.get("from"))
+            value = _get(document, source)
+            if op == "move":
+                if path[:len(source)] == source and len(path) > len(source):
+                    raise PatchError(f"Operation {number} moves a value into itself")
+                document = _remove(document, source)
+            else:
+                value = copy.deepcopy(value)
+            document = _add(document, path, value)
+        elif op == "test":
+            if _get(document, path) != operation["value"]:
+                raise PatchTestFailed(f"Test failed at {operation['path']}")
+        else:
+            raise PatchError(f"Operation {number} has unknown op {op!r}")
+    return document
+
+
+# JSON Merge Patch
+
+def apply_merge_patch(target: Any, patch: Any) -> Any:
+    """Apply a JSON Merge Patch: objects merge recursively, null deletes, anything else replaces."""
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    if not isinstance(target, dict):
+        target = {}
+    for key, value in patch.items():
+        if value is None:
+            target.pop(key, None)
+        else:
+            target[key] = apply_merge_patch(target.get(key), value)
+    return target
+
+
+# Rituals
+
+def _validation_errors(e: ValidationError, prefix: tuple = ()) -> list[dict]:
+    return [{**error, "loc": (*prefix, *error["loc"])} for error in e.errors(include_url=False)]
+
+
+def patch_ritual(ritual: Ritual, patch: Any, json_patch: bool) -> tuple[Ritual, list[str]]:
+    """
+    Apply a patch to a stored ritual (which is left unchanged).
+
+    Only what the patch changed is validated again: sections whose content
+    is unchanged are reused as they were. The ritual keeps its ID and gets
+    a new updatedAt.
+
+    Segment audio is invalidated only where the patch touched it: segments
+    whose text changed lose their audioUrl, renders of sections whose
+    segments changed (and the master render, if any section did) are
+    cleared, and a "ready" ritual goes back to "pending" when a text
+    segment now needs audio. (A new voice or provider needs no invalidation
+    here: audio jobs already resynthesize segments made with another one.)
+
+    Returns the patched ritual and the IDs of segments whose stored audio
+    is stale (text changed or segment removed); the caller deletes it once
+    the ritual is saved.
+    """
+    original = ritual.model_dump(by_alias=True)
+    document = copy.deepcopy(original)
+    document = apply_json_patch(document, patch) if json_patch else apply_merge_patch(document, patch)
+    if not isinstance(document, dict):
+        raise PatchError("The patched ritual is not an object")
+    document["id"] = ritual.id
+    document["updatedAt"] = utc_now_iso()
+
+    # Partial validation: sections are validated one by one, and only if they changed
+    stored_sections = {
+        section.id: (section, data) for section, data in zip(ritual.sections, original.get("sections", []))
+    }
+    section_data = document.get("sections", [])
+    if not isinstance(section_data, list):
+        section_data = None  # Let the model report it
+    sections: list[RitualSection] = []
+    changed_sections: set[str] = set()
+    errors: list[dict] = []
+    for index, data in enumerate(section_data or ()):
+        stored = stored_sections.get(data.get("id")) if isinstance(data, dict) else None
+        if stored is not None and data == stored[1]:
+            sections.append(stored[0])
+            continue
+        try:
+            section = RitualSection.model_validate(data)
+        except ValidationError as e:
+            errors += _validation_errors(e, ("sections", index))
+            continue
+        sections.append(section)
+        if stored is None or data.get("segments") != stored[1].get("segments"):
+            changed_sections.add(section.id)
+    try:
+        patched = Ritual.model_validate({**document, "sections": []} if section_data is not None else document)
+    except ValidationError as e:
+        errors = _validation_errors(e) + errors
+    if errors:
+        raise PatchValidationError(errors)
+    patched.sections = sections
+
+    # Audio invalidation, limited to what changed
+    old_texts = {
+        segment.id: segment.text for section in ritual.sections for segment in section.segments if segment.type == "text"
+    }
+    new_segments = {segment.id: segment for section in sections for segment in section.segments}
+    stale = [
+        segment_id for segment_id, text in old_texts.items()
+        if segment_id not in new_segments
+        or new_segments[segment_id].type != "text"
+        or new_segments[segment_id].text != text
+    ]
+    needs_audio = False
+    for segment_id, segment in new_segments.items():
+        if segment.type == "text" and (segment_id in stale or segment_id not in old_texts):
+            segment.audio_url = segment.actual_duration_seconds = None
+            needs_audio = needs_audio or bool(segment.text)
+    for section in sections:
+        if section.id in changed_sections:
+            section.audio_url = section.audio_duration_seconds = section.audio_generated_at = None
+    if changed_sections or [s.id for s in sections] != [s.id for s in ritual.sections]:
+        patched.audio_url = patched.audio_duration_seconds = patched.audio_generated_at = None
+    if needs_audio and patched.audio_status == "ready":
+        patched.audio_status = "pending"
+    return patched, stale
@@ -0,0 +1,339 @@
+"""Server-side rendering of a ritual's segments into continuous audio files."""
+
+import hashlib
+import json
+import mmap
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+from ..logging_config import get_logger
+from ..models.audio_job import utc_now_iso
+from ..models.ritual import Ritual, RitualSection
+from .audio_info import FrameHeader, iter_mp3_frames, probe_file
+from .storage import AudioWriter, StorageService, get_storage_service
+from .wav import wav_header
+
+logger = get_logger(__name__)
+
+# Render name of the whole-ritual master file (sections use their IDs)
+MASTER_NAME = "ritual"
+
+# Output format for rituals with no speech audio to take a format from
+DEFAULT_SAMPLE_RATE = 24000
+DEFAULT_CHANNELS = 1
+
+# Silence is written in blocks of this many seconds
+SILENCE_BLOCK_SECONDS = 1.0
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# A speech segment's audio file, or a silence duration in seconds
+Part = Union[Path, float]
+
+
+class MissingAudioError(ValueError):
+    """A text segment has no synthesized audio to render."""
+
+
+class RenderFormat:
+    """Output format shared by every render of one ritual."""
+
+    def __init__(self, extension: str, sample_rate: int, channels: int, mp3_template: Optional[FrameHeader] = None):
+        self.extension = extension
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.mp3_template = mp3_template  # First frame of the speech audio (MP3 only)
+
+    @property
+    def key(self) -> str:
+        """Identifies the format in render fingerprints."""
+        raw = self.mp3_template.raw.hex() if self.mp3_template else ""
+        return f"{self.extension}:{self.sample_rate}:{self.channels}:{raw}"
+
+
+def section_parts(audio: dict[str, Path], section: RitualSection) -> list[Part]:
+    """A section's speech files (from StorageService.segment_audio) and silences, in playback order."""
+    parts: list[Part] = []
+    for segment in section.segments:
+        if segment.type == "silence":
+            if segment.duration_seconds > 0:
+                parts.append(float(segment.duration_seconds))
+        elif segment.text:
+            path = audio.get(segment.id)
+            if path is None:
+                raise MissingAudioError(f"Segment {segment.id} has no audio; generate ritual audio first")
+            parts.append(path)
+    return parts
+
+
+def render_format(parts: list[Part]) -> RenderFormat:
+    """Pick the output format from a ritual's speech audio."""
+    paths = [p for p in parts if isinstance(p, Path)]
+    extensions = {p.suffix.lstrip(".") for p in paths}
+    if len(extensions) > 1:
+        raise ValueError("Ritual mixes MP3 and WAV audio; regenerate it with a single provider")
+
+    if not paths:
+        return RenderFormat("wav", DEFAULT_SAMPLE_RATE, DEFAULT_CHANNELS)
+    if extensions == {"mp3"}:
+        with open(paths[0], "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            first = next(iter_mp3_frames(buf), None)
+        if first is None:
+            raise ValueError(f"{paths[0].name} contains no complete MP3 frames")
+        template = first[1]
+        return RenderFormat("mp3", template.sample_rate, template.channels, template)
+
+    info = probe_file(paths[0])
+    return RenderFormat("wav", info.sample_rate, info.channels)
+
+
+def fingerprint(fmt: RenderFormat, parts: list[Part]) -> str:
+    """Hash of everything that determines the audio joined from parts."""
+    material: list = [fmt.key]
+    for part in parts:
+        if isinstance(part, Path):
+            stat = part.stat()
+            material.append([part.name, stat.st_size, stat.st_mtime_ns])
+        else:
+            material.append(part)
+    return _hash(material)
+
+
+def _hash(material: list) -> str:
+    return hashlib.sha256(json.dumps(material).encode("utf-8")).hexdigest()
+
+
+class RitualRenderer:
+    """
+    Renders rituals into one master audio file plus one file per section.
+
+    Speech segments are concatenated in order with generated silence.
+    MP3 speech is joined at frame level with silent frames, so nothing is
+    re-encoded; WAV speech is joined as PCM with NumPy, converting sample
+    rate and channel count to the ritual's format where they differ.
+
+    Each render is fingerprinted from its inputs (segment order, audio file
+    size/mtime, silence durations), and renders whose fingerprint is
+    unchanged are reused.
+    """
+
+    def __init__(self, storage_service: Optional[StorageService] = None):
+        self._storage = storage_service
+
+    @property
+    def storage(self) -> StorageService:
+        return self._storage or get_storage_service()
+
+    def render(self, ritual_id: str, force: bool = False) -> Optional[tuple[Ritual, list[str]]]:
+        """
+        Render a ritual's master and section audio.
+
+        Returns:
+            Tuple of (updated ritual, names re-rendered this call), or None if
+            the ritual does not exist. Names are section IDs and MASTER_NAME.
+
+        Raises:
+            MissingAudioError: a text segment has no audio yet
+            ValueError: the speech audio cannot be joined (mixed formats)
+        """
+        ritual = self.storage.load_ritual(ritual_id)
+        if ritual is None:
+            return None
+
+        audio = self.storage.segment_audio(ritual.id)
+        parts = {section.id: section_parts(audio, section) for section in ritual.sections}
+        if not any(parts.values()):
+            raise ValueError("Ritual has no segments to render")
+        fmt = render_format([part for current in parts.values() for part in current])
+        manifest = {} if force else self.storage.load_render_manifest(ritual_id)
+        new_manifest: dict[str, dict] = {}
+        rendered: list[str] = []
+
+        for section in ritual.sections:
+            current = parts[section.id]
+            if not current:
+                continue
+
+            section_fingerprint = fingerprint(fmt, current)
+            previous = manifest.get(section.id)
+            if previous and previous["fingerprint"] == section_fingerprint and self._render_exists(ritual_id, section.id, fmt):
+                new_manifest[section.id] = previous
+                continue
+
+            writer = self.storage.open_render_writer(ritual_id, section.id, fmt.extension)
+            duration = self._write(writer, current, fmt)
+            new_manifest[section.id] = {
+                "fingerprint": section_fingerprint,
+                "url": writer.url,
+                "durationSeconds": duration,
+                "generatedAt": utc_now_iso(),
+            }
+            rendered.append(section.id)
+
+        master_fingerprint = _hash([fmt.key] + [entry["fingerprint"] for entry in new_manifest.values()])
+        previous = manifest.get(MASTER_NAME)
+        if previous and previous["fingerprint"] == master_fingerprint and self._render_exists(ritual_id, MASTER_NAME, fmt):
+            new_manifest[MASTER_NAME] = previous
+        else:
+            writer = self.storage.open_render_writer(ritual_id, MASTER_NAME, fmt.extension)
+            sections = [self.storage.render_file(ritual_id, section_id, fmt.extension) for section_id in new_manifest]
+            self._concatenate(writer, sections, fmt)
+            new_manifest[MASTER_NAME] = {
+                "fingerprint": master_fingerprint,
+                "url": writer.url,
+                "durationSeconds": sum(entry["durationSeconds"] for entry in new_manifest.values()),
+                "generatedAt": utc_now_iso(),
+            }
+            rendered.append(MASTER_NAME)
+
+        self._remove_stale(ritual_id, manifest, new_manifest, fmt)
+        self.storage.save_render_manifest(ritual_id, new_manifest)
+
+        # Reload so edits made while rendering are not overwritten
+        ritual = self.storage.load_ritual(ritual_id) or ritual
+        self._apply(ritual, new_manifest)
+        self.storage.save_ritual(ritual)
+
+        logger.info(
+            f"Rendered ritual {ritual_id}: {len(rendered)} of {len(new_manifest)} files re-rendered, "
+            f"{ritual.audio_duration_seconds:.1f}s total"
+        )
+        return ritual, rendered
+
+    def _render_exists(self, ritual_id: str, name: str, fmt: RenderFormat) -> bool:
+        return self.storage.render_file(ritual_id, name, fmt.extension).exists()
+
+    def _write(self, writer: AudioWriter, parts: list[Part], fmt: RenderFormat) -> float:
+        """Write parts as one audio file; returns its duration in seconds."""
+        try:
+            if fmt.extension == "mp3":
+                samples = self._write_mp3(writer, parts, fmt.mp3_template)
+            else:
+                samples = self._write_wav(writer, parts, fmt)
+        except BaseException:
+            writer.abort()
+            raise
+        writer.commit()
+        return samples / fmt.sample_rate
+
+    def _write_mp3(self, writer: AudioWriter, parts: list[Part], template: FrameHeader) -> int:
+        """Join MP3 frames and silent frames; returns the number of samples written."""
+        silent_frame = template.silent_frame()
+        frames_per_block = max(1, round(SILENCE_BLOCK_SECONDS * template.sample_rate / template.samples))
+        samples = 0
+
+        for part in parts:
+            if isinstance(part, Path):
+                with open(part, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                    start = end = None
+                    for offset, header in iter_mp3_frames(buf):
+                        if not header.same_stream(template):
+                            raise ValueError(f"{part.name} does not match the ritual's MP3 format")
+                        start = offset if start is None else start
+                        end = offset + header.length
+                        samples += header.samples
+                    if start is not None:
+                        writer.write(buf[start:end])  # Frames are contiguous, so copy them in one slice
+            else:
+                frames = round(part * template.sample_rate / template.samples)
+                samples += frames * template.samples
+                while frames > 0:
+                    block = min(frames, frames_per_block)
+                    writer.write(silent_frame * block)
+                    frames -= block
+        return samples
+
+    def _write_wav(self, writer: AudioWriter, parts: list[Part], fmt: RenderFormat) -> int:
+        """Join PCM speech and zero-sample silence; returns the number of sample frames written."""
+        writer.write(wav_header(fmt.sample_rate, fmt.channels))
+        silence_block = np.zeros(round(SILENCE_BLOCK_SECONDS * fmt.sample_rate) * fmt.channels, dtype="<i2")
+        frames = 0
+
+        for part in parts:
+            if isinstance(part, Path):
+                pcm = self._read_pcm(part, fmt)
+                writer.write(pcm.tobytes())
+                frames += len(pcm) // fmt.channels
+            else:
+                remaining = round(part * fmt.sample_rate) * fmt.channels
+                frames += remaining // fmt.channels
+                while remaining > 0:
+                    block = silence_block[:remaining]
+                    writer.write(block.tobytes())
+                    remaining -= len(block)
+        return frames
+
+    @staticmethod
+    def _read_pcm(path: Path, fmt: RenderFormat) -> np.ndarray:
+        """Read a WAV file's samples converted to the render format (interleaved int16)."""
+        info = probe_file(path)
+        if info.sample_width != 2:
+            raise ValueError(f"{path.name}: only 16-bit PCM WAV audio can be rendered")
+
+        pcm = np.fromfile(path, dtype="<i2", count=info.frame_count * info.channels, offset=info.data_offset)
+        if info.channels == fmt.channels and info.sample_rate == fmt.sample_rate:
+            return pcm
+
+        frames = pcm.reshape(-1, info.channels).astype(np.float32)
+        if info.channels != fmt.channels:
+            # Down/up-mix through mono
+            frames = np.repeat(frames.mean(axis=1, keepdims=True), fmt.channels, axis=1)
+        if info.sample_rate != fmt.sample_rate and len(frames):
+            # Linear interpolation resampling, per channel
+            out_len = round(len(frames) * fmt.sample_rate / info.sample_rate)
+            positions = np.arange(out_len) * (info.sample_rate / fmt.sample_rate)
+            source = np.arange(len(frames))
+            frames = np.stack([np.interp(positions, source, frames[:, c]) for c in range(fmt.channels)], axis=1)
+        return np.clip(np.round(frames), -32768, 32767).astype("<i2").ravel()
+
+    def _concatenate(self, writer: AudioWriter, sections: list[Path], fmt: RenderFormat) -> None:
+        """Join section renders (already in the ritual's format) into the master file."""
+        try:
+            if fmt.extension == "wav":
+                writer.write(wav_header(fmt.sample_rate, fmt.channels))
+            for path in sections:
+                with open(path, "rb") as f:
+                    if fmt.extension == "wav":
+                        f.seek(probe_file(path).data_offset)
+                    while chunk := f.read(COPY_CHUNK_SIZE):
+                        writer.write(chunk)
+        except BaseException:
+            writer.abort()
+            raise
+        writer.commit()
+
+    def _remove_stale(self, ritual_id: str, old: dict, new: dict, fmt: RenderFormat) -> None:
+        """Delete renders of sections that were removed (or of a previous format)."""
+        for name in old:
+            for extension in ("mp3", "wav"):
+                if name in new and extension == fmt.extension:
+                    continue
+                self.storage.render_file(ritual_id, name, extension).unlink(missing_ok=True)
+
+    @staticmethod
+    def _apply(ritual: Ritual, manifest: dict) -> None:
+        """Copy render URLs and durations onto the ritual and its sections."""
+        for section in ritual.sections:
+            entry = manifest.get(section.id)
+            section.audio_url = entry["url"] if entry else None
+            section.audio_duration_seconds = entry["durationSeconds"] if entry else None
+            section.audio_generated_at = entry["generatedAt"] if entry else None
+
+        master = manifest[MASTER_NAME]
+        ritual.audio_url = master["url"]
+        ritual.audio_duration_seconds = master["durationSeconds"]
+        ritual.audio_generated_at = master["generatedAt"]
+
+
+# Singleton instance
+_ritual_renderer: Optional[RitualRenderer] = None
+
+
+def get_ritual_renderer() -> RitualRenderer:
+    """Get or create ritual renderer instance."""
+    global _ritual_renderer
+    if _ritual_renderer is None:
+        _ritual_renderer = RitualRenderer()
+    return _ritual_renderer
@@ -0,0 +1,193 @@
+"""Full-text search over rituals, using SQLite FTS5."""
+
+import html
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+from ..logging_config import get_logger
+from ..models.ritual import Ritual
+from .ritual_index import RitualIndex, RitualIndexEntry
+
+logger = get_logger(__name__)
+
+# Documents are keyed by the rowid of ritual_search_docs, so updates and deletes are primary-key lookups
+SEARCH_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ritual_search_docs (
+    ritual_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS ritual_search USING fts5(
+    title, instructions, tags, segments,
+    tokenize = 'porter unicode61 remove_diacritics 2'
+);
+"""
+
+# bm25 weight of each column, in schema order: a title match outranks one in tags, intention or segment text
+COLUMN_WEIGHTS = (10.0, 3.0, 5.0, 1.0)
+
+SNIPPET_START = "<mark>"
+SNIPPET_END = "</mark>"
+SNIPPET_TOKENS = 16
+
+# FTS5 marks matches with these; they become SNIPPET_START/END once the text is HTML-escaped
+_MATCH_START = "\x02"
+_MATCH_END = "\x03"
+_STRIP_MARKERS = str.maketrans("", "", _MATCH_START + _MATCH_END)
+
+# Rituals indexed per transaction when rebuilding
+REINDEX_BATCH_SIZE = 500
+
+
+class SearchHit:
+    """One search result: a ritual summary with its relevance and a highlighted excerpt."""
+
+    __slots__ = ("entry", "score", "snippet")
+
+    def __init__(self, entry: RitualIndexEntry, score: float, snippet: str):
+        self.entry = entry
+        self.score = score  # Higher is more relevant
+        self.snippet = snippet
+
+
+def match_expression(query: str) -> Optional[str]:
+    """
+    FTS5 query matching rituals that contain every word of a user query.
+
+    Words are quoted, so FTS5 operators in the input are searched for as
+    text. The last word also matches as a prefix, for search-as-you-type.
+    Returns None if the query has no words.
+    """
+    words = re.findall(r"\w+", query)
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words) + "*"
+
+
+def write_document(conn: sqlite3.Connection, ritual: Ritual, version: int = 0) -> None:
+    """Index (or re-index) a ritual's title, intention, tags and segment text."""
+    conn.execute(
+        "INSERT INTO ritual_search_docs (ritual_id, version) VALUES (?, ?)"
+        " ON CONFLICT (ritual_id) DO UPDATE SET version = excluded.version",
+        (ritual.id, version),
+    )
+    (rowid,) = conn.execute("SELECT rowid FROM ritual_search_docs WHERE ritual_id = ?", (ritual.id,)).fetchone()
+    conn.execute("DELETE FROM ritual_search WHERE rowid = ?", (rowid,))
+    segments = "\n".join(
+        segment.text for section in ritual.sections for segment in section.segments if segment.text
+    )
+    # Match markers in the text itself would turn into highlight tags
+    columns = [
+        text.translate(_STRIP_MARKERS) for text in (ritual.title, ritual.instructions, " ".join(ritual.tags), segments)
+    ]
+    conn.execute(
+        "INSERT INTO ritual_search (rowid, title, instructions, tags, segments) VALUES (?, ?, ?, ?, ?)",
+        (rowid, *columns),
+    )
+
+
+def delete_document(conn: sqlite3.Connection, ritual_id: str) -> None:
+    row = conn.execute("SELECT rowid FROM ritual_search_docs WHERE ritual_id = ?", (ritual_id,)).fetchone()
+    if row is not None:
+        conn.execute("DELETE FROM ritual_search WHERE rowid = ?", row)
+        conn.execute("DELETE FROM ritual_search_docs WHERE rowid = ?", row)
+
+
+def search_documents(
+    conn: sqlite3.Connection, query: str, limit: int, offset: int = 0
+) -> list[tuple[str, float, str]]:
+    """
+    Rituals matching a user query, most relevant first.
+
+    Returns (ritual_id, score, snippet) tuples, where the snippet is an
+    HTML-escaped excerpt of the best-matching field with matches wrapped in
+    SNIPPET_START/SNIPPET_END, so it's safe to render as HTML.
+    """
+    expression = match_expression(query)
+    if expression is None:
+        return []
+    weights = ", ".join(str(weight) for weight in COLUMN_WEIGHTS)
+    rows = conn.execute(
+        f"SELECT docs.ritual_id, bm25(ritual_search, {weights}) AS score,"
+        " snippet(ritual_search, -1, ?, ?, '…', ?)"
+        " FROM ritual_search JOIN ritual_search_docs AS docs ON docs.rowid = ritual_search.rowid"
+        " WHERE ritual_search MATCH ? ORDER BY score LIMIT ? OFFSET ?",
+        (_MATCH_START, _MATCH_END, SNIPPET_TOKENS, expression, limit, offset),
+    )
+    # bm25 is lower for better matches
+    return [(ritual_id, -score, highlight(snippet)) for ritual_id, score, snippet in rows]
+
+
+def highlight(snippet: str) -> str:
+    """HTML-escape a raw FTS5 snippet, then turn its match markers into SNIPPET_START/SNIPPET_END."""
+    return html.escape(snippet).replace(_MATCH_START, SNIPPET_START).replace(_MATCH_END, SNIPPET_END)
+
+
+class RitualSearchIndex:
+    """
+    Full-text index of the file backend's rituals, in an FTS5 database
+    next to the summary index.
+
+    Each document records the mtime of the ritual file it was built from.
+    On first use the index is reconciled with the summary index: rituals
+    whose file changed (or that aren't indexed yet) are re-indexed and
+    deleted ones are dropped, so only the first start reads every ritual.
+    After that, save_ritual and delete_ritual keep it current. Worker
+    processes share the database (in WAL mode), so no syncing is needed.
+    """
+
+    def __init__(self, db_path: Path, ritual_index: RitualIndex, load_ritual: Callable[[str], Optional[Ritual]]):
+        self.db_path = db_path
+        self._local = threading.local()  # sqlite3 connections are per thread
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SEARCH_SCHEMA)
+        self._reconcile(ritual_index, load_ritual)
+
+    def _connect(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def put(self, ritual: Ritual, mtime_ns: int) -> None:
+        """Index a saved ritual."""
+        with self._connect() as conn:
+            write_document(conn, ritual, mtime_ns)
+
+    def remove(self, ritual_id: str) -> None:
+        """Drop a deleted ritual."""
+        with self._connect() as conn:
+            delete_document(conn, ritual_id)
+
+    def search(self, query: str, limit: int, offset: int = 0) -> list[tuple[str, float, str]]:
+        """Matching (ritual_id, score, snippet), most relevant first (see search_documents)."""
+        return search_documents(self._connect(), query, limit, offset)
+
+    def _reconcile(self, ritual_index: RitualIndex, load_ritual: Callable[[str], Optional[Ritual]]) -> None:
+        conn = self._connect()
+        versions = dict(conn.execute("SELECT ritual_id, version FROM ritual_search_docs"))
+        stale = [entry for entry in ritual_index.entries() if versions.pop(entry.id, None) != entry.mtime_ns]
+
+        for start in range(0, len(stale), REINDEX_BATCH_SIZE):
+            with conn:
+                for entry in stale[start:start + REINDEX_BATCH_SIZE]:
+                    try:
+                        ritual = load_ritual(entry.id)
+                    except Exception:
+                        continue  # Skip invalid files, as listing does
+                    if ritual is not None:
+                        ritual.id = entry.id  # Rituals are addressed by file name
+                        write_document(conn, ritual, entry.mtime_ns)
+        with conn:
+            for ritual_id in versions:
+                delete_document(conn, ritual_id)
+
+        if stale or versions:
+            logger.info(f"Search index updated: {len(stale)} re-indexed, {len(versions)} removed")
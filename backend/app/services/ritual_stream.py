@@ -0,0 +1,205 @@
+"""Virtual concatenated audio streams of rituals, served without rendering a file."""
+
+import bisect
+import mmap
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import aiofiles
+
+from ..logging_config import get_logger
+from ..models.ritual import Ritual
+from .audio_info import iter_mp3_frames, probe_file
+from .ritual_renderer import Part, RenderFormat, fingerprint, render_format, section_parts
+from .storage import StorageService, get_storage_service
+from .wav import wav_header
+
+logger = get_logger(__name__)
+
+# Largest chunk yielded when streaming a byte range
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Ritual indexes kept in memory (each is a few hundred bytes per segment)
+MAX_CACHED_INDEXES = 128
+
+
+class StreamPiece:
+    """A contiguous run of stream bytes: file data, repeated silence, or inline bytes."""
+
+    __slots__ = ("start", "length", "path", "file_offset", "data")
+
+    def __init__(self, start: int, length: int, path: Optional[Path] = None, file_offset: int = 0, data: bytes = b""):
+        self.start = start
+        self.length = length
+        self.path = path  # Source file, or None for silence/inline data
+        self.file_offset = file_offset
+        self.data = data  # Inline bytes, or the silence pattern repeated to fill length
+
+
+class RitualStreamIndex:
+    """
+    Byte-offset index of a ritual's audio as one continuous stream.
+
+    The stream is the ritual's speech files and silences laid end to end in
+    the same format the renderer would write, but nothing is materialized:
+    reads are mapped onto the pieces, found by bisecting their start offsets.
+    """
+
+    def __init__(self, fmt: RenderFormat, pieces: list[StreamPiece], duration_seconds: float, fingerprint: str):
+        self.content_type = "audio/mpeg" if fmt.extension == "mp3" else "audio/wav"
+        self.pieces = pieces
+        self.starts = [piece.start for piece in pieces]
+        self.total_size = pieces[-1].start + pieces[-1].length if pieces else 0
+        self.duration_seconds = duration_seconds
+        self.fingerprint = fingerprint
+
+    def locate(self, offset: int) -> int:
+        """Index of the piece containing byte offset (O(log n))."""
+        return bisect.bisect_right(self.starts, offset) - 1
+
+    async def read(self, start: int, end: int) -> AsyncIterator[bytes]:
+        """Yield the stream's bytes in [start, end) in chunks of at most STREAM_CHUNK_SIZE."""
+        index = self.locate(start)
+        position = start
+        while position < end and index < len(self.pieces):
+            piece = self.pieces[index]
+            piece_end = min(end, piece.start + piece.length)
+
+            if piece.path is not None:
+                async with aiofiles.open(piece.path, "rb") as f:
+                    await f.seek(piece.file_offset + position - piece.start)
+                    while position < piece_end:
+                        chunk = await f.read(min(STREAM_CHUNK_SIZE, piece_end - position))
+                        if not chunk:
+                            raise IOError(f"{piece.path.name} is shorter than its index entry")
+                        position += len(chunk)
+                        yield chunk
+            else:
+                while position < piece_end:
+                    size = min(STREAM_CHUNK_SIZE, piece_end - position)
+                    yield _pattern_slice(piece.data, position - piece.start, size)
+                    position += size
+            index += 1
+
+
+def _pattern_slice(pattern: bytes, offset: int, size: int) -> bytes:
+    """Bytes [offset, offset + size) of pattern repeated indefinitely."""
+    skip = offset % len(pattern)
+    repeats = (skip + size) // len(pattern) + 1
+    return (pattern * repeats)[skip:skip + size]
+
+
+def build_index(parts: list[Part], fmt: RenderFormat, fingerprint: str) -> RitualStreamIndex:
+    """Lay out a ritual's parts as stream pieces."""
+    pieces: list[StreamPiece] = []
+    offset = 0
+    samples = 0
+
+    def add(length: int, **kwargs) -> None:
+        nonlocal offset
+        if length > 0:
+            pieces.append(StreamPiece(offset, length, **kwargs))
+            offset += length
+
+    if fmt.extension == "mp3":
+        template = fmt.mp3_template
+        silent_frame = template.silent_frame()
+        for part in parts:
+            if isinstance(part, Path):
+                with open(part, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                    start = end = None
+                    for frame_offset, header in iter_mp3_frames(buf):
+                        if not header.same_stream(template):
+                            raise ValueError(f"{part.name} does not match the ritual's MP3 format")
+                        start = frame_offset if start is None else start
+                        end = frame_offset + header.length
+                        samples += header.samples
+                if start is not None:
+                    add(end - start, path=part, file_offset=start)
+            else:
+                frames = round(part * template.sample_rate / template.samples)
+                samples += frames * template.samples
+                add(frames * len(silent_frame), data=silent_frame)
+    else:
+        block_align = fmt.channels * 2
+        data_size = 0
+        body: list[tuple[int, dict]] = []
+        for part in parts:
+            if isinstance(part, Path):
+                info = probe_file(part)
+                if (info.sample_rate, info.channels, info.sample_width) != (fmt.sample_rate, fmt.channels, 2):
+                    raise ValueError(f"{part.name} does not match the ritual's WAV format; render the ritual instead")
+                length = info.frame_count * block_align
+                body.append((length, {"path": part, "file_offset": info.data_offset}))
+            else:
+                length = round(part * fmt.sample_rate) * block_align
+                body.append((length, {"data": b"\x00" * block_align}))
+            data_size += length
+
+        # The total size is known up front, so the header carries real sizes
+        header = wav_header(fmt.sample_rate, fmt.channels, data_size=data_size)
+        add(len(header), data=header)
+        for length, kwargs in body:
+            add(length, **kwargs)
+        samples = data_size // block_align
+
+    return RitualStreamIndex(fmt, pieces, samples / fmt.sample_rate, fingerprint)
+
+
+class RitualStreamService:
+    """Builds and caches stream indexes, rebuilding one when its ritual's audio changes."""
+
+    def __init__(self, storage_service: Optional[StorageService] = None, max_indexes: int = MAX_CACHED_INDEXES):
+        self._storage = storage_service
+        self.max_indexes = max_indexes
+        self._indexes: OrderedDict[str, RitualStreamIndex] = OrderedDict()  # ritual_id -> index, LRU first
+        self._lock = threading.Lock()  # Indexes are built on worker threads
+
+    @property
+    def storage(self) -> StorageService:
+        return self._storage or get_storage_service()
+
+    def get_index(self, ritual: Ritual) -> RitualStreamIndex:
+        """
+        Get the stream index for a ritual.
+
+        Raises:
+            MissingAudioError: a text segment has no audio yet
+            ValueError: the ritual has nothing to stream, or its audio can't be joined
+        """
+        audio = self.storage.segment_audio(ritual.id)
+        parts = [part for section in ritual.sections for part in section_parts(audio, section)]
+        if not parts:
+            raise ValueError("Ritual has no segments to stream")
+
+        fmt = render_format(parts)
+        current = fingerprint(fmt, parts)
+        with self._lock:
+            index = self._indexes.get(ritual.id)
+            if index is not None and index.fingerprint == current:
+                self._indexes.move_to_end(ritual.id)
+                return index
+
+        # Build outside the lock; a concurrent build of the same ritual just replaces this one
+        index = build_index(parts, fmt, current)
+        with self._lock:
+            self._indexes[ritual.id] = index
+            self._indexes.move_to_end(ritual.id)
+            while len(self._indexes) > self.max_indexes:
+                self._indexes.popitem(last=False)
+        logger.debug(f"Built stream index for ritual {ritual.id}: {len(index.pieces)} pieces, {index.total_size} bytes")
+        return index
+
+
+# Singleton instance
+_ritual_stream_service: Optional[RitualStreamService] = None
+
+
+def get_ritual_stream_service() -> RitualStreamService:
+    """Get or create ritual stream service instance."""
+    global _ritual_stream_service
+    if _ritual_stream_service is None:
+        _ritual_stream_service = RitualStreamService()
+    return _ritual_stream_service
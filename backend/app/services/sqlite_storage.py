@@ -0,0 +1,302 @@
+"""SQLite storage backend for rituals."""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+
+from ..config import get_settings
+from ..logging_config import get_logger
+from ..models.ritual import Ritual
+from .ritual_index import RitualIndexEntry
+from .ritual_search import SEARCH_SCHEMA, SearchHit, delete_document, search_documents, write_document
+from .storage import PreconditionFailedError, StorageService, etag_matches, ritual_etag
+
+logger = get_logger(__name__)
+
+SCHEMA_VERSION = 2  # 2 added the full-text search tables
+
+# Rows fetched per round trip when streaming all rituals
+ITER_BATCH_SIZE = 500
+
+SUMMARY_COLUMNS = "id, title, tags, duration, tone, audio_status, is_template, created_at, updated_at"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rituals (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    tags TEXT NOT NULL,
+    duration INTEGER NOT NULL,
+    tone TEXT NOT NULL,
+    audio_status TEXT NOT NULL,
+    is_template INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS rituals_created ON rituals (created_at, id);
+CREATE INDEX IF NOT EXISTS rituals_tone ON rituals (tone, created_at, id);
+CREATE INDEX IF NOT EXISTS rituals_audio_status ON rituals (audio_status, created_at, id);
+CREATE INDEX IF NOT EXISTS rituals_is_template ON rituals (is_template, created_at, id);
+CREATE TABLE IF NOT EXISTS ritual_tags (
+    tag TEXT NOT NULL,
+    ritual_id TEXT NOT NULL REFERENCES rituals (id) ON DELETE CASCADE,
+    PRIMARY KEY (tag, ritual_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ritual_tags_ritual ON ritual_tags (ritual_id);
+"""
+
+
+def _entry(row: tuple) -> RitualIndexEntry:
+    """Summary from a row of SUMMARY_COLUMNS."""
+    ritual_id, title, tags, duration, tone, audio_status, is_template, created_at, updated_at = row
+    return RitualIndexEntry(
+        ritual_id, title, tuple(json.loads(tags)), duration, tone, audio_status,
+        bool(is_template), created_at, updated_at, 0,
+    )
+
+
+class SQLiteStorageService(StorageService):
+    """
+    Storage service that keeps rituals in a SQLite database.
+
+    Rituals are stored as JSON alongside indexed summary columns, so listing,
+    filtering and paging are index scans. The database runs in WAL mode, so
+    readers never block the writer and several worker processes can share it.
+    Audio, renders and jobs stay on the filesystem as with StorageService.
+    """
+
+    def __init__(self, storage_path: Optional[Path] = None, db_path: Optional[Path] = None):
+        super().__init__(storage_path)
+        settings = get_settings()
+        self.db_path = db_path or settings.sqlite_path or self.storage_path / "rituals.db"
+        self._local = threading.local()  # sqlite3 connections are per thread
+
+        with self._connect() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            conn.executescript(SCHEMA + SEARCH_SCHEMA)
+            if version < 2:
+                self._reindex(conn)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")  # Durable at checkpoints; safe with WAL
+            conn.execute("PRAGMA foreign_keys = ON")
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    @property
+    def ritual_index(self):
+        raise AttributeError("SQLiteStorageService has no file index; use the summary methods")
+
+    @property
+    def search_index(self):
+        raise AttributeError("SQLiteStorageService searches its own database; use search_rituals")
+
+    @staticmethod
+    def _reindex(conn: sqlite3.Connection) -> None:
+        """Build the search tables from the stored rituals (for databases created before search)."""
+        cursor = conn.execute("SELECT data FROM rituals")
+        count = 0
+        while rows := cursor.fetchmany(ITER_BATCH_SIZE):
+            for (data,) in rows:
+                write_document(conn, Ritual.model_validate_json(data))
+                count += 1
+        if count:
+            logger.info(f"Indexed {count} rituals for search")
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection, ritual: Ritual) -> None:
+        conn.execute(
+            "INSERT INTO rituals"
+            " (id, title, tags, duration, tone, audio_status, is_template, created_at, updated_at, data)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (id) DO UPDATE SET title = excluded.title, tags = excluded.tags,"
+            " duration = excluded.duration, tone = excluded.tone, audio_status = excluded.audio_status,"
+            " is_template = excluded.is_template, created_at = excluded.created_at,"
+            " updated_at = excluded.updated_at, data = excluded.data",
+            (
+                ritual.id, ritual.title, json.dumps(ritual.tags), ritual.duration, ritual.tone,
+                ritual.audio_status, int(ritual.is_template), ritual.created_at, ritual.updated_at,
+                ritual.model_dump_json(by_alias=True),
+            ),
+        )
+        conn.execute("DELETE FROM ritual_tags WHERE ritual_id = ?", (ritual.id,))
+        conn.executemany(
+            "INSERT OR IGNORE INTO ritual_tags (tag, ritual_id) VALUES (?, ?)",
+            [(tag, ritual.id) for tag in ritual.tags],
+        )
+        write_document(conn, ritual)
+
+    def save_ritual(self, ritual: Ritual, if_match: Optional[Iterable[str]] = None) -> str:
+        """Insert or replace a ritual (conditionally with if_match, as in StorageService)."""
+        conn = self._connect()
+        with conn:
+            if if_match is not None:
+                conn.execute("BEGIN IMMEDIATE")  # Take the write lock before reading the stored version
+                row = conn.execute("SELECT data FROM rituals WHERE id = ?", (ritual.id,)).fetchone()
+                stored = Ritual.model_validate_json(row[0]) if row else None
+                if not etag_matches(ritual_etag(stored) if stored else None, if_match):
+                    raise PreconditionFailedError(ritual.id)
+            self._write(conn, ritual)
+        return ritual.id
+
+    def save_rituals(self, rituals: Iterable[Ritual]) -> int:
+        """Save many rituals in one transaction."""
+        count = 0
+        with self._connect() as conn:
+            for ritual in rituals:
+                self._write(conn, ritual)
+                count += 1
+        return count
+
+    def load_ritual(self, ritual_id: str, readonly: bool = False) -> Optional[Ritual]:
+        # Rows are read by primary key, so there is no file to version the parsed cache against
+        row = self._connect().execute("SELECT data FROM rituals WHERE id = ?", (ritual_id,)).fetchone()
+        return Ritual.model_validate_json(row[0]) if row else None
+
+    def load_rituals(self, ritual_ids: list[str], readonly: bool = False) -> list[Ritual]:
+        """Load several rituals in the given order, skipping unknown IDs."""
+        ritual_ids = list(dict.fromkeys(ritual_ids))
+        found: dict[str, Ritual] = {}
+        conn = self._connect()
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(ritual_ids), 500):
+            chunk = ritual_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for ritual_id, data in conn.execute(f"SELECT id, data FROM rituals WHERE id IN ({placeholders})", chunk):
+                found[ritual_id] = Ritual.model_validate_json(data)
+        return [found[ritual_id] for ritual_id in ritual_ids if ritual_id in found]
+
+    def iter_rituals(self) -> Iterator[Ritual]:
+        """
+        Yield all rituals newest first, fetching in keyset-paged batches.
+
+        No cursor stays open between batches, so the iterator can be advanced
+        from different threads (the export runs each step on the storage I/O
+        pool, and sqlite3 objects only work on the thread that created them).
+        """
+        sql = "SELECT created_at, id, data FROM rituals{} ORDER BY created_at DESC, id DESC LIMIT ?"
+        rows = self._connect().execute(sql.format(""), (ITER_BATCH_SIZE,)).fetchall()
+        while rows:
+            for _, _, data in rows:
+                yield Ritual.model_validate_json(data)
+            if len(rows) < ITER_BATCH_SIZE:
+                return
+            last_created_at, last_id, _ = rows[-1]
+            rows = self._connect().execute(
+                sql.format(" WHERE (created_at, id) < (?, ?)"), (last_created_at, last_id, ITER_BATCH_SIZE)
+            ).fetchall()
+
+    def list_ritual_summaries(self) -> list[RitualIndexEntry]:
+        rows = self._connect().execute(f"SELECT {SUMMARY_COLUMNS} FROM rituals ORDER BY created_at DESC, id DESC")
+        return [_entry(row) for row in rows]
+
+    def page_ritual_summaries(
+        self,
+        before: Optional[tuple[str, str]] = None,
+        limit: Optional[int] = None,
+        tags: Optional[list[str]] = None,
+        tone: Optional[str] = None,
+        audio_status: Optional[str] = None,
+        is_template: Optional[bool] = None,
+    ) -> tuple[list[RitualIndexEntry], Optional[tuple[str, str]]]:
+        """Filtered page of ritual summaries, newest first (see StorageService)."""
+        where, params = [], []
+        if before is not None:
+            where.append("(created_at, id) < (?, ?)")
+            params += list(before)
+        for column, value in (("tone", tone), ("audio_status", audio_status), ("is_template", is_template)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(int(value) if isinstance(value, bool) else value)
+        for tag in dict.fromkeys(tags or ()):
+            where.append("EXISTS (SELECT 1 FROM ritual_tags WHERE tag = ? AND ritual_id = rituals.id)")
+            params.append(tag)
+
+        sql = f"SELECT {SUMMARY_COLUMNS} FROM rituals"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit + 1)  # One extra row tells whether there's another page
+
+        entries = [_entry(row) for row in self._connect().execute(sql, params)]
+        if limit is not None and len(entries) > limit:
+            entries = entries[:limit]
+            return entries, entries[-1].sort_key
+        return entries, None
+
+    def search_rituals(self, query: str, limit: int = 20, offset: int = 0) -> list[SearchHit]:
+        """Full-text search, most relevant first (see StorageService)."""
+        hits = []
+        for ritual_id, score, snippet in search_documents(self._connect(), query, limit, offset):
+            entry = self.get_ritual_summary(ritual_id)
+            if entry is not None:
+                hits.append(SearchHit(entry, score, snippet))
+        return hits
+
+    def get_ritual_summary(self, ritual_id: str) -> Optional[RitualIndexEntry]:
+        row = self._connect().execute(f"SELECT {SUMMARY_COLUMNS} FROM rituals WHERE id = ?", (ritual_id,)).fetchone()
+        return _entry(row) if row else None
+
+    def count_rituals(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM rituals").fetchone()[0]
+
+    def ritual_exists(self, ritual_id: str) -> bool:
+        return self._connect().execute("SELECT 1 FROM rituals WHERE id = ?", (ritual_id,)).fetchone() is not None
+
+    def delete_ritual(self, ritual_id: str) -> bool:
+        """Delete ritual and all associated audio files."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM rituals WHERE id = ?", (ritual_id,))
+            delete_document(conn, ritual_id)
+
+        self._delete_ritual_audio(ritual_id)
+
+        return True
+
+
+def migrate_rituals(
+    source: StorageService,
+    target: StorageService,
+    batch_size: int = ITER_BATCH_SIZE,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Copy every ritual from one storage backend to another.
+
+    Rituals are streamed from the source and saved in batches, so memory use
+    doesn't grow with the number of rituals. Existing rituals in the target
+    with the same ID are replaced, so an interrupted migration can be rerun.
+    Returns the number of rituals copied.
+    """
+    copied = 0
+    batch: list[Ritual] = []
+    for ritual in source.iter_rituals():
+        batch.append(ritual)
+        if len(batch) >= batch_size:
+            copied += target.save_rituals(batch)
+            batch = []
+            if progress:
+                progress(copied)
+    if batch:
+        copied += target.save_rituals(batch)
+        if progress:
+            progress(copied)
+    logger.info(f"Migrated {copied} rituals from {type(source).__name__} to {type(target).__name__}")
+    return copied
@@ -1,123 +1,1102 @@
 """File-based storage service for rituals and audio."""
 
+import fcntl
+import hashlib
 import json
+import os
 import shutil
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterable, Iterator, Optional, Union
 
+from ..logging_config import get_logger
 from ..models.ritual import Ritual
+from ..models.audio_job import AudioJob, utc_now_iso
 from ..config import get_settings
+from .audio_access import AudioAccessLog
+from .audio_info import probe_file
+from .ritual_cache import RitualCache
+from .ritual_index import RitualIndex, RitualIndexEntry
+from .ritual_search import RitualSearchIndex, SearchHit
+from .wav import finalize_wav_header
+
+logger = get_logger(__name__)
+
+AUDIO_EXTENSIONS = ("mp3", "wav")
+
+# Name of the per-ritual file recording the size and SHA-256 of each segment's audio
+AUDIO_MANIFEST_NAME = "manifest.json"
+
+# Quota eviction frees space down to this fraction of the budget, so it doesn't run on every pass
+QUOTA_EVICTION_TARGET = 0.9
+
+# Called with (final path, size, sha256) when an audio file is published
+CommitCallback = Callable[[Path, int, str], None]
+
+# Pseudo ritual ID holding the audio of ad-hoc syntheses
+TEMP_AUDIO_ID = "temp"
+
+# Number of lock files rituals are spread over for conditional saves
+RITUAL_LOCK_STRIPES = 64
+
+
+class PreconditionFailedError(Exception):
+    """A conditional save found the stored ritual missing or changed."""
+
+
+def content_etag(data: Union[bytes, str]) -> str:
+    """Strong ETag (quoted) for a representation's bytes."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return f'"{hashlib.sha256(data).hexdigest()[:32]}"'
+
+
+def ritual_etag(ritual: Ritual) -> str:
+    """ETag of a ritual: a hash of its JSON, the same bytes GET /api/rituals/{id} returns."""
+    return content_etag(ritual.model_dump_json(by_alias=True))
+
+
+def etag_matches(etag: Optional[str], if_match: Iterable[str]) -> bool:
+    """Whether a stored ritual's ETag (None if missing) satisfies If-Match (strong comparison)."""
+    return etag is not None and any(tag == "*" or tag == etag for tag in if_match)
+
+
+def shard_prefix(key: str) -> Path:
+    """
+    Directories a key lives under in the sharded layout: ab/cd.
+
+    Taken from a hash of the key, so entries spread evenly over 65,536 leaf
+    directories whatever the ID format.
+    """
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return Path(digest[:2], digest[2:4])
+
+
+def is_shard_name(name: str) -> bool:
+    """Whether a directory name is a shard level (two hex digits) rather than an entry."""
+    return len(name) == 2 and all(c in "0123456789abcdef" for c in name)
+
+
+def temp_path_for(path: Path) -> Path:
+    """Hidden, unique temp path next to path, for writing before an atomic rename."""
+    return path.with_name(f".{path.name}.{uuid.uuid4().hex}.part")
+
+
+def fsync_path(path: Path) -> None:
+    """Flush a file's data to disk."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def file_sha256(path: Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def atomic_write(path: Path, data: Union[bytes, str], durable: bool = True) -> None:
+    """
+    Replace a file's content in one step.
+
+    Readers (and a restart after a crash) see either the old file or the
+    complete new one, never a partial write. With durable, the data is also
+    flushed to disk before the rename.
+    """
+    temp_path = temp_path_for(path)
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(data.encode("utf-8") if isinstance(data, str) else data)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+def link_or_copy(source: Path, target: Path) -> None:
+    """
+    Atomically place source's content at target.
+
+    Uses a hard link when possible so the bytes live on disk once, falling
+    back to a copy (e.g. across filesystems).
+    """
+    temp_path = temp_path_for(target)
+    try:
+        os.link(source, temp_path)
+    except OSError:
+        shutil.copyfile(source, temp_path)
+    os.replace(temp_path, target)
+
+
+def _reclaimable(path: Path) -> tuple[int, int]:
+    """
+    Files under path and the bytes deleting them would free.
+
+    Files with other hard links (segments linked from the TTS cache) are
+    counted but free nothing.
+    """
+    paths = [Path(d, name) for d, _, names in os.walk(path) for name in names] if path.is_dir() else [path]
+    files, size = 0, 0
+    for file_path in paths:
+        try:
+            stat = file_path.lstat()
+        except FileNotFoundError:
+            continue
+        files += 1
+        if stat.st_nlink == 1:
+            size += stat.st_size
+    return files, size
+
+
+class AudioWriter:
+    """
+    Append-only writer for an audio file that is published atomically.
+
+    Chunks go to a hidden temp file next to the target; commit() flushes it
+    to disk and renames it into place, so readers never see a partially
+    written file, even after a crash.
+    """
+
+    def __init__(self, final_path: Path, url: str, on_commit: Optional[CommitCallback] = None):
+        self.final_path = final_path
+        self.url = url
+        self.temp_path = temp_path_for(final_path)
+        self.bytes_written = 0
+        self._on_commit = on_commit
+        self._hash = hashlib.sha256()
+        self._file = open(self.temp_path, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        """Append a chunk of audio."""
+        self._file.write(chunk)
+        self._hash.update(chunk)
+        self.bytes_written += len(chunk)
+
+    def commit(self) -> str:
+        """Publish the file at its final path and return its URL."""
+        self._file.close()
+        if self.final_path.suffix == ".wav":
+            finalize_wav_header(self.temp_path)
+            digest = file_sha256(self.temp_path)  # The header changed after streaming
+        else:
+            digest = self._hash.hexdigest()
+        fsync_path(self.temp_path)
+        os.replace(self.temp_path, self.final_path)
+        if self._on_commit is not None:
+            self._on_commit(self.final_path, self.bytes_written, digest)
+        return self.url
+
+    def abort(self) -> None:
+        """Discard the partially written file."""
+        self._file.close()
+        self.temp_path.unlink(missing_ok=True)
 
 
 class StorageService:
-    """Handles file-based storage for rituals and audio files."""
+    """
+    Handles file-based storage for rituals and audio files.
+
+    In the flat layout, rituals are rituals/{id}.json and audio is
+    audio/{id}/. The sharded layout adds a hash prefix (rituals/ab/cd/{id}.json,
+    audio/ab/cd/{id}/, and audio/temp/ab/cd/ for ad-hoc audio) so no directory
+    grows past a few entries. Reads fall back to the other layout, so a
+    migration can run while the service is live, and audio URLs never
+    include the layout.
+    """
 
-    def __init__(self, storage_path: Optional[Path] = None):
+    def __init__(self, storage_path: Optional[Path] = None, layout: Optional[str] = None):
         settings = get_settings()
         self.storage_path = storage_path or settings.storage_path
+        self.layout = layout or settings.storage_layout
+        self.sharded = self.layout == "sharded"
         self.rituals_path = self.storage_path / "rituals"
         self.audio_path = self.storage_path / "audio"
+        self.jobs_path = self.storage_path / "jobs"
+        self.index_path = self.storage_path / "index"
+        self.trash_path = self.storage_path / "trash"  # Tombstoned audio awaiting deletion
 
         # Ensure directories exist
         self.rituals_path.mkdir(parents=True, exist_ok=True)
         self.audio_path.mkdir(parents=True, exist_ok=True)
+        self.jobs_path.mkdir(parents=True, exist_ok=True)
+
+        self._ritual_index: Optional[RitualIndex] = None
+        self._search_index: Optional[RitualSearchIndex] = None
+        self.ritual_cache = RitualCache(settings.ritual_cache_size)
+        self.audio_access = AudioAccessLog(self.index_path / "audio_access.json")
+
+    @property
+    def ritual_index(self) -> RitualIndex:
+        """Summary index of stored rituals, loaded (and reconciled with disk) on first use."""
+        if self._ritual_index is None:
+            self._ritual_index = RitualIndex(self.index_path, self.rituals_path)
+        return self._ritual_index
+
+    @property
+    def search_index(self) -> RitualSearchIndex:
+        """Full-text index of stored rituals, loaded (and reconciled with the summary index) on first use."""
+        if self._search_index is None:
+            self._search_index = RitualSearchIndex(self.index_path / "search.db", self.ritual_index, self.load_ritual)
+        return self._search_index
+
+    def _ritual_file_in(self, ritual_id: str, sharded: bool) -> Path:
+        directory = self.rituals_path / shard_prefix(ritual_id) if sharded else self.rituals_path
+        return directory / f"{ritual_id}.json"
+
+    def _audio_dir_in(self, ritual_id: str, segment_id: Optional[str], sharded: bool) -> Path:
+        if ritual_id == TEMP_AUDIO_ID:
+            # Ad-hoc audio is sharded by segment, as there's no ritual to group it
+            directory = self.audio_path / TEMP_AUDIO_ID
+            return directory / shard_prefix(segment_id) if sharded and segment_id else directory
+        return self.audio_path / shard_prefix(ritual_id) / ritual_id if sharded else self.audio_path / ritual_id
+
+    @staticmethod
+    def _resolve(path: Path, other: Path) -> Path:
+        """path if it exists, else other if that does (not migrated yet), else path."""
+        if path.exists() or not other.exists():
+            return path
+        return other
+
+    def ritual_file(self, ritual_id: str) -> Path:
+        """Path of a ritual's JSON file, in whichever layout holds it."""
+        return self._resolve(
+            self._ritual_file_in(ritual_id, self.sharded),
+            self._ritual_file_in(ritual_id, not self.sharded),
+        )
+
+    def ritual_audio_dir(self, ritual_id: str, segment_id: Optional[str] = None) -> Path:
+        """
+        Directory holding a ritual's audio, in whichever layout holds it.
+
+        For temp audio the directory depends on the segment ID too.
+        """
+        return self._resolve(
+            self._audio_dir_in(ritual_id, segment_id, self.sharded),
+            self._audio_dir_in(ritual_id, segment_id, not self.sharded),
+        )
+
+    def _writable_audio_dir(self, ritual_id: str, segment_id: Optional[str] = None) -> Path:
+        """
+        This layout's audio directory for a ritual, created if needed.
+
+        A ritual's audio still in the other layout is moved over first, so
+        new files never land next to a directory that's about to move.
+        """
+        directory = self._audio_dir_in(ritual_id, segment_id, self.sharded)
+        if ritual_id != TEMP_AUDIO_ID and not directory.exists():
+            self._move(self._audio_dir_in(ritual_id, None, not self.sharded), directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory
+
+    @staticmethod
+    def _move(source: Path, target: Path) -> bool:
+        """
+        Move a file or directory to its place in the other layout, never
+        replacing an existing target. Safe against concurrent moves of the
+        same entry; returns whether this call moved it.
+        """
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            if source.is_dir():
+                os.rename(source, target)  # Fails if another mover already filled target
+            else:
+                os.link(source, target)  # Unlike rename, won't clobber a newer save
+                source.unlink()
+        except FileExistsError:
+            source.unlink(missing_ok=True)  # A newer copy was saved in this layout
+            return False
+        except OSError:
+            return False
+        return True
+
+    @staticmethod
+    def _layout_entries(root: Path, sharded: bool) -> list[os.DirEntry]:
+        """Entries stored under root in one layout (hidden files and the other layout's shards skipped)."""
+        if not sharded:
+            with os.scandir(root) as it:
+                return [e for e in it if not e.name.startswith(".") and not is_shard_name(e.name)]
+
+        entries = []
+        with os.scandir(root) as level1:
+            for shard1 in level1:
+                if not (is_shard_name(shard1.name) and shard1.is_dir()):
+                    continue
+                with os.scandir(shard1.path) as level2:
+                    for shard2 in level2:
+                        if not (is_shard_name(shard2.name) and shard2.is_dir()):
+                            continue
+                        with os.scandir(shard2.path) as it:
+                            entries.extend(e for e in it if not e.name.startswith("."))
+        return entries
+
+    def migrate_layout(self, progress: Optional[Callable[[int], None]] = None) -> dict:
+        """
+        Move rituals and ritual audio stored in the other layout into this one.
+
+        Safe to run while the service is serving: each ritual file and each
+        ritual's audio directory moves with a single link or rename, and
+        readers fall back to the other layout for anything not moved yet.
+        Temp audio stays where it is (it's resolved in both layouts and is
+        short-lived). Can be rerun after an interruption.
+
+        Returns dict with the number of ritual files and audio directories moved.
+        """
+        moved = {"rituals": 0, "audio_dirs": 0}
+        for entry in self._layout_entries(self.rituals_path, not self.sharded):
+            if entry.name.endswith(".json") and entry.is_file():
+                ritual_id = entry.name[:-len(".json")]
+                if self._move(Path(entry.path), self._ritual_file_in(ritual_id, self.sharded)):
+                    moved["rituals"] += 1
+                    if progress and moved["rituals"] % 1000 == 0:
+                        progress(moved["rituals"])
+
+        for entry in self._layout_entries(self.audio_path, not self.sharded):
+            if entry.name != TEMP_AUDIO_ID and entry.is_dir():
+                if self._move(Path(entry.path), self._audio_dir_in(entry.name, None, self.sharded)):
+                    moved["audio_dirs"] += 1
 
-    def save_ritual(self, ritual: Ritual) -> str:
-        """Save ritual to JSON file."""
-        file_path = self.rituals_path / f"{ritual.id}.json"
-        with open(file_path, "w") as f:
-            json.dump(ritual.model_dump(by_alias=True), f, indent=2)
+        logger.info(f"Moved {moved['rituals']} rituals and {moved['audio_dirs']} audio directories to the {self.layout} layout")
+        return moved
+
+    @contextmanager
+    def _ritual_lock(self, ritual_id: str) -> Iterator[None]:
+        """
+        Exclusive lock on saves of a ritual, across threads and processes.
+
+        Rituals share RITUAL_LOCK_STRIPES lock files, so this costs no file
+        per ritual; unrelated saves occasionally wait on each other briefly.
+        """
+        stripe = int(hashlib.sha256(ritual_id.encode("utf-8")).hexdigest()[:8], 16) % RITUAL_LOCK_STRIPES
+        lock_path = self.index_path / "locks" / f"ritual-{stripe:02d}.lock"
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def save_ritual(self, ritual: Ritual, if_match: Optional[Iterable[str]] = None) -> str:
+        """
+        Save ritual to JSON file.
+
+        With if_match (ETags, or "*" for any), the save only happens if the
+        stored ritual exists and its ritual_etag is one of them; otherwise
+        PreconditionFailedError is raised. The check and the write happen
+        under the ritual's lock, so two conditional saves based on the same
+        version can't both succeed.
+        """
+        with self._ritual_lock(ritual.id):
+            if if_match is not None:
+                stored = self.load_ritual(ritual.id, readonly=True)
+                if not etag_matches(ritual_etag(stored) if stored else None, if_match):
+                    raise PreconditionFailedError(ritual.id)
+
+            file_path = self._ritual_file_in(ritual.id, self.sharded)
+            if self.sharded:
+                file_path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write(file_path, json.dumps(ritual.model_dump(by_alias=True), indent=2))
+            self._ritual_file_in(ritual.id, not self.sharded).unlink(missing_ok=True)  # Superseded
+            self.ritual_cache.discard(ritual.id)
+            mtime_ns = file_path.stat().st_mtime_ns
+            self.ritual_index.put(ritual, mtime_ns)
+            self.search_index.put(ritual, mtime_ns)
         return ritual.id
 
-    def load_ritual(self, ritual_id: str) -> Optional[Ritual]:
-        """Load ritual from JSON file."""
-        file_path = self.rituals_path / f"{ritual_id}.json"
-        if not file_path.exists():
-            return None
-        with open(file_path, "r") as f:
-            data = json.load(f)
-        return Ritual(**data)
+    def load_ritual(self, ritual_id: str, readonly: bool = False) -> Optional[Ritual]:
+        """
+        Load ritual from JSON file.
 
-    def list_rituals(self) -> list[Ritual]:
-        """List all rituals."""
-        rituals = []
-        for file_path in self.rituals_path.glob("*.json"):
+        With readonly, the ritual may come from (and is kept in) the parsed
+        ritual cache and is shared with other callers, so it must not be
+        modified. Without it, the caller gets its own freshly parsed copy.
+        """
+        try:
+            file_path = self.ritual_file(ritual_id)
+            stat = file_path.stat()
+        except FileNotFoundError:
+            # May have just been moved by a layout migration
+            file_path = self.ritual_file(ritual_id)
+            try:
+                stat = file_path.stat()
+            except FileNotFoundError:
+                return None
+
+        def parse() -> Ritual:
+            with open(file_path, "r") as f:
+                data = json.load(f)
+            return Ritual(**data)
+
+        if not readonly:
+            return parse()
+        return self.ritual_cache.get(ritual_id, (stat.st_ino, stat.st_mtime_ns, stat.st_size), parse)
+
+    def save_rituals(self, rituals: Iterable[Ritual]) -> int:
+        """Save many rituals; returns how many were saved."""
+        count = 0
+        for ritual in rituals:
+            self.save_ritual(ritual)
+            count += 1
+        return count
+
+    def iter_rituals(self) -> Iterator[Ritual]:
+        """Yield all rituals newest first, loading one at a time."""
+        for entry in self.ritual_index.entries():
             try:
-                with open(file_path, "r") as f:
-                    data = json.load(f)
-                rituals.append(Ritual(**data))
+                ritual = self.load_ritual(entry.id)
             except Exception:
                 continue  # Skip invalid files
-        # Sort by created_at descending
-        rituals.sort(key=lambda r: r.created_at, reverse=True)
+            if ritual is not None:
+                yield ritual
+
+    def list_rituals(self) -> list[Ritual]:
+        """List all rituals, newest first."""
+        return list(self.iter_rituals())
+
+    def list_ritual_summaries(self) -> list[RitualIndexEntry]:
+        """List ritual summaries, newest first, without reading ritual files."""
+        return self.ritual_index.entries()
+
+    def get_ritual_summary(self, ritual_id: str) -> Optional[RitualIndexEntry]:
+        """Summary of one ritual, without reading its file."""
+        return self.ritual_index.get(ritual_id)
+
+    def count_rituals(self) -> int:
+        """Number of stored rituals."""
+        return len(self.ritual_index)
+
+    def page_ritual_summaries(
+        self,
+        before: Optional[tuple[str, str]] = None,
+        limit: Optional[int] = None,
+        tags: Optional[list[str]] = None,
+        tone: Optional[str] = None,
+        audio_status: Optional[str] = None,
+        is_template: Optional[bool] = None,
+    ) -> tuple[list[RitualIndexEntry], Optional[tuple[str, str]]]:
+        """
+        Filtered page of ritual summaries, newest first.
+
+        A ritual matches if it has all the given tags and equals every other
+        given filter. Returns the page and the (created_at, id) key to pass
+        as `before` for the next page, or None on the last page.
+        """
+        wanted_tags = set(tags or ())
+
+        def match(entry: RitualIndexEntry) -> bool:
+            return (
+                (tone is None or entry.tone == tone)
+                and (audio_status is None or entry.audio_status == audio_status)
+                and (is_template is None or entry.is_template == is_template)
+                and wanted_tags.issubset(entry.tags)
+            )
+
+        return self.ritual_index.page(before, limit, match)
+
+    def search_rituals(self, query: str, limit: int = 20, offset: int = 0) -> list[SearchHit]:
+        """
+        Rituals whose title, intention, tags or segment text contain every
+        word of the query (the last word as a prefix), most relevant first.
+        """
+        hits = []
+        for ritual_id, score, snippet in self.search_index.search(query, limit, offset):
+            entry = self.get_ritual_summary(ritual_id)
+            if entry is not None:
+                hits.append(SearchHit(entry, score, snippet))
+        return hits
+
+    def load_rituals(self, ritual_ids: list[str], readonly: bool = False) -> list[Ritual]:
+        """Load several rituals in the given order, skipping unknown IDs (see load_ritual)."""
+        rituals = []
+        for ritual_id in dict.fromkeys(ritual_ids):
+            if self.get_ritual_summary(ritual_id) is None:
+                continue
+            ritual = self.load_ritual(ritual_id, readonly)
+            if ritual is not None:
+                rituals.append(ritual)
         return rituals
 
+    def ritual_exists(self, ritual_id: str) -> bool:
+        """Check if a ritual exists without loading it."""
+        return self.ritual_file(ritual_id).exists()
+
     def delete_ritual(self, ritual_id: str) -> bool:
         """Delete ritual and all associated audio files."""
-        # Delete ritual JSON
-        ritual_file = self.rituals_path / f"{ritual_id}.json"
-        if ritual_file.exists():
-            ritual_file.unlink()
+        # Delete ritual JSON (from both layouts, in case a migration is under way)
+        for sharded in (self.sharded, not self.sharded):
+            self._ritual_file_in(ritual_id, sharded).unlink(missing_ok=True)
+        self.ritual_cache.discard(ritual_id)
+        self.ritual_index.remove(ritual_id)
+        self.search_index.remove(ritual_id)
+
+        self._delete_ritual_audio(ritual_id)
 
-        # Delete audio directory for this ritual
-        audio_dir = self.audio_path / ritual_id
-        if audio_dir.exists():
-            shutil.rmtree(audio_dir)
+        return True
+
+    def _delete_ritual_audio(self, ritual_id: str) -> None:
+        """Tombstone a ritual's audio directory in either layout (see purge_tombstones)."""
+        for sharded in (self.sharded, not self.sharded):
+            self._tombstone(self._audio_dir_in(ritual_id, None, sharded))
+
+    def _tombstone(self, path: Path) -> bool:
+        """
+        Move a directory into the trash, to be deleted in the background.
 
+        One rename, so deleting a ritual costs the same however much audio it
+        had; the files stop being reachable immediately.
+        """
+        self.trash_path.mkdir(exist_ok=True)
+        try:
+            os.rename(path, self.trash_path / f"{path.name}.{uuid.uuid4().hex}")
+        except FileNotFoundError:
+            return False
         return True
 
+    def purge_tombstones(self) -> dict:
+        """
+        Delete everything in the trash.
+
+        Returns dict with the number of entries purged, files removed and
+        bytes reclaimed.
+        """
+        result = {"entries": 0, "files": 0, "bytes": 0}
+        if not self.trash_path.exists():
+            return result
+        with os.scandir(self.trash_path) as it:
+            tombstones = list(it)
+        for tombstone in tombstones:
+            files, size = _reclaimable(Path(tombstone.path))
+            if tombstone.is_dir(follow_symlinks=False):
+                shutil.rmtree(tombstone.path, ignore_errors=True)
+            else:
+                Path(tombstone.path).unlink(missing_ok=True)
+            result["entries"] += 1
+            result["files"] += files
+            result["bytes"] += size
+        return result
+
+    def evict_ritual_audio(self, ritual_id: str) -> bool:
+        """
+        Drop a ritual's audio (segments and renders) but keep the ritual.
+
+        The ritual goes back to "pending" and is marked evicted, so a later
+        request for its audio regenerates it. Returns whether there was audio.
+        """
+        evicted = False
+        for sharded in (self.sharded, not self.sharded):
+            evicted = self._tombstone(self._audio_dir_in(ritual_id, None, sharded)) or evicted
+
+        ritual = self.load_ritual(ritual_id)
+        if ritual is not None:
+            ritual.audio_status = "pending"
+            ritual.audio_evicted_at = utc_now_iso()
+            # Renders went with the audio; segment URLs stay valid and trigger regeneration
+            ritual.audio_url = ritual.audio_duration_seconds = ritual.audio_generated_at = None
+            for section in ritual.sections:
+                section.audio_url = section.audio_duration_seconds = section.audio_generated_at = None
+            self.save_ritual(ritual)
+        return evicted
+
+    def enforce_audio_quota(self, max_bytes: int) -> dict:
+        """
+        Evict the audio of the least recently used rituals while over budget.
+
+        Usage counts the bytes deleting each ritual's audio would free (files
+        shared with the TTS cache are budgeted there). A ritual's last use is
+        the latest of three signals, so any recent one keeps it: its
+        audio_access time (touched whenever its segment, render or stream
+        audio is served, and whenever segment or render audio is written),
+        its audio directory's mtime (a write seen from any process, even
+        before that process flushes its access log), and its updatedAt.
+        Playback only shows up in audio_access. Once over budget, rituals are
+        evicted down to QUOTA_EVICTION_TARGET of it; rituals whose audio is
+        being generated are never evicted.
+
+        Returns dict with usage before eviction, the budget, and the evicted
+        ritual IDs and bytes.
+        """
+        usage: list[tuple[float, str, int]] = []  # (last used, ritual ID, bytes)
+        for sharded in (self.sharded, not self.sharded):
+            for entry in self._layout_entries(self.audio_path, sharded):
+                if entry.name == TEMP_AUDIO_ID or not entry.is_dir(follow_symlinks=False):
+                    continue
+                _, size = _reclaimable(Path(entry.path))
+                usage.append((entry.stat().st_mtime, entry.name, size))
+
+        with_audio = {ritual_id for _, ritual_id, _ in usage}
+        accessed = self.audio_access.flush(keep=with_audio.__contains__)
+        total = sum(size for _, _, size in usage)
+        result = {"usage_bytes": total, "budget_bytes": max_bytes, "evicted": [], "evicted_bytes": 0}
+        if total <= max_bytes:
+            return result
+
+        def last_used(item: tuple[float, str, int]) -> float:
+            written_at, ritual_id, _ = item
+            summary = self.get_ritual_summary(ritual_id)
+            updated_at = datetime.fromisoformat(summary.updated_at).timestamp() if summary else 0.0
+            return max(written_at, accessed.get(ritual_id, 0.0), updated_at)
+
+        target = max_bytes * QUOTA_EVICTION_TARGET
+        for item in sorted(usage, key=last_used):
+            if total <= target:
+                break
+            _, ritual_id, size = item
+            summary = self.get_ritual_summary(ritual_id)
+            if summary is not None and summary.audio_status == "generating":
+                continue
+            self.evict_ritual_audio(ritual_id)
+            total -= size
+            result["evicted"].append(ritual_id)
+            result["evicted_bytes"] += size
+
+        logger.info(
+            f"Audio over quota ({result['usage_bytes']} of {max_bytes} bytes): evicted "
+            f"{len(result['evicted'])} rituals, {result['evicted_bytes']} bytes"
+        )
+        return result
+
+    def gc_temp_audio(self, max_age_seconds: float) -> dict:
+        """
+        Delete ad-hoc (temp) audio, and abandoned partial writes, older than max_age_seconds.
+
+        Covers temp audio in both layouts. Returns dict with the number of
+        files removed and bytes reclaimed.
+        """
+        result = {"files": 0, "bytes": 0}
+        temp_root = self.audio_path / TEMP_AUDIO_ID
+        if not temp_root.exists():
+            return result
+        cutoff = time.time() - max_age_seconds
+
+        for directory, _, names in os.walk(temp_root):
+            expired = []
+            for name in names:
+                if name == AUDIO_MANIFEST_NAME or name == f".{AUDIO_MANIFEST_NAME}.lock":
+                    continue
+                path = Path(directory, name)
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                if stat.st_mtime < cutoff:
+                    path.unlink(missing_ok=True)
+                    expired.append(name)
+                    result["files"] += 1
+                    result["bytes"] += stat.st_size if stat.st_nlink == 1 else 0
+
+            if expired:
+                def update(manifest: dict[str, dict], expired: list[str] = expired) -> None:
+                    for name in expired:
+                        manifest.pop(name, None)
+
+                self._update_audio_manifest(Path(directory), update)
+        return result
+
+    def gc_audio_jobs(self, max_age_seconds: float) -> dict:
+        """
+        Delete audio job progress files not written for max_age_seconds.
+
+        Running jobs rewrite their file after every segment, so only
+        finished (or abandoned) jobs are old enough to go. Returns dict with
+        the number of files removed and bytes reclaimed.
+        """
+        result = {"files": 0, "bytes": 0}
+        cutoff = time.time() - max_age_seconds
+        for path in self.jobs_path.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+                result["files"] += 1
+                result["bytes"] += stat.st_size
+        return result
+
+    def remove_orphan_audio(self, min_age_seconds: float) -> dict:
+        """
+        Tombstone audio directories whose ritual no longer exists.
+
+        Such directories are left by rituals that failed to save or were
+        deleted by hand. Only directories untouched for min_age_seconds are
+        removed, so audio synthesized just before its ritual is saved is safe.
+
+        Returns dict with the orphaned ritual IDs found and how many were tombstoned.
+        """
+        result = {"ritual_ids": [], "removed": 0}
+        if self.count_rituals() == 0:
+            # More likely a misconfigured storage path or backend than all-orphaned audio
+            return result
+        cutoff = time.time() - min_age_seconds
+        for sharded in (self.sharded, not self.sharded):
+            for entry in self._layout_entries(self.audio_path, sharded):
+                if entry.name == TEMP_AUDIO_ID or not entry.is_dir(follow_symlinks=False):
+                    continue
+                if self.ritual_exists(entry.name) or entry.stat().st_mtime >= cutoff:
+                    continue
+                result["ritual_ids"].append(entry.name)
+                if self._tombstone(Path(entry.path)):
+                    result["removed"] += 1
+        if result["removed"]:
+            logger.info(f"Tombstoned orphaned audio of {result['removed']} rituals: {result['ritual_ids']}")
+        return result
+
     def save_audio(
         self,
         ritual_id: str,
         segment_id: str,
         audio_bytes: bytes,
         extension: str = "mp3",
+        synthesis_key: Optional[str] = None,
     ) -> str:
         """Save audio file and return the relative URL."""
-        # Create ritual audio directory
-        ritual_audio_path = self.audio_path / ritual_id
-        ritual_audio_path.mkdir(parents=True, exist_ok=True)
-
         # Save audio file
         filename = f"{segment_id}.{extension}"
-        file_path = ritual_audio_path / filename
-        with open(file_path, "wb") as f:
-            f.write(audio_bytes)
+        file_path = self._writable_audio_dir(ritual_id, segment_id) / filename
+        atomic_write(file_path, audio_bytes)
+        self._record_audio(file_path, len(audio_bytes), hashlib.sha256(audio_bytes).hexdigest(), synthesis_key)
 
         # Return URL path
-        return f"/api/audio/{ritual_id}/{filename}"
+        return self.audio_url(ritual_id, segment_id, extension)
+
+    @staticmethod
+    def audio_url(ritual_id: str, segment_id: str, extension: str = "mp3") -> str:
+        """Public URL for a segment's audio file."""
+        return f"/api/audio/{ritual_id}/{segment_id}.{extension}"
+
+    def open_audio_writer(
+        self,
+        ritual_id: str,
+        segment_id: str,
+        extension: str = "mp3",
+        synthesis_key: Optional[str] = None,
+    ) -> AudioWriter:
+        """
+        Open an append-only writer for a segment's audio file.
+
+        synthesis_key identifies the inputs the audio was synthesized from
+        (see TTSService.synthesis_key); it's recorded in the manifest on commit.
+        """
+        return AudioWriter(
+            self._writable_audio_dir(ritual_id, segment_id) / f"{segment_id}.{extension}",
+            self.audio_url(ritual_id, segment_id, extension),
+            on_commit=lambda path, size, sha256: self._record_audio(path, size, sha256, synthesis_key),
+        )
+
+    def link_audio(
+        self,
+        ritual_id: str,
+        segment_id: str,
+        source: Path,
+        synthesis_key: Optional[str] = None,
+    ) -> str:
+        """Place an existing audio file (e.g. a cached blob) at a segment's path."""
+        extension = source.suffix.lstrip(".")
+        target = self._writable_audio_dir(ritual_id, segment_id) / f"{segment_id}.{extension}"
+        link_or_copy(source, target)
+        self._record_audio(target, target.stat().st_size, file_sha256(target), synthesis_key)
+        return self.audio_url(ritual_id, segment_id, extension)
+
+    @staticmethod
+    def render_url(ritual_id: str, name: str, extension: str) -> str:
+        """Public URL for a rendered (concatenated) audio file of a ritual."""
+        return f"/api/audio/{ritual_id}/render/{name}.{extension}"
+
+    def render_file(self, ritual_id: str, name: str, extension: str) -> Path:
+        """Path of a rendered audio file (a section ID, or "ritual" for the master)."""
+        return self.ritual_audio_dir(ritual_id) / "render" / f"{name}.{extension}"
+
+    def open_render_writer(self, ritual_id: str, name: str, extension: str) -> AudioWriter:
+        """Open an append-only writer for a rendered audio file."""
+        final_path = self._writable_audio_dir(ritual_id) / "render" / f"{name}.{extension}"
+        final_path.parent.mkdir(exist_ok=True)
+        return AudioWriter(
+            final_path,
+            self.render_url(ritual_id, name, extension),
+            on_commit=lambda path, size, sha256: self.audio_access.touch(ritual_id),
+        )
+
+    def load_render_manifest(self, ritual_id: str) -> dict:
+        """Load the fingerprints of a ritual's current renders."""
+        file_path = self.ritual_audio_dir(ritual_id) / "render" / "manifest.json"
+        if not file_path.exists():
+            return {}
+        with open(file_path, "r") as f:
+            return json.load(f)
+
+    def save_render_manifest(self, ritual_id: str, manifest: dict) -> None:
+        """Save the fingerprints of a ritual's current renders."""
+        file_path = self._writable_audio_dir(ritual_id) / "render" / "manifest.json"
+        file_path.parent.mkdir(exist_ok=True)
+        atomic_write(file_path, json.dumps(manifest, indent=2))
+
+    def find_audio(self, ritual_id: str, segment_id: str) -> Optional[Path]:
+        """Path of a segment's audio file (any supported format), if it exists."""
+        # Temp audio of one layout shares its parent directory with the other's
+        for sharded in (self.sharded, not self.sharded):
+            ritual_audio_dir = self._audio_dir_in(ritual_id, segment_id, sharded)
+            if not ritual_audio_dir.exists():
+                continue
+
+            # Check for common audio extensions
+            for ext in AUDIO_EXTENSIONS:
+                file_path = ritual_audio_dir / f"{segment_id}.{ext}"
+                if file_path.exists():
+                    return file_path
+        return None
+
+    def resolve_audio_path(self, path: str) -> Optional[Path]:
+        """
+        File behind an /api/audio/ URL path such as "{ritual_id}/{segment_id}.mp3"
+        or "{ritual_id}/render/ritual.mp3", in whichever layout holds it.
+
+        Audio URLs don't encode the layout, so they keep working across a
+        layout migration. Returns None for paths that can't name audio.
+        """
+        parts = path.split("/")
+        if len(parts) < 2 or any(not part or part.startswith(".") for part in parts):
+            return None
+        ritual_id, *rest = parts
+        if ritual_id == TEMP_AUDIO_ID:
+            if len(rest) != 1:
+                return None
+            found = self.find_audio(ritual_id, rest[0].rpartition(".")[0])
+            return found if found is not None and found.name == rest[0] else None
+        return self.ritual_audio_dir(ritual_id).joinpath(*rest)
 
     def audio_exists(self, ritual_id: str, segment_id: str) -> bool:
         """Check if audio file exists for a segment (any supported format)."""
-        ritual_audio_dir = self.audio_path / ritual_id
-        if not ritual_audio_dir.exists():
-            return False
+        return self.find_audio(ritual_id, segment_id) is not None
 
-        # Check for common audio extensions
-        for ext in ["mp3", "wav"]:
-            file_path = ritual_audio_dir / f"{segment_id}.{ext}"
-            if file_path.exists():
-                return True
-        return False
+    def segment_audio(self, ritual_id: str) -> dict[str, Path]:
+        """
+        Audio file of every segment of a ritual that has one, by segment ID.
+
+        One directory scan regardless of the number of segments; use this
+        instead of find_audio/audio_exists when checking a whole ritual.
+        """
+        found: dict[str, Path] = {}
+        try:
+            with os.scandir(self.ritual_audio_dir(ritual_id)) as it:
+                for dir_entry in it:
+                    segment_id, _, extension = dir_entry.name.rpartition(".")
+                    if dir_entry.name.startswith(".") or extension not in AUDIO_EXTENSIONS:
+                        continue
+                    # Same precedence as find_audio when a segment has both formats
+                    if segment_id not in found or extension == AUDIO_EXTENSIONS[0]:
+                        found[segment_id] = Path(dir_entry.path)
+        except FileNotFoundError:
+            pass
+        return found
+
+    @contextmanager
+    def _audio_manifest_lock(self, directory: Path) -> Iterator[None]:
+        """Exclusive lock on an audio directory's manifest, across threads and processes."""
+        lock_path = directory / f".{AUDIO_MANIFEST_NAME}.lock"
+        with open(lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def load_audio_manifest(self, ritual_id: str) -> dict[str, dict]:
+        """Size, SHA-256 and synthesis key of each of a ritual's audio files, by file name."""
+        return self._read_audio_manifest(self.ritual_audio_dir(ritual_id))
+
+    @staticmethod
+    def _read_audio_manifest(directory: Path) -> dict[str, dict]:
+        file_path = directory / AUDIO_MANIFEST_NAME
+        if not file_path.exists():
+            return {}
+        with open(file_path, "r") as f:
+            return json.load(f)
+
+    def _update_audio_manifest(self, directory: Path, update: Callable[[dict[str, dict]], None]) -> None:
+        with self._audio_manifest_lock(directory):
+            manifest = self._read_audio_manifest(directory)
+            update(manifest)
+            atomic_write(directory / AUDIO_MANIFEST_NAME, json.dumps(manifest, indent=2))
+
+    def _record_audio(self, path: Path, size: int, sha256: str, synthesis_key: Optional[str] = None) -> None:
+        """
+        Record a newly published segment audio file in its ritual's manifest.
+
+        A copy of the segment in another format is now out of date (and would
+        shadow an mp3-over-wav switch in segment_audio), so it's removed.
+        """
+        segment_id, _, extension = path.name.rpartition(".")
+        entry = {"size": size, "sha256": sha256}
+        if synthesis_key is not None:
+            entry["synthesis_key"] = synthesis_key
+
+        def update(manifest: dict[str, dict]) -> None:
+            manifest[path.name] = entry
+            for other in AUDIO_EXTENSIONS:
+                if other != extension:
+                    sibling = path.with_name(f"{segment_id}.{other}")
+                    sibling.unlink(missing_ok=True)
+                    manifest.pop(sibling.name, None)
+
+        self._update_audio_manifest(path.parent, update)
+        self._touch_audio(path)
+
+    def _touch_audio(self, path: Path) -> None:
+        """Count writing a ritual's audio file as a use, for quota eviction (temp audio has no ritual)."""
+        if not path.is_relative_to(self.audio_path / TEMP_AUDIO_ID):
+            self.audio_access.touch(path.parent.name)
+
+    def remove_segment_audio(self, ritual_id: str, segment_ids: Iterable[str]) -> list[str]:
+        """
+        Delete the audio of some of a ritual's segments (e.g. after their
+        text changed), so the next audio job regenerates just those.
+
+        Returns the IDs of the segments that had audio.
+        """
+        directory = self.ritual_audio_dir(ritual_id)
+        removed: list[str] = []
+        for segment_id in dict.fromkeys(segment_ids):
+            for extension in AUDIO_EXTENSIONS:
+                try:
+                    (directory / f"{segment_id}.{extension}").unlink()
+                except FileNotFoundError:
+                    continue
+                removed.append(f"{segment_id}.{extension}")
+        if removed:
+            def update(manifest: dict[str, dict]) -> None:
+                for name in removed:
+                    manifest.pop(name, None)
+
+            self._update_audio_manifest(directory, update)
+            logger.info(f"Removed stale audio of {len(removed)} segments of ritual {ritual_id}")
+        return list(dict.fromkeys(name.rpartition(".")[0] for name in removed))
+
+    def verify_ritual_audio(self, ritual_id: str, repair: bool = False) -> dict:
+        """
+        Check a ritual's segment audio files against its manifest.
+
+        A file is corrupt if its size or checksum differs from the manifest.
+        Files without a manifest entry (written before manifests existed, or
+        interrupted between rename and record) are accepted and recorded if
+        they parse as audio. With repair, corrupt files are deleted (so the
+        next audio job regenerates just those segments) and a "ready" ritual
+        is marked "pending" again.
+
+        Returns dict with checked, ok, and corrupt (segment ID -> reason),
+        removed and adopted segment ID lists.
+        """
+        ritual_audio_dir = self.ritual_audio_dir(ritual_id)
+        result = {"ritual_id": ritual_id, "checked": 0, "ok": 0, "corrupt": {}, "removed": [], "adopted": []}
+        if not ritual_audio_dir.is_dir():
+            return result
+
+        manifest = self._read_audio_manifest(ritual_audio_dir)
+        present: set[str] = set()
+        adopted: dict[str, dict] = {}
+        corrupt_files: list[Path] = []
+
+        with os.scandir(ritual_audio_dir) as it:
+            for dir_entry in it:
+                name = dir_entry.name
+                segment_id, _, extension = name.rpartition(".")
+                if name.startswith(".") or extension not in AUDIO_EXTENSIONS or not dir_entry.is_file():
+                    continue
+                present.add(name)
+                result["checked"] += 1
+                path = Path(dir_entry.path)
+                size = dir_entry.stat().st_size
+                expected = manifest.get(name)
+
+                if expected is None:
+                    try:
+                        if probe_file(path).duration_seconds <= 0:
+                            raise ValueError("no audio frames")
+                    except (OSError, ValueError) as e:
+                        reason = f"unreadable: {e}"
+                    else:
+                        adopted[name] = {"size": size, "sha256": file_sha256(path)}
+                        result["adopted"].append(segment_id)
+                        result["ok"] += 1
+                        continue
+                elif size < expected["size"]:
+                    reason = f"truncated: {size} of {expected['size']} bytes"
+                elif size != expected["size"]:
+                    reason = f"size mismatch: {size} bytes, expected {expected['size']}"
+                elif file_sha256(path) != expected["sha256"]:
+                    reason = "checksum mismatch"
+                else:
+                    result["ok"] += 1
+                    continue
+
+                result["corrupt"][segment_id] = reason
+                corrupt_files.append(path)
+
+        stale = [name for name in manifest if name not in present]
+        removed_names = []
+        if repair:
+            for path in corrupt_files:
+                path.unlink(missing_ok=True)
+                removed_names.append(path.name)
+                result["removed"].append(path.name.rpartition(".")[0])
+
+        if adopted or stale or removed_names:
+            def update(current: dict[str, dict]) -> None:
+                current.update(adopted)
+                for name in stale + removed_names:
+                    current.pop(name, None)
+
+            self._update_audio_manifest(ritual_audio_dir, update)
+
+        if result["removed"]:
+            logger.warning(f"Removed corrupt audio for ritual {ritual_id}: {result['corrupt']}")
+            ritual = self.load_ritual(ritual_id)
+            if ritual is not None and ritual.audio_status == "ready":
+                ritual.audio_status = "pending"
+                self.save_ritual(ritual)
+        return result
+
+    def save_audio_job(self, job: AudioJob) -> str:
+        """Save audio job progress to JSON file."""
+        file_path = self.jobs_path / f"{job.id}.json"
+        # Rewritten on every segment, so skip the fsync; progress is advisory
+        atomic_write(file_path, json.dumps(job.model_dump(by_alias=True), indent=2), durable=False)
+        return job.id
+
+    def load_audio_job(self, job_id: str) -> Optional[AudioJob]:
+        """Load audio job progress from JSON file."""
+        file_path = self.jobs_path / f"{job_id}.json"
+        if not file_path.exists():
+            return None
+        with open(file_path, "r") as f:
+            data = json.load(f)
+        return AudioJob(**data)
 
     def get_ritual_audio_status(self, ritual_id: str) -> dict:
         """
         Get audio status for a ritual.
         Returns dict with segment IDs and whether audio exists.
         """
-        ritual = self.load_ritual(ritual_id)
+        ritual = self.load_ritual(ritual_id, readonly=True)
         if not ritual:
             return {"exists": False, "segments": {}}
 
         segments_status = {}
         total_text_segments = 0
         existing_audio = 0
+        audio = self.segment_audio(ritual_id)
 
         for section in ritual.sections:
             for segment in section.segments:
                 if segment.type == "text" and segment.text:
                     total_text_segments += 1
-                    exists = self.audio_exists(ritual_id, segment.id)
+                    exists = segment.id in audio
                     segments_status[segment.id] = exists
                     if exists:
                         existing_audio += 1
@@ -125,6 +1104,7 @@ class StorageService:
         return {
             "exists": True,
             "ritual_id": ritual_id,
+            "audio_status": ritual.audio_status,
             "segments": segments_status,
             "total": total_text_segments,
             "generated": existing_audio,
@@ -137,8 +1117,12 @@ _storage_service: Optional[StorageService] = None
 
 
 def get_storage_service() -> StorageService:
-    """Get or create storage service instance."""
+    """Get or create the storage service for the configured backend."""
     global _storage_service
     if _storage_service is None:
-        _storage_service = StorageService()
+        if get_settings().storage_backend == "sqlite":
+            from .sqlite_storage import SQLiteStorageService
+            _storage_service = SQLiteStorageService()
+        else:
+            _storage_service = StorageService()
     return _storage_service
@@ -0,0 +1,98 @@
+"""Tests for the async storage facade."""
+
+import asyncio
+import functools
+import io
+import tarfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from pathlib import Path
+
+from app.models.ritual import Ritual
+from app.services import async_storage as async_storage_module
+from app.services import library_transfer, sqlite_storage
+from app.services.async_storage import AsyncStorageService
+from app.services.storage import StorageService
+
+
+@pytest.fixture
+def storage(tmp_path: Path) -> StorageService:
+    return StorageService(tmp_path)
+
+
+@pytest.mark.offline
+class TestAsyncStorageService:
+    """Tests for AsyncStorageService."""
+
+    async def test_round_trip(self, storage: StorageService):
+        async_storage = AsyncStorageService(storage)
+        ritual = Ritual(id="async-1", title="Async", duration=60, tags=["calm"])
+
+        await async_storage.save_ritual(ritual)
+        assert await async_storage.ritual_exists("async-1")
+        assert (await async_storage.load_ritual("async-1")).title == "Async"
+        assert [e.id for e in await async_storage.get_ritual_summaries(["async-1", "missing"])] == ["async-1"]
+        entries, _ = await async_storage.page_ritual_summaries(tags=["calm"])
+        assert [e.id for e in entries] == ["async-1"]
+
+        await async_storage.save_audio("async-1", "seg-1", b"audio")
+        assert await async_storage.audio_exists("async-1", "seg-1")
+
+        assert await async_storage.delete_ritual("async-1")
+        assert await async_storage.load_ritual("async-1") is None
+        assert not (storage.audio_path / "async-1").exists()
+
+    async def test_io_runs_off_the_event_loop(self, storage: StorageService, monkeypatch):
+        threads = []
+
+        def slow_load(ritual_id: str, readonly: bool = False):
+            threads.append(threading.current_thread().name)
+            time.sleep(0.2)
+            return None
+
+        monkeypatch.setattr(storage, "load_ritual", slow_load)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        await AsyncStorageService(storage).load_ritual("any")
+        task.cancel()
+
+        assert threads[0].startswith("storage-io")
+        assert ticks >= 10  # The loop kept running during the blocking call
+
+    @pytest.mark.parametrize("audio", [False, True])
+    async def test_export_from_sqlite_across_threads(self, tmp_path: Path, monkeypatch, audio: bool):
+        """Each export step may run on a different pool thread; the SQLite backend must cope."""
+        storage = sqlite_storage.SQLiteStorageService(tmp_path)
+        for i in range(5):
+            storage.save_ritual(Ritual(id=f"r-{i}", title=f"Ritual {i}", duration=60,
+                                       created_at=f"2024-01-{i + 1:02d}T00:00:00Z"))
+            storage.save_audio(f"r-{i}", "seg-1", bytes(16 * 1024))  # More than a tar record, so each ritual is yielded
+        monkeypatch.setattr(sqlite_storage, "ITER_BATCH_SIZE", 2)
+        monkeypatch.setattr(library_transfer, "EXPORT_CHUNK_BYTES", 1)
+
+        async def on_new_thread(fn, *args, **kwargs):
+            pool = ThreadPoolExecutor(max_workers=1)
+            try:
+                return await asyncio.get_running_loop().run_in_executor(pool, functools.partial(fn, *args, **kwargs))
+            finally:
+                pool.shutdown(wait=False)
+
+        monkeypatch.setattr(async_storage_module, "run_storage_io", on_new_thread)
+        exported = b"".join([chunk async for chunk in AsyncStorageService(storage).export_library(audio=audio)])
+
+        if audio:
+            with tarfile.open(fileobj=io.BytesIO(exported)) as tar:
+                ids = [name[len("rituals/"):-len(".json")] for name in tar.getnames() if name.startswith("rituals/")]
+        else:
+            ids = [Ritual.model_validate_json(line).id for line in exported.splitlines()]
+        assert ids == ["r-4", "r-3", "r-2", "r-1", "r-0"]
@@ -0,0 +1,168 @@
+"""Offline tests for MP3/WAV header inspection."""
+
+import struct
+
+import pytest
+from pathlib import Path
+
+from app.services.audio_info import probe_bytes, probe_file
+from app.services.storage import StorageService
+from app.services.tts_service import TTSService
+from app.services.wav import wav_header
+from tests.mocks import MockElevenLabsTTSProvider, MockGoogleTTSProvider
+
+# MPEG-1 Layer III, 44.1kHz, joint stereo: 128kbps frames are 417 bytes (+1 when padded)
+MPEG1_128K = b"\xff\xfb\x90\x40"
+MPEG1_128K_PADDED = b"\xff\xfb\x92\x40"
+# MPEG-1 Layer III, 44.1kHz, joint stereo, 320kbps: 1044-byte frames
+MPEG1_320K = b"\xff\xfb\xe0\x40"
+# MPEG-2 Layer III, 24kHz, mono, 64kbps: 192-byte frames of 576 samples
+MPEG2_64K_MONO = b"\xff\xf3\x84\xc0"
+
+
+def frame(header: bytes, length: int) -> bytes:
+    return header + b"\x00" * (length - 4)
+
+
+def xing_frame(frame_count: int) -> bytes:
+    """First frame of a LAME-style VBR file carrying a Xing frame count."""
+    side_info = b"\x00" * 32  # MPEG-1 stereo
+    body = side_info + b"Xing" + struct.pack(">II", 0x01, frame_count)
+    return MPEG1_128K + body + b"\x00" * (417 - 4 - len(body))
+
+
+def id3v2_tag(payload_size: int) -> bytes:
+    size = bytes([(payload_size >> shift) & 0x7F for shift in (21, 14, 7, 0)])
+    return b"ID3\x04\x00\x00" + size + b"\x00" * payload_size
+
+
+@pytest.mark.offline
+class TestProbeMP3:
+    """Duration from MPEG frame headers."""
+
+    def test_cbr_frame_walk(self):
+        info = probe_bytes(frame(MPEG1_128K, 417) * 100)
+        assert info.format == "mp3"
+        assert info.frame_count == 100
+        assert info.sample_rate == 44100
+        assert info.channels == 2
+        assert info.duration_seconds == pytest.approx(100 * 1152 / 44100)
+        assert info.vbr_header is False
+
+    def test_padded_frames(self):
+        data = (frame(MPEG1_128K, 417) + frame(MPEG1_128K_PADDED, 418)) * 25
+        assert probe_bytes(data).frame_count == 50
+
+    def test_headerless_vbr(self):
+        """Mixed bitrates are summed frame by frame, not estimated from size."""
+        data = frame(MPEG1_128K, 417) * 10 + frame(MPEG1_320K, 1044) * 10
+        info = probe_bytes(data)
+        assert info.frame_count == 20
+        assert info.duration_seconds == pytest.approx(20 * 1152 / 44100)
+
+    def test_mpeg2_mono(self):
+        info = probe_bytes(frame(MPEG2_64K_MONO, 192) * 50)
+        assert info.sample_rate == 24000
+        assert info.channels == 1
+        assert info.duration_seconds == pytest.approx(50 * 576 / 24000)
+
+    def test_xing_header(self):
+        """A Xing frame count is used without walking the (truncated) stream."""
+        data = xing_frame(1000) + frame(MPEG1_128K, 417) * 3
+        info = probe_bytes(data)
+        assert info.vbr_header is True
+        assert info.frame_count == 1000
+        assert info.duration_seconds == pytest.approx(1000 * 1152 / 44100)
+
+    def test_skips_id3v2_and_trailing_id3v1(self):
+        data = id3v2_tag(300) + frame(MPEG1_128K, 417) * 10 + b"TAG" + b"\x00" * 125
+        assert probe_bytes(data).frame_count == 10
+
+    def test_skips_garbage_before_first_frame(self):
+        """A stray sync byte that isn't followed by a valid frame is ignored."""
+        data = b"\x00\xff\xfb\x00" + frame(MPEG1_128K, 417) * 5
+        assert probe_bytes(data).frame_count == 5
+
+    def test_old_estimate_was_wrong(self):
+        """The old len/(44100*128/8) formula overestimated 128kbps audio by ~44%."""
+        data = frame(MPEG1_128K, 417) * 1000
+        old_estimate = len(data) / (44100 * 128 / 8)
+        actual = probe_bytes(data).duration_seconds
+        assert actual == pytest.approx(len(data) * 8 / 128_000, rel=0.01)
+        assert old_estimate < actual * 0.75
+
+    def test_unrecognized_raises(self):
+        with pytest.raises(ValueError):
+            probe_bytes(b"\x00" * 2048)
+
+    def test_truncated_single_frame_raises(self):
+        with pytest.raises(ValueError):
+            probe_bytes(frame(MPEG1_128K, 417)[:300])
+
+
+@pytest.mark.offline
+class TestProbeWAV:
+    """Duration from RIFF chunks."""
+
+    def test_finalized_header(self):
+        pcm = b"\x00" * 48000  # 1s of 24kHz 16-bit mono
+        info = probe_bytes(wav_header(24000, data_size=len(pcm)) + pcm)
+        assert info.format == "wav"
+        assert info.duration_seconds == pytest.approx(1.0)
+        assert info.frame_count == 24000
+
+    def test_streaming_header_uses_file_length(self):
+        pcm = b"\x00" * 24000
+        assert probe_bytes(wav_header(24000) + pcm).duration_seconds == pytest.approx(0.5)
+
+    def test_skips_extra_chunks(self):
+        header = wav_header(16000, channels=2, data_size=64000)
+        # Insert an odd-sized LIST chunk (with pad byte) between fmt and data
+        extra = b"LIST" + struct.pack("<I", 3) + b"abc\x00"
+        data = header[:36] + extra + header[36:] + b"\x00" * 64000
+        info = probe_bytes(data)
+        assert info.channels == 2
+        assert info.duration_seconds == pytest.approx(1.0)
+
+    def test_missing_data_chunk_raises(self):
+        with pytest.raises(ValueError):
+            probe_bytes(wav_header(24000)[:36])
+
+
+@pytest.mark.offline
+class TestProbeFile:
+    """File probing and TTSService duration measurement."""
+
+    def test_probe_file(self, tmp_path: Path):
+        path = tmp_path / "a.mp3"
+        path.write_bytes(frame(MPEG1_128K, 417) * 10)
+        assert probe_file(path).frame_count == 10
+
+    def test_empty_file_raises(self, tmp_path: Path):
+        path = tmp_path / "empty.mp3"
+        path.touch()
+        with pytest.raises(ValueError):
+            probe_file(path)
+
+    @pytest.mark.parametrize("provider", ["elevenlabs", "google"])
+    async def test_service_reports_measured_duration(self, tmp_path: Path, provider: str):
+        storage = StorageService(tmp_path)
+        service = TTSService(
+            elevenlabs_provider=MockElevenLabsTTSProvider(),
+            google_provider=MockGoogleTTSProvider(),
+            storage_service=storage,
+        )
+        _, duration = await service.synthesize("x" * 50, "voice", provider, "ritual", "seg")
+        path = storage.find_audio("ritual", "seg")
+        assert duration == probe_file(path).duration_seconds
+        assert duration == pytest.approx(3.0, abs=0.027)
+
+    async def test_service_falls_back_to_estimate(self, tmp_path: Path):
+        """Audio that can't be parsed still gets the provider's estimate."""
+        class UnparseableProvider(MockElevenLabsTTSProvider):
+            def _fake_audio(self, text: str) -> bytes:
+                return b"\x01" * 16000
+
+        service = TTSService(elevenlabs_provider=UnparseableProvider(), storage_service=StorageService(tmp_path))
+        _, duration = await service.synthesize("Hello.", "voice", "elevenlabs", "ritual", "seg")
+        assert duration == pytest.approx(1.0)
@@ -0,0 +1,118 @@
+"""Tests for bulk library export and import."""
+
+import io
+import tarfile
+
+import pytest
+from pathlib import Path
+
+from app.models.ritual import Ritual, RitualSection, Segment
+from app.services.library_transfer import export_ndjson, export_tar, import_ndjson, import_tar, is_tar
+from app.services.sqlite_storage import SQLiteStorageService
+from app.services.storage import StorageService
+
+
+def make_ritual(i: int, **kwargs) -> Ritual:
+    section = RitualSection(id=f"s-{i}", type="body", duration_seconds=60, segments=[
+        Segment(id=f"seg-{i}", type="text", text=f"Breath {i}", duration_seconds=10),
+    ])
+    return Ritual(id=f"r-{i}", title=f"Ritual {i}", duration=60, sections=[section],
+                  created_at=f"2024-01-{i + 1:02d}T00:00:00Z", **kwargs)
+
+
+@pytest.mark.offline
+class TestLibraryTransfer:
+    """Tests for export_ndjson/export_tar and import_ndjson/import_tar."""
+
+    @pytest.fixture
+    def source(self, tmp_path: Path) -> StorageService:
+        storage = StorageService(tmp_path / "source")
+        for i in range(5):
+            storage.save_ritual(make_ritual(i))
+            storage.save_audio(f"r-{i}", f"seg-{i}", f"audio {i}".encode(), synthesis_key=f"key-{i}")
+        return storage
+
+    def test_ndjson_round_trip_is_idempotent(self, source: StorageService, tmp_path: Path):
+        exported = b"".join(export_ndjson(source))
+        assert len(exported.splitlines()) == 5
+        assert not is_tar(exported[:512])
+
+        target = SQLiteStorageService(tmp_path / "target")
+        result = import_ndjson(target, io.BytesIO(exported), workers=3)
+        assert (result["rituals_imported"], result["rituals_skipped"], result["failed"]) == (5, 0, 0)
+        assert target.load_ritual("r-3") == source.load_ritual("r-3")
+
+        # Rerunning (e.g. after an interruption) skips what's already there
+        result = import_ndjson(target, io.BytesIO(exported), workers=3)
+        assert (result["rituals_imported"], result["rituals_skipped"]) == (0, 5)
+
+    def test_newer_rituals_replace_older_ones(self, source: StorageService, tmp_path: Path):
+        target = StorageService(tmp_path / "target")
+        stale = make_ritual(0, updated_at="2000-01-01T00:00:00Z")
+        stale.title = "Old title"
+        target.save_ritual(stale)
+        newer = make_ritual(1, updated_at="2999-01-01T00:00:00Z")
+        newer.title = "Local edit"
+        target.save_ritual(newer)
+
+        result = import_ndjson(target, io.BytesIO(b"".join(export_ndjson(source))))
+        assert (result["rituals_imported"], result["rituals_skipped"]) == (4, 1)
+        assert target.load_ritual("r-0").title == "Ritual 0"
+        assert target.load_ritual("r-1").title == "Local edit"
+
+    def test_invalid_lines_are_reported(self, tmp_path: Path):
+        target = StorageService(tmp_path / "target")
+        lines = [
+            make_ritual(0).model_dump_json(by_alias=True).encode(),
+            b"{not json",
+            b"",
+            make_ritual(1).model_copy(update={"id": "../escape"}).model_dump_json(by_alias=True).encode(),
+        ]
+        result = import_ndjson(target, lines)
+        assert (result["rituals_imported"], result["failed"]) == (1, 2)
+        assert result["errors"][0].startswith("line 2:")
+        assert "invalid ritual ID" in result["errors"][1]
+        assert not (tmp_path / "target" / "escape.json").exists()
+
+    def test_tar_round_trip_with_audio(self, source: StorageService, tmp_path: Path):
+        exported = b"".join(export_tar(source))
+        assert is_tar(exported[:512])
+        with tarfile.open(fileobj=io.BytesIO(exported)) as tar:
+            names = tar.getnames()
+        assert names[:3] == ["rituals/r-4.json", "audio/r-4/manifest.json", "audio/r-4/seg-4.mp3"]
+
+        target = StorageService(tmp_path / "target", layout="sharded")
+        result = import_tar(target, io.BytesIO(exported), workers=2)
+        assert (result["rituals_imported"], result["audio_imported"], result["failed"]) == (5, 5, 0)
+        assert target.find_audio("r-2", "seg-2").read_bytes() == b"audio 2"
+        assert target.load_audio_manifest("r-2")["seg-2.mp3"]["synthesis_key"] == "key-2"
+
+        result = import_tar(target, io.BytesIO(exported), workers=2)
+        assert (result["rituals_skipped"], result["audio_skipped"], result["audio_imported"]) == (5, 5, 0)
+
+    def test_truncated_tar_keeps_what_was_read(self, source: StorageService, tmp_path: Path):
+        exported = b"".join(export_tar(source))
+        target = StorageService(tmp_path / "target")
+
+        result = import_tar(target, io.BytesIO(exported[:len(exported) // 2]))
+        assert result["failed"] == 1
+        assert result["errors"][-1].startswith("archive:")
+        assert 0 < result["rituals_imported"] < 5
+
+        result = import_tar(target, io.BytesIO(exported))
+        assert result["failed"] == 0
+        assert target.count_rituals() == 5
+        assert all(target.audio_exists(f"r-{i}", f"seg-{i}") for i in range(5))
+
+    def test_audio_outside_an_exported_ritual_is_rejected(self, tmp_path: Path):
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w") as tar:
+            info = tarfile.TarInfo("audio/../../evil/seg.mp3")
+            info.size = 4
+            tar.addfile(info, io.BytesIO(b"evil"))
+        buffer.seek(0)
+
+        target = StorageService(tmp_path / "target")
+        result = import_tar(target, buffer)
+        assert result["failed"] == 1
+        assert not (tmp_path / "evil").exists()
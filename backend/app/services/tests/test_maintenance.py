@@ -0,0 +1,180 @@
+"""Tests for background storage maintenance."""
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.models.audio_job import AudioJob
+from app.models.ritual import Ritual
+from app.services.maintenance import MaintenanceScheduler
+from app.services.storage import StorageService
+
+DAY = 24 * 3600
+
+
+def age(path: Path, seconds: float) -> None:
+    """Backdate a file or directory's mtime."""
+    stamp = time.time() - seconds
+    os.utime(path, (stamp, stamp))
+
+
+@pytest.mark.offline
+class TestStorageMaintenance:
+    """Tests for the StorageService maintenance operations."""
+
+    @pytest.fixture
+    def storage(self, tmp_path: Path) -> StorageService:
+        storage = StorageService(tmp_path)
+        storage.save_ritual(Ritual(id="kept", title="Kept", duration=60))
+        return storage
+
+    def test_gc_temp_audio(self, storage: StorageService):
+        storage.save_audio("temp", "old", b"x" * 100)
+        storage.save_audio("temp", "new", b"x" * 50)
+        old = storage.find_audio("temp", "old")
+        age(old, 2 * DAY)
+
+        assert storage.gc_temp_audio(DAY) == {"files": 1, "bytes": 100}
+        assert not old.exists()
+        assert storage.audio_exists("temp", "new")
+        assert set(storage.load_audio_manifest("temp")) == {"new.mp3"}
+
+    def test_delete_is_deferred_until_purge(self, storage: StorageService):
+        storage.save_audio("kept", "seg", b"x")
+        storage.save_ritual(Ritual(id="gone", title="Gone", duration=60))
+        storage.save_audio("gone", "seg", b"x" * 100)
+
+        manifest_size = (storage.audio_path / "gone" / "manifest.json").stat().st_size
+
+        storage.delete_ritual("gone")
+        assert not (storage.audio_path / "gone").exists()
+        assert len(list(storage.trash_path.iterdir())) == 1
+
+        # Audio, manifest and its (empty) lock file
+        assert storage.purge_tombstones() == {"entries": 1, "files": 3, "bytes": 100 + manifest_size}
+        assert list(storage.trash_path.iterdir()) == []
+        assert storage.audio_exists("kept", "seg")
+
+    def test_audio_writes_count_as_use(self, storage: StorageService):
+        """Writing segment or render audio keeps a ritual warm; temp audio isn't tracked."""
+        storage.save_audio("kept", "seg", b"x")
+        writer = storage.open_render_writer("kept", "ritual", "mp3")
+        writer.write(b"x")
+        writer.commit()
+        storage.save_audio("temp", "adhoc", b"x")
+
+        accessed = storage.audio_access.flush()
+        assert set(accessed) == {"kept"}
+        assert accessed["kept"] == pytest.approx(time.time(), abs=5)
+
+    def test_gc_audio_jobs(self, storage: StorageService):
+        old, running = (AudioJob(ritual_id="kept", voice_id="sarah", provider="google") for _ in range(2))
+        storage.save_audio_job(old)
+        storage.save_audio_job(running)
+        age(storage.jobs_path / f"{old.id}.json", 2 * DAY)
+
+        result = storage.gc_audio_jobs(DAY)
+        assert result["files"] == 1 and result["bytes"] > 0
+        assert storage.load_audio_job(old.id) is None
+        assert storage.load_audio_job(running.id) is not None
+
+    def test_remove_orphan_audio(self, storage: StorageService):
+        storage.save_audio("kept", "seg", b"x")
+        storage.save_audio("orphan", "seg", b"x")
+        storage.save_audio("fresh-orphan", "seg", b"x")
+        age(storage.audio_path / "orphan", 2 * DAY)
+        age(storage.audio_path / "kept", 2 * DAY)
+
+        result = storage.remove_orphan_audio(DAY)
+        assert result == {"ritual_ids": ["orphan"], "removed": 1}
+        assert (storage.audio_path / "kept").exists()
+        assert (storage.audio_path / "fresh-orphan").exists()
+        assert not (storage.audio_path / "orphan").exists()
+
+    def test_quota_evicts_least_recently_used(self, storage: StorageService):
+        for ritual_id in ("cold", "played", "fresh"):
+            storage.save_ritual(Ritual(id=ritual_id, title=ritual_id, duration=60, audio_status="ready"))
+            storage.save_audio(ritual_id, "seg", b"x" * 1000)
+        for ritual_id in ("cold", "played"):
+            age(storage.audio_path / ritual_id, 3 * DAY)
+        # Ritual files were just saved, so backdate their update time in the index too
+        for ritual_id in ("cold", "played"):
+            ritual = storage.load_ritual(ritual_id)
+            ritual.updated_at = "2020-01-01T00:00:00Z"
+            storage.save_ritual(ritual)
+        storage.audio_access.touch("played")
+
+        assert storage.enforce_audio_quota(10_000)["evicted"] == []
+        result = storage.enforce_audio_quota(2500)
+        assert result["evicted"] == ["cold"]
+        assert result["usage_bytes"] > 3000 and result["evicted_bytes"] > 1000  # Audio plus its manifest
+
+        evicted = storage.load_ritual("cold")
+        assert evicted.audio_status == "pending" and evicted.audio_evicted_at is not None
+        assert not storage.audio_exists("cold", "seg")
+        assert storage.audio_exists("played", "seg") and storage.audio_exists("fresh", "seg")
+        assert storage.purge_tombstones()["entries"] == 1
+
+
+@pytest.mark.offline
+class TestMaintenanceScheduler:
+    """Tests for MaintenanceScheduler."""
+
+    async def test_run_once_counts_reclaimed_bytes(self, tmp_path: Path):
+        storage = StorageService(tmp_path)
+        storage.save_ritual(Ritual(id="r", title="R", duration=60))
+        storage.save_audio("r", "seg", b"x" * 1000)
+        storage.delete_ritual("r")
+        storage.save_audio("temp", "old", b"x" * 500)
+        age(storage.find_audio("temp", "old"), 2 * DAY)
+
+        scheduler = MaintenanceScheduler(storage, interval_seconds=60, temp_audio_ttl_seconds=DAY)
+        results = await scheduler.run_once()
+        assert results["temp_audio"] == {"files": 1, "bytes": 500}
+        assert results["tombstones"]["entries"] == 1
+
+        stats = scheduler.stats()
+        assert stats["runs"] == 1
+        assert stats["tasks"]["temp_audio"]["bytes_reclaimed"] == 500
+        assert stats["tasks"]["tombstones"]["bytes_reclaimed"] >= 1000
+        assert stats["bytes_reclaimed"] == 500 + stats["tasks"]["tombstones"]["bytes_reclaimed"]
+
+    async def test_zero_overrides_settings(self, tmp_path: Path, monkeypatch):
+        """An explicit 0 is used as given, not replaced by the configured default."""
+        monkeypatch.setattr(get_settings(), "audio_quota_bytes", 1)
+        storage = StorageService(tmp_path)
+        storage.save_ritual(Ritual(id="r", title="R", duration=60, audio_status="ready"))
+        storage.save_audio("r", "seg", b"x" * 100)
+        storage.save_audio("temp", "fresh", b"x" * 100)
+        age(storage.find_audio("temp", "fresh"), 1)
+
+        scheduler = MaintenanceScheduler(storage, temp_audio_ttl_seconds=0, audio_quota_bytes=0)
+        assert scheduler.temp_audio_ttl_seconds == 0 and scheduler.audio_quota_bytes == 0
+        results = await scheduler.run_once()
+        assert results["temp_audio"]["files"] == 1
+        assert results["audio_quota"] == {}  # Quota disabled despite the setting
+        assert storage.audio_exists("r", "seg")
+
+    async def test_failing_task_does_not_stop_the_pass(self, tmp_path: Path, monkeypatch):
+        storage = StorageService(tmp_path)
+
+        def fail(max_age_seconds: float) -> dict:
+            raise OSError("disk gone")
+
+        monkeypatch.setattr(storage, "gc_temp_audio", fail)
+        scheduler = MaintenanceScheduler(storage, interval_seconds=60)
+        results = await scheduler.run_once()
+        assert "temp_audio" not in results and "tombstones" in results
+        assert scheduler.stats()["tasks"]["temp_audio"]["errors"] == 1
+
+    def test_stats_endpoint(self, client: TestClient):
+        response = client.post("/api/maintenance/run")
+        assert response.status_code == 200
+        stats = response.json()
+        assert stats["runs"] >= 1
+        assert set(stats["tasks"]) == {"temp_audio", "audio_jobs", "orphans", "audio_quota", "tombstones"}
+        assert client.get("/api/maintenance/stats").json()["bytesReclaimed"] == stats["bytesReclaimed"]
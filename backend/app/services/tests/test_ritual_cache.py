@@ -0,0 +1,75 @@
+"""Tests for the parsed-ritual cache."""
+
+import json
+
+import pytest
+from pathlib import Path
+
+from app.models.ritual import Ritual
+from app.services.storage import StorageService
+
+
+@pytest.fixture
+def storage(tmp_path: Path) -> StorageService:
+    return StorageService(tmp_path)
+
+
+@pytest.mark.offline
+class TestRitualCache:
+    """Tests for RitualCache via StorageService.load_ritual."""
+
+    def test_readonly_loads_share_one_parse(self, storage: StorageService):
+        storage.save_ritual(Ritual(id="c-1", title="Cached", duration=60))
+
+        first = storage.load_ritual("c-1", readonly=True)
+        assert storage.load_ritual("c-1", readonly=True) is first
+        stats = storage.ritual_cache.stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+        # Callers that may modify the ritual get their own copy
+        own = storage.load_ritual("c-1")
+        assert own is not first and own == first
+
+    def test_invalidated_by_save_and_delete(self, storage: StorageService):
+        ritual = Ritual(id="c-2", title="Before", duration=60)
+        storage.save_ritual(ritual)
+        storage.load_ritual("c-2", readonly=True)
+
+        ritual.title = "After"
+        storage.save_ritual(ritual)
+        assert storage.load_ritual("c-2", readonly=True).title == "After"
+
+        storage.delete_ritual("c-2")
+        assert storage.load_ritual("c-2", readonly=True) is None
+        assert storage.ritual_cache.stats()["invalidations"] == 2
+
+    def test_invalidated_by_writes_from_other_processes(self, storage: StorageService, tmp_path: Path):
+        storage.save_ritual(Ritual(id="c-3", title="Before", duration=60))
+        storage.load_ritual("c-3", readonly=True)
+
+        # Another worker's write replaces the file (new inode)
+        StorageService(tmp_path).save_ritual(Ritual(id="c-3", title="Elsewhere", duration=60))
+        assert storage.load_ritual("c-3", readonly=True).title == "Elsewhere"
+
+        # An in-place edit changes the size/mtime
+        path = storage.rituals_path / "c-3.json"
+        data = json.loads(path.read_text())
+        data["title"] = "Edited in place"
+        path.write_text(json.dumps(data))
+        assert storage.load_ritual("c-3", readonly=True).title == "Edited in place"
+
+    def test_bounded_lru(self, tmp_path: Path):
+        storage = StorageService(tmp_path)
+        storage.ritual_cache.max_entries = 2
+        for i in range(3):
+            storage.save_ritual(Ritual(id=f"lru-{i}", title=str(i), duration=60))
+
+        storage.load_ritual("lru-0", readonly=True)
+        storage.load_ritual("lru-1", readonly=True)
+        storage.load_ritual("lru-0", readonly=True)  # lru-1 is now least recently used
+        storage.load_ritual("lru-2", readonly=True)
+
+        stats = storage.ritual_cache.stats()
+        assert (stats["entries"], stats["evictions"]) == (2, 1)
+        storage.load_ritual("lru-0", readonly=True)
+        assert storage.ritual_cache.stats()["hits"] == 2
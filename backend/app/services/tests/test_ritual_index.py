@@ -0,0 +1,118 @@
+"""Tests for the persistent ritual summary index."""
+
+import json
+import os
+
+import pytest
+from pathlib import Path
+
+import app.services.ritual_index as ritual_index_module
+from app.models.ritual import Ritual
+from app.services.storage import StorageService
+
+
+def make_ritual(i: int, **kwargs) -> Ritual:
+    return Ritual(id=f"r-{i}", title=f"Ritual {i}", duration=60, created_at=f"2024-01-{i + 1:02d}T00:00:00Z", **kwargs)
+
+
+@pytest.mark.offline
+class TestRitualIndex:
+    """Tests for RitualIndex via StorageService."""
+
+    @pytest.fixture
+    def storage(self, tmp_path: Path) -> StorageService:
+        return StorageService(tmp_path)
+
+    def test_summaries_sorted_newest_first(self, storage: StorageService):
+        for i in (2, 0, 1):
+            storage.save_ritual(make_ritual(i, tags=["calm"], tone="coach"))
+
+        summaries = storage.list_ritual_summaries()
+        assert [s.id for s in summaries] == ["r-2", "r-1", "r-0"]
+        assert summaries[0].title == "Ritual 2"
+        assert summaries[0].tags == ("calm",)
+        assert summaries[0].tone == "coach"
+        assert [r.id for r in storage.list_rituals()] == ["r-2", "r-1", "r-0"]
+
+    def test_save_updates_and_delete_removes(self, storage: StorageService):
+        storage.save_ritual(make_ritual(0))
+        storage.save_ritual(make_ritual(0, audio_status="ready"))
+        assert len(storage.ritual_index) == 1
+        assert storage.ritual_index.get("r-0").audio_status == "ready"
+
+        storage.delete_ritual("r-0")
+        assert storage.list_ritual_summaries() == []
+
+    def test_persists_across_instances(self, storage: StorageService, tmp_path: Path):
+        for i in range(3):
+            storage.save_ritual(make_ritual(i))
+
+        reopened = StorageService(tmp_path)
+        assert [s.id for s in reopened.list_ritual_summaries()] == ["r-2", "r-1", "r-0"]
+
+    def test_sees_writes_from_other_instances(self, storage: StorageService, tmp_path: Path):
+        other = StorageService(tmp_path)
+        assert len(other.ritual_index) == 0
+
+        storage.save_ritual(make_ritual(0))
+        assert [s.id for s in other.list_ritual_summaries()] == ["r-0"]
+        storage.delete_ritual("r-0")
+        assert other.list_ritual_summaries() == []
+
+    def test_startup_reconciles_changed_files_only(self, storage: StorageService, tmp_path: Path, monkeypatch):
+        for i in range(4):
+            storage.save_ritual(make_ritual(i))
+
+        # Edit, delete and add ritual files behind the index's back
+        edited = storage.rituals_path / "r-1.json"
+        data = json.loads(edited.read_text())
+        data["title"] = "Edited"
+        edited.write_text(json.dumps(data))
+        stat = edited.stat()
+        os.utime(edited, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        (storage.rituals_path / "r-2.json").unlink()
+        (storage.rituals_path / "r-9.json").write_text(make_ritual(9).model_dump_json(by_alias=True))
+        (storage.rituals_path / "broken.json").write_text("{not json")
+
+        parsed = []
+        original = ritual_index_module.Ritual
+
+        def tracking_ritual(**data):
+            parsed.append(data.get("id"))
+            return original(**data)
+
+        monkeypatch.setattr(ritual_index_module, "Ritual", tracking_ritual)
+        reopened = StorageService(tmp_path)
+        summaries = reopened.list_ritual_summaries()
+
+        assert [s.id for s in summaries] == ["r-9", "r-3", "r-1", "r-0"]
+        assert reopened.ritual_index.get("r-1").title == "Edited"
+        # Unchanged files were not parsed again
+        assert sorted(parsed) == ["r-1", "r-9"]
+
+    def test_log_compaction(self, storage: StorageService, tmp_path: Path, monkeypatch):
+        monkeypatch.setattr(ritual_index_module, "MIN_COMPACT_ENTRIES", 5)
+        other = StorageService(tmp_path)
+        len(other.ritual_index)
+
+        for i in range(12):
+            storage.save_ritual(make_ritual(i))
+
+        index = storage.ritual_index
+        assert index.log_file.stat().st_size < 5 * 300  # Truncated at each compaction
+        assert len(other.ritual_index) == 12  # Reloads the new snapshot
+        assert len(StorageService(tmp_path).ritual_index) == 12
+
+    def test_page_resumes_after_cursor(self, storage: StorageService):
+        for i in range(5):
+            storage.save_ritual(make_ritual(i, tone="coach" if i % 2 else "gentle"))
+
+        page, cursor = storage.page_ritual_summaries(limit=2)
+        assert [s.id for s in page] == ["r-4", "r-3"]
+        page, cursor = storage.page_ritual_summaries(before=cursor, limit=2)
+        assert [s.id for s in page] == ["r-2", "r-1"]
+        page, cursor = storage.page_ritual_summaries(before=cursor, limit=2)
+        assert [s.id for s in page] == ["r-0"] and cursor is None
+
+        page, cursor = storage.page_ritual_summaries(tone="coach", limit=2)
+        assert [s.id for s in page] == ["r-3", "r-1"] and cursor is None
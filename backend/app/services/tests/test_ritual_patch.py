@@ -0,0 +1,123 @@
+"""Tests for JSON Patch / Merge Patch ritual updates."""
+
+import pytest
+
+from app.models.ritual import Ritual, RitualSection, Segment
+from app.services.ritual_patch import (
+    PatchError, PatchTestFailed, PatchValidationError, apply_json_patch, apply_merge_patch, patch_ritual,
+)
+
+
+def make_ritual() -> Ritual:
+    sections = [
+        RitualSection(
+            id=f"sec-{i}", type="body", duration_seconds=30, audio_url=f"/api/audio/r/render/sec-{i}.mp3",
+            segments=[
+                Segment(id=f"seg-{i}-a", type="text", text=f"Text {i}a", duration_seconds=10,
+                        audio_url=f"/api/audio/r/seg-{i}-a.mp3"),
+                Segment(id=f"seg-{i}-b", type="silence", duration_seconds=5),
+                Segment(id=f"seg-{i}-c", type="text", text=f"Text {i}c", duration_seconds=10,
+                        audio_url=f"/api/audio/r/seg-{i}-c.mp3"),
+            ],
+        )
+        for i in range(2)
+    ]
+    return Ritual(id="r", title="Original", duration=60, sections=sections, audio_status="ready",
+                  audio_url="/api/audio/r/render/ritual.mp3", updated_at="2024-01-01T00:00:00Z")
+
+
+@pytest.mark.offline
+class TestJsonPatch:
+    """Tests for apply_json_patch (RFC 6902)."""
+
+    def test_operations(self):
+        document = {"a": {"b": [1, 2, 3]}, "c": "x", "k~/": 1}
+        result = apply_json_patch(document, [
+            {"op": "add", "path": "/a/b/-", "value": 4},
+            {"op": "add", "path": "/a/b/0", "value": 0},
+            {"op": "remove", "path": "/a/b/1"},
+            {"op": "replace", "path": "/c", "value": "y"},
+            {"op": "copy", "from": "/c", "path": "/d"},
+            {"op": "move", "from": "/k~0~1", "path": "/e"},
+            {"op": "test", "path": "/a/b", "value": [0, 2, 3, 4]},
+        ])
+        assert result == {"a": {"b": [0, 2, 3, 4]}, "c": "y", "d": "y", "e": 1}
+
+    @pytest.mark.parametrize("operations", [
+        {"op": "add"},
+        [{"op": "remove", "path": "/missing"}],
+        [{"op": "replace", "path": "/a/b/9", "value": 1}],
+        [{"op": "add", "path": "a", "value": 1}],
+        [{"op": "move", "from": "/a", "path": "/a/b/x"}],
+        [{"op": "frobnicate", "path": "/a"}],
+        [{"op": "add", "path": "/a/b/01", "value": 1}],
+    ])
+    def test_invalid_operations(self, operations):
+        with pytest.raises(PatchError):
+            apply_json_patch({"a": {"b": [1]}}, operations)
+
+    def test_failed_test(self):
+        with pytest.raises(PatchTestFailed):
+            apply_json_patch({"a": 1}, [{"op": "test", "path": "/a", "value": 2}])
+
+
+@pytest.mark.offline
+def test_merge_patch():
+    target = {"a": {"b": 1, "c": 2}, "d": [1, 2], "e": "x"}
+    assert apply_merge_patch(target, {"a": {"b": None, "z": 3}, "d": [3], "f": {"g": 1}}) == {
+        "a": {"c": 2, "z": 3}, "d": [3], "e": "x", "f": {"g": 1},
+    }
+
+
+@pytest.mark.offline
+class TestPatchRitual:
+    """Tests for patch_ritual."""
+
+    def test_title_change_keeps_audio(self):
+        ritual = make_ritual()
+        patched, stale = patch_ritual(ritual, {"title": "Renamed", "id": "other"}, json_patch=False)
+
+        assert patched.title == "Renamed"
+        assert patched.id == "r"
+        assert patched.updated_at > ritual.updated_at
+        assert stale == []
+        assert patched.audio_status == "ready"
+        assert patched.audio_url == ritual.audio_url
+        assert patched.sections[0] is ritual.sections[0]  # Unchanged sections aren't revalidated
+        assert ritual.title == "Original"
+
+    def test_segment_text_change_invalidates_only_that_segment(self):
+        ritual = make_ritual()
+        patched, stale = patch_ritual(ritual, [
+            {"op": "test", "path": "/sections/1/segments/0/id", "value": "seg-1-a"},
+            {"op": "replace", "path": "/sections/1/segments/0/text", "value": "New words"},
+            {"op": "replace", "path": "/sections/1/segments/1/durationSeconds", "value": 8},
+        ], json_patch=True)
+
+        assert stale == ["seg-1-a"]
+        segments = patched.sections[1].segments
+        assert segments[0].text == "New words" and segments[0].audio_url is None
+        assert segments[2].audio_url == "/api/audio/r/seg-1-c.mp3"
+        assert patched.sections[0].audio_url is not None
+        assert patched.sections[1].audio_url is None
+        assert patched.audio_url is None
+        assert patched.audio_status == "pending"
+
+    def test_removed_segments_are_stale(self):
+        ritual = make_ritual()
+        patched, stale = patch_ritual(ritual, [{"op": "remove", "path": "/sections/0"}], json_patch=True)
+
+        assert sorted(stale) == ["seg-0-a", "seg-0-c"]
+        assert [s.id for s in patched.sections] == ["sec-1"]
+        assert patched.audio_status == "ready"  # Remaining segments all have audio
+        assert patched.audio_url is None
+
+    def test_validation_errors_are_located(self):
+        with pytest.raises(PatchValidationError) as e:
+            patch_ritual(make_ritual(), [
+                {"op": "replace", "path": "/sections/1/segments/1/type", "value": "music"},
+                {"op": "replace", "path": "/tone", "value": "loud"},
+            ], json_patch=True)
+        locations = [error["loc"] for error in e.value.errors]
+        assert ("tone",) in locations
+        assert ("sections", 1, "segments", 1, "type") in locations
@@ -0,0 +1,178 @@
+"""Offline tests for server-side ritual rendering."""
+
+import os
+
+import numpy as np
+import pytest
+from pathlib import Path
+
+from app.models.ritual import Ritual, RitualSection, Segment
+from app.services.audio_info import probe_file
+from app.services.ritual_renderer import MASTER_NAME, MissingAudioError, RitualRenderer
+from app.services.storage import StorageService
+from app.services.tts_service import TTSService
+from app.services.wav import wav_header
+from tests.mocks import MockElevenLabsTTSProvider, MockGoogleTTSProvider
+
+MP3_FRAME_SECONDS = 1152 / 44100
+
+
+def build_ritual(ritual_id: str = "render-ritual") -> Ritual:
+    return Ritual(
+        id=ritual_id,
+        title="Render Test",
+        duration=60,
+        sections=[
+            RitualSection(id="intro", type="intro", duration_seconds=10, segments=[
+                Segment(id="s1", type="text", text="Welcome to this ritual.", duration_seconds=2),
+                Segment(id="s2", type="silence", duration_seconds=2.0),
+                Segment(id="s3", type="text", text="Breathe in.", duration_seconds=1),
+            ]),
+            RitualSection(id="body", type="body", duration_seconds=10, segments=[
+                Segment(id="s4", type="silence", duration_seconds=3.0),
+                Segment(id="s5", type="text", text="Let go of any tension.", duration_seconds=2),
+            ]),
+            RitualSection(id="closing", type="closing", duration_seconds=0, segments=[]),
+        ],
+    )
+
+
+@pytest.fixture
+def storage(tmp_path: Path) -> StorageService:
+    return StorageService(tmp_path)
+
+
+@pytest.fixture
+def renderer(storage: StorageService) -> RitualRenderer:
+    return RitualRenderer(storage)
+
+
+async def synthesize_all(storage: StorageService, ritual: Ritual, provider: str) -> dict[str, float]:
+    """Generate mock audio for every text segment; returns durations by segment ID."""
+    service = TTSService(
+        elevenlabs_provider=MockElevenLabsTTSProvider(),
+        google_provider=MockGoogleTTSProvider(),
+        storage_service=storage,
+    )
+    durations = {}
+    for section in ritual.sections:
+        for segment in section.segments:
+            if segment.type == "text":
+                _, durations[segment.id] = await service.synthesize(segment.text, "voice", provider, ritual.id, segment.id)
+    return durations
+
+
+@pytest.mark.offline
+class TestRitualRenderer:
+    """Tests for RitualRenderer."""
+
+    @pytest.mark.parametrize("provider,extension", [("elevenlabs", "mp3"), ("google", "wav")])
+    async def test_render_master_and_sections(self, storage, renderer, provider, extension):
+        ritual = build_ritual()
+        storage.save_ritual(ritual)
+        speech = await synthesize_all(storage, ritual, provider)
+
+        ritual, rendered = renderer.render(ritual.id)
+        assert rendered == ["intro", "body", MASTER_NAME]
+
+        intro, body, closing = ritual.sections
+        assert intro.audio_url == f"/api/audio/{ritual.id}/render/intro.{extension}"
+        assert intro.audio_duration_seconds == pytest.approx(speech["s1"] + 2.0 + speech["s3"], abs=MP3_FRAME_SECONDS)
+        assert body.audio_duration_seconds == pytest.approx(3.0 + speech["s5"], abs=MP3_FRAME_SECONDS)
+        assert closing.audio_url is None
+        assert intro.audio_generated_at is not None
+
+        master = storage.render_file(ritual.id, MASTER_NAME, extension)
+        assert ritual.audio_url == f"/api/audio/{ritual.id}/render/ritual.{extension}"
+        assert ritual.audio_duration_seconds == pytest.approx(intro.audio_duration_seconds + body.audio_duration_seconds)
+        # The recorded duration matches what a parser reads back from the file
+        assert probe_file(master).duration_seconds == pytest.approx(ritual.audio_duration_seconds)
+
+        # Render results are persisted on the stored ritual
+        assert storage.load_ritual(ritual.id).audio_url == ritual.audio_url
+
+    async def test_mp3_silence_is_silent_frames(self, storage, renderer):
+        ritual = build_ritual()
+        storage.save_ritual(ritual)
+        speech = await synthesize_all(storage, ritual, "elevenlabs")
+        renderer.render(ritual.id)
+
+        body = probe_file(storage.render_file(ritual.id, "body", "mp3"))
+        silence_frames = round(3.0 / MP3_FRAME_SECONDS)
+        speech_frames = round(speech["s5"] / MP3_FRAME_SECONDS)
+        assert body.frame_count == silence_frames + speech_frames
+
+    async def test_rerenders_only_changed_sections(self, storage, renderer):
+        ritual = build_ritual()
+        storage.save_ritual(ritual)
+        await synthesize_all(storage, ritual, "elevenlabs")
+        renderer.render(ritual.id)
+        intro_file = storage.render_file(ritual.id, "intro", "mp3")
+        intro_mtime = intro_file.stat().st_mtime_ns
+
+        _, rendered = renderer.render(ritual.id)
+        assert rendered == []
+
+        # Lengthen a silence in the body only
+        ritual = storage.load_ritual(ritual.id)
+        ritual.sections[1].segments[0].duration_seconds = 5.0
+        storage.save_ritual(ritual)
+        ritual, rendered = renderer.render(ritual.id)
+        assert rendered == ["body", MASTER_NAME]
+        assert intro_file.stat().st_mtime_ns == intro_mtime
+
+        # Replacing a segment's audio invalidates its section too
+        path = storage.find_audio(ritual.id, "s1")
+        os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 1_000_000))
+        _, rendered = renderer.render(ritual.id)
+        assert rendered == ["intro", MASTER_NAME]
+
+        _, rendered = renderer.render(ritual.id, force=True)
+        assert rendered == ["intro", "body", MASTER_NAME]
+
+    async def test_removed_section_render_is_deleted(self, storage, renderer):
+        ritual = build_ritual()
+        storage.save_ritual(ritual)
+        await synthesize_all(storage, ritual, "elevenlabs")
+        renderer.render(ritual.id)
+
+        ritual = storage.load_ritual(ritual.id)
+        ritual.sections = ritual.sections[:1]
+        storage.save_ritual(ritual)
+        renderer.render(ritual.id)
+        assert not storage.render_file(ritual.id, "body", "mp3").exists()
+
+    def test_wav_converts_sample_rate_and_channels(self, storage, renderer):
+        ritual = Ritual(id="wav-ritual", title="WAV", duration=10, sections=[
+            RitualSection(id="main", type="body", duration_seconds=10, segments=[
+                Segment(id="a", type="text", text="A", duration_seconds=1),
+                Segment(id="b", type="text", text="B", duration_seconds=1),
+            ]),
+        ])
+        storage.save_ritual(ritual)
+
+        # 1s at 24kHz mono, then 0.5s of 48kHz stereo with distinct channels
+        tone = np.full(24000, 1000, dtype="<i2")
+        storage.save_audio(ritual.id, "a", wav_header(24000, data_size=48000) + tone.tobytes(), "wav")
+        stereo = np.tile(np.array([2000, 4000], dtype="<i2"), 24000)
+        storage.save_audio(ritual.id, "b", wav_header(48000, channels=2, data_size=96000) + stereo.tobytes(), "wav")
+
+        ritual, _ = renderer.render(ritual.id)
+        assert ritual.audio_duration_seconds == pytest.approx(1.5)
+
+        master = storage.render_file(ritual.id, MASTER_NAME, "wav")
+        info = probe_file(master)
+        assert (info.sample_rate, info.channels) == (24000, 1)
+        samples = np.fromfile(master, dtype="<i2", offset=info.data_offset)
+        assert len(samples) == 36000
+        assert (samples[:24000] == 1000).all()
+        assert (samples[24000:] == 3000).all()  # Stereo mixed down to mono
+
+    async def test_missing_audio(self, storage, renderer):
+        ritual = build_ritual()
+        storage.save_ritual(ritual)
+        with pytest.raises(MissingAudioError):
+            renderer.render(ritual.id)
+
+    def test_ritual_not_found(self, renderer):
+        assert renderer.render("nonexistent") is None
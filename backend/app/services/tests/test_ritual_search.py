@@ -0,0 +1,102 @@
+"""Tests for full-text ritual search on both storage backends."""
+
+import pytest
+from pathlib import Path
+
+from app.models.ritual import Ritual, RitualSection, Segment
+from app.services.ritual_search import match_expression
+from app.services.sqlite_storage import SQLiteStorageService
+from app.services.storage import StorageService
+
+
+def make_ritual(i: int, title: str, text: str = "", **kwargs) -> Ritual:
+    section = RitualSection(type="body", duration_seconds=60, segments=[
+        Segment(type="text", text=text, duration_seconds=10),
+        Segment(type="silence", duration_seconds=5),
+    ])
+    return Ritual(id=f"r-{i}", title=title, duration=60, sections=[section], **kwargs)
+
+
+def test_match_expression_quotes_words():
+    assert match_expression('calm "body" -scan') == '"calm" "body" "scan"*'
+    assert match_expression("  ?! ") is None
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize("backend", [StorageService, SQLiteStorageService])
+class TestRitualSearch:
+    """Tests for search_rituals."""
+
+    @pytest.fixture
+    def storage(self, tmp_path: Path, backend) -> StorageService:
+        return backend(tmp_path)
+
+    def test_ranks_fields_and_highlights(self, storage: StorageService):
+        storage.save_ritual(make_ritual(0, "Morning focus", "Notice your breathing slow down."))
+        storage.save_ritual(make_ritual(1, "Breathing space", "Sit comfortably."))
+        storage.save_ritual(make_ritual(2, "Sleep", instructions="Deep breathing before bed"))
+        storage.save_ritual(make_ritual(3, "Unrelated", "Walk.", tags=["gratitude"]))
+
+        hits = storage.search_rituals("breath")
+        assert [hit.entry.id for hit in hits][0] == "r-1"  # Title matches rank first
+        assert {hit.entry.id for hit in hits} == {"r-0", "r-1", "r-2"}
+        assert [hit.score for hit in hits] == sorted((hit.score for hit in hits), reverse=True)
+        assert hits[0].entry.title == "Breathing space"
+        assert "<mark>breathing</mark>" in next(hit.snippet for hit in hits if hit.entry.id == "r-0")
+
+        storage.save_ritual(make_ritual(4, "Markup", "<script>alert(1)</script> & <b>breath</b>\x02work\x03"))
+        (hit,) = storage.search_rituals("alert")
+        assert hit.snippet == "&lt;script&gt;<mark>alert</mark>(1)&lt;/script&gt; &amp; &lt;b&gt;breath&lt;/b&gt;work"
+
+        assert [hit.entry.id for hit in storage.search_rituals("gratitude")] == ["r-3"]
+        assert [hit.entry.id for hit in storage.search_rituals("breathing slow")] == ["r-0"]
+        assert len(storage.search_rituals("breath", limit=2)) == 2
+        assert len(storage.search_rituals("breath", limit=2, offset=2)) == 2
+        assert storage.search_rituals('"') == []
+
+    def test_updated_on_save_and_delete(self, storage: StorageService):
+        ritual = make_ritual(0, "Ocean waves")
+        storage.save_ritual(ritual)
+        ritual.title = "Forest walk"
+        storage.save_ritual(ritual)
+
+        assert storage.search_rituals("ocean") == []
+        assert [hit.entry.id for hit in storage.search_rituals("forest")] == ["r-0"]
+
+        storage.delete_ritual("r-0")
+        assert storage.search_rituals("forest") == []
+
+    def test_persists_across_instances(self, storage: StorageService, tmp_path: Path, backend):
+        storage.save_ritual(make_ritual(0, "Lantern"))
+        assert [hit.entry.id for hit in backend(tmp_path).search_rituals("lantern")] == ["r-0"]
+
+
+@pytest.mark.offline
+def test_file_index_catches_up_with_changes_made_while_closed(tmp_path: Path):
+    storage = StorageService(tmp_path)
+    storage.save_ritual(make_ritual(0, "Candle"))
+    storage.save_ritual(make_ritual(1, "Mountain"))
+
+    # Edit and delete files behind the index's back
+    ritual = storage.load_ritual("r-0")
+    ritual.title = "Lighthouse"
+    path = storage.ritual_file("r-0")
+    path.write_text(ritual.model_dump_json(by_alias=True))
+    storage.ritual_file("r-1").unlink()
+
+    reopened = StorageService(tmp_path)
+    assert [hit.entry.id for hit in reopened.search_rituals("lighthouse")] == ["r-0"]
+    assert reopened.search_rituals("candle") == []
+    assert reopened.search_rituals("mountain") == []
+
+
+@pytest.mark.offline
+def test_sqlite_indexes_databases_created_before_search(tmp_path: Path):
+    storage = SQLiteStorageService(tmp_path)
+    storage.save_ritual(make_ritual(0, "Meadow"))
+    with storage._connect() as conn:
+        conn.execute("DELETE FROM ritual_search")
+        conn.execute("DELETE FROM ritual_search_docs")
+        conn.execute("PRAGMA user_version = 1")
+
+    assert [hit.entry.id for hit in SQLiteStorageService(tmp_path).search_rituals("meadow")] == ["r-0"]
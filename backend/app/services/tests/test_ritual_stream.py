@@ -0,0 +1,100 @@
+"""Offline tests for virtual ritual streams."""
+
+import os
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from pathlib import Path
+
+from app.services.ritual_renderer import MASTER_NAME, MissingAudioError, RitualRenderer
+from app.services.ritual_stream import RitualStreamService
+from app.services.storage import StorageService
+from app.services.tests.test_ritual_renderer import build_ritual, synthesize_all
+
+
+async def read_all(index, start: int, end: int) -> bytes:
+    return b"".join([chunk async for chunk in index.read(start, end)])
+
+
+@pytest.fixture
+def storage(tmp_path: Path) -> StorageService:
+    return StorageService(tmp_path)
+
+
+@pytest.fixture
+def streams(storage: StorageService) -> RitualStreamService:
+    return RitualStreamService(storage)
+
+
+@pytest.mark.offline
+class TestRitualStream:
+    """Tests for RitualStreamService and RitualStreamIndex."""
+
+    @pytest.mark.parametrize("provider,extension", [("elevenlabs", "mp3"), ("google", "wav")])
+    async def test_stream_matches_rendered_master(self, storage, streams, provider, extension):
+        """The virtual stream is byte-identical to the file the renderer writes."""
+        ritual = build_ritual()
+        storage.save_ritual(ritual)
+        await synthesize_all(storage, ritual, provider)
+
+        ritual, _ = RitualRenderer(storage).render(ritual.id)
+        master = storage.render_file(ritual.id, MASTER_NAME, extension).read_bytes()
+
+        index = streams.get_index(ritual)
+        assert index.total_size == len(master)
+        assert index.duration_seconds == pytest.approx(ritual.audio_duration_seconds)
+        assert await read_all(index, 0, index.total_size) == master
+
+    async def test_ranges_match_slices(self, storage, streams):
+        ritual = build_ritual()
+        storage.save_ritual(ritual)
+        await synthesize_all(storage, ritual, "google")
+        index = streams.get_index(ritual)
+        full = await read_all(index, 0, index.total_size)
+
+        rng = random.Random(7)
+        boundaries = [piece.start for piece in index.pieces]
+        for start in boundaries + [rng.randrange(index.total_size) for _ in range(20)]:
+            end = min(index.total_size, start + rng.randrange(1, 200_000))
+            assert await read_all(index, start, end) == full[start:end]
+
+    async def test_locate_is_bisection(self, storage, streams):
+        ritual = build_ritual()
+        storage.save_ritual(ritual)
+        await synthesize_all(storage, ritual, "elevenlabs")
+        index = streams.get_index(ritual)
+
+        for i, piece in enumerate(index.pieces):
+            assert index.locate(piece.start) == i
+            assert index.locate(piece.start + piece.length - 1) == i
+
+    async def test_index_cached_until_audio_changes(self, storage, streams):
+        ritual = build_ritual()
+        storage.save_ritual(ritual)
+        await synthesize_all(storage, ritual, "elevenlabs")
+
+        index = streams.get_index(ritual)
+        assert streams.get_index(ritual) is index
+
+        path = storage.find_audio(ritual.id, "s3")
+        os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 1_000_000))
+        assert streams.get_index(ritual) is not index
+
+    async def test_missing_audio(self, storage, streams):
+        with pytest.raises(MissingAudioError):
+            streams.get_index(build_ritual())
+
+    async def test_concurrent_lookups_keep_the_cap(self, storage):
+        """Indexes are fetched from worker threads; the LRU must stay consistent and bounded."""
+        streams = RitualStreamService(storage, max_indexes=2)
+        rituals = [build_ritual(f"stream-{i}") for i in range(5)]
+        for ritual in rituals:
+            storage.save_ritual(ritual)
+            await synthesize_all(storage, ritual, "google")
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            indexes = list(pool.map(streams.get_index, rituals * 8))
+
+        assert all(index.total_size == indexes[0].total_size for index in indexes)
+        assert len(streams._indexes) <= 2
@@ -0,0 +1,93 @@
+"""Tests for the SQLite storage backend and migration between backends."""
+
+import sqlite3
+
+import pytest
+from pathlib import Path
+
+from app.models.ritual import Ritual
+from app.services.sqlite_storage import SQLiteStorageService, migrate_rituals
+from app.services.storage import StorageService
+
+
+def make_ritual(i: int, **kwargs) -> Ritual:
+    return Ritual(id=f"r-{i}", title=f"Ritual {i}", duration=60, created_at=f"2024-01-{i + 1:02d}T00:00:00Z", **kwargs)
+
+
+@pytest.mark.offline
+class TestSQLiteStorageService:
+    """Tests for SQLiteStorageService."""
+
+    @pytest.fixture
+    def storage(self, tmp_path: Path) -> SQLiteStorageService:
+        return SQLiteStorageService(tmp_path)
+
+    def test_save_load_and_delete(self, storage: SQLiteStorageService):
+        ritual = make_ritual(0, tags=["calm"])
+        storage.save_ritual(ritual)
+        storage.save_audio(ritual.id, "seg-1", b"audio data")
+
+        assert storage.load_ritual("r-0") == ritual
+        assert storage.ritual_exists("r-0")
+        assert storage.count_rituals() == 1
+
+        ritual.title = "Renamed"
+        storage.save_ritual(ritual)
+        assert storage.load_ritual("r-0").title == "Renamed"
+        assert storage.count_rituals() == 1
+
+        assert storage.delete_ritual("r-0") is True
+        assert storage.load_ritual("r-0") is None
+        assert not (storage.audio_path / "r-0").exists()
+
+    def test_wal_mode(self, storage: SQLiteStorageService):
+        conn = sqlite3.connect(storage.db_path)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_listing_matches_file_backend(self, storage: SQLiteStorageService, tmp_path: Path):
+        files = StorageService(tmp_path / "files")
+        for i in range(6):
+            ritual = make_ritual(i, tags=["a", "b"] if i % 2 else ["a"], tone="coach" if i % 3 else "gentle",
+                                 is_template=i == 4)
+            storage.save_ritual(ritual)
+            files.save_ritual(ritual)
+
+        queries = [
+            {},
+            {"limit": 2},
+            {"limit": 2, "before": ("2024-01-04T00:00:00Z", "r-3")},
+            {"tags": ["a", "b"]},
+            {"tags": ["b"], "tone": "coach", "limit": 1},
+            {"is_template": True},
+            {"audio_status": "ready"},
+        ]
+        for query in queries:
+            expected, expected_next = files.page_ritual_summaries(**query)
+            entries, next_key = storage.page_ritual_summaries(**query)
+            assert [e.to_row()[:-1] for e in entries] == [e.to_row()[:-1] for e in expected], query
+            assert next_key == expected_next, query
+
+        assert [e.id for e in storage.list_ritual_summaries()] == [e.id for e in files.list_ritual_summaries()]
+        assert [r.id for r in storage.load_rituals(["r-3", "missing", "r-1"])] == ["r-3", "r-1"]
+        assert storage.get_ritual_summary("r-1").tags == ("a", "b")
+
+    def test_tags_replaced_on_save(self, storage: SQLiteStorageService):
+        storage.save_ritual(make_ritual(0, tags=["old"]))
+        storage.save_ritual(make_ritual(0, tags=["new"]))
+        assert storage.page_ritual_summaries(tags=["old"])[0] == []
+        assert [e.id for e in storage.page_ritual_summaries(tags=["new"])[0]] == ["r-0"]
+
+    def test_migration_round_trip(self, tmp_path: Path):
+        files = StorageService(tmp_path / "files")
+        for i in range(7):
+            files.save_ritual(make_ritual(i, tags=[f"t{i}"]))
+
+        database = SQLiteStorageService(tmp_path / "files")
+        assert migrate_rituals(files, database, batch_size=3) == 7
+        # Rerunning replaces rather than duplicating
+        assert migrate_rituals(files, database, batch_size=3) == 7
+        assert database.count_rituals() == 7
+
+        restored = StorageService(tmp_path / "restored")
+        assert migrate_rituals(database, restored) == 7
+        assert restored.list_rituals() == files.list_rituals()
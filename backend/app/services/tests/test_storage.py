@@ -4,6 +4,7 @@ import json
 import pytest
 from pathlib import Path
 
+from app.models.audio_job import AudioJob, SegmentProgress
 from app.models.ritual import Ritual
 from app.services.storage import StorageService
 
@@ -104,3 +105,201 @@ class TestStorageService:
         assert "createdAt" in data
         assert "updatedAt" in data
         assert "audioStatus" in data
+
+    def test_save_and_load_audio_job(self, storage: StorageService):
+        """Audio job progress should round-trip through storage."""
+        job = AudioJob(
+            ritual_id="job-ritual",
+            voice_id="sarah",
+            provider="elevenlabs",
+            segments=[SegmentProgress(segment_id="seg-1", status="generated", duration_seconds=1.5)],
+        )
+        storage.save_audio_job(job)
+
+        loaded = storage.load_audio_job(job.id)
+        assert loaded is not None
+        assert loaded.ritual_id == "job-ritual"
+        assert loaded.segments[0].status == "generated"
+        assert loaded.segments[0].duration_seconds == 1.5
+        assert storage.load_audio_job("missing-job") is None
+
+
+@pytest.mark.offline
+class TestAudioIntegrity:
+    """Tests for atomic writes, the audio manifest, and verify/repair."""
+
+    @pytest.fixture
+    def storage(self, tmp_path: Path) -> StorageService:
+        return StorageService(tmp_path)
+
+    @staticmethod
+    def mp3(frames: int = 20) -> bytes:
+        return (b"\xff\xfb\x90\x00" + bytes(413)) * frames
+
+    def test_failed_write_keeps_previous_file(self, storage: StorageService, monkeypatch):
+        ritual = Ritual(id="atomic", title="Before", duration=60)
+        storage.save_ritual(ritual)
+
+        def fail(*args, **kwargs):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(json, "dumps", fail)
+        ritual.title = "After"
+        with pytest.raises(OSError):
+            storage.save_ritual(ritual)
+        monkeypatch.undo()
+
+        assert storage.load_ritual("atomic").title == "Before"
+        assert [p.name for p in storage.rituals_path.iterdir() if p.name.startswith(".")] == []
+
+    def test_manifest_records_every_write_path(self, storage: StorageService, tmp_path: Path):
+        storage.save_audio("r", "saved", self.mp3())
+        writer = storage.open_audio_writer("r", "streamed", "mp3")
+        writer.write(self.mp3(5))
+        writer.write(self.mp3(5))
+        writer.commit()
+        blob = tmp_path / "blob.mp3"
+        blob.write_bytes(self.mp3(3))
+        storage.link_audio("r", "linked", blob)
+
+        manifest = storage.load_audio_manifest("r")
+        assert manifest["saved.mp3"]["size"] == len(self.mp3())
+        assert manifest["streamed.mp3"]["size"] == len(self.mp3(10))
+        assert manifest["linked.mp3"]["size"] == len(self.mp3(3))
+
+        result = storage.verify_ritual_audio("r")
+        assert (result["checked"], result["ok"], result["corrupt"]) == (3, 3, {})
+
+    def test_verify_and_repair(self, storage: StorageService):
+        ritual = Ritual(id="verify", title="Verify", duration=60, audio_status="ready")
+        storage.save_ritual(ritual)
+        for segment_id in ("good", "short", "flipped"):
+            storage.save_audio("verify", segment_id, self.mp3())
+
+        audio_dir = storage.audio_path / "verify"
+        (audio_dir / "short.mp3").write_bytes(self.mp3()[:1000])
+        flipped = bytearray(self.mp3())
+        flipped[500] ^= 0xFF
+        (audio_dir / "flipped.mp3").write_bytes(bytes(flipped))
+        (audio_dir / "legacy.mp3").write_bytes(self.mp3())  # Predates the manifest
+        (audio_dir / "junk.mp3").write_bytes(b"not audio")
+
+        result = storage.verify_ritual_audio("verify")
+        assert result["ok"] == 2
+        assert set(result["corrupt"]) == {"short", "flipped", "junk"}
+        assert result["corrupt"]["short"].startswith("truncated")
+        assert result["corrupt"]["flipped"] == "checksum mismatch"
+        assert result["adopted"] == ["legacy"]
+        assert result["removed"] == []
+        assert (audio_dir / "short.mp3").exists()
+
+        result = storage.verify_ritual_audio("verify", repair=True)
+        assert sorted(result["removed"]) == ["flipped", "junk", "short"]
+        assert not storage.audio_exists("verify", "short")
+        assert storage.audio_exists("verify", "good")
+        assert set(storage.load_audio_manifest("verify")) == {"good.mp3", "legacy.mp3"}
+        assert storage.load_ritual("verify").audio_status == "pending"
+
+    def test_status_scans_audio_directory_once(self, storage: StorageService, monkeypatch):
+        """Audio status costs one directory scan, not a stat per segment."""
+        from app.models.ritual import RitualSection, Segment
+        import app.services.storage as storage_module
+
+        segments = [Segment(id=f"s{i}", type="text", text="Hi.", duration_seconds=1) for i in range(50)]
+        storage.save_ritual(Ritual(id="scan", title="Scan", duration=60, sections=[
+            RitualSection(id="body", type="body", duration_seconds=60, segments=segments),
+        ]))
+        for i in range(0, 50, 2):
+            storage.save_audio("scan", f"s{i}", self.mp3(), "mp3" if i % 4 else "wav")
+
+        scans = []
+        real_scandir = storage_module.os.scandir
+        monkeypatch.setattr(storage_module.os, "scandir", lambda path: scans.append(path) or real_scandir(path))
+        monkeypatch.setattr(storage, "find_audio", None)
+
+        status = storage.get_ritual_audio_status("scan")
+        assert (status["total"], status["generated"], status["missing"]) == (50, 25, 25)
+        assert status["segments"]["s0"] and not status["segments"]["s1"]
+        assert len(scans) == 1
+
+        monkeypatch.undo()
+        assert storage.segment_audio("scan")["s2"].name == "s2.mp3"
+        assert storage.segment_audio("missing-ritual") == {}
+
+
+@pytest.mark.offline
+class TestShardedLayout:
+    """Tests for the hash-prefix sharded layout and online migration to it."""
+
+    def test_sharded_paths(self, tmp_path: Path):
+        from app.services.storage import shard_prefix
+
+        storage = StorageService(tmp_path, layout="sharded")
+        storage.save_ritual(Ritual(id="r-1", title="Sharded", duration=60))
+        url = storage.save_audio("r-1", "seg-1", b"audio")
+
+        prefix = shard_prefix("r-1")
+        assert (storage.rituals_path / prefix / "r-1.json").exists()
+        assert (storage.audio_path / prefix / "r-1" / "seg-1.mp3").exists()
+        assert url == "/api/audio/r-1/seg-1.mp3"
+        assert storage.resolve_audio_path("r-1/seg-1.mp3") == storage.audio_path / prefix / "r-1" / "seg-1.mp3"
+        assert storage.resolve_audio_path("r-1/../../rituals") is None
+        assert [r.id for r in storage.list_rituals()] == ["r-1"]
+
+        storage.save_audio("temp", "adhoc", b"audio")
+        assert (storage.audio_path / "temp" / shard_prefix("adhoc") / "adhoc.mp3").exists()
+        assert storage.resolve_audio_path("temp/adhoc.mp3").read_bytes() == b"audio"
+
+        storage.delete_ritual("r-1")
+        assert storage.load_ritual("r-1") is None
+        assert not (storage.audio_path / prefix / "r-1").exists()
+
+    def test_online_migration(self, tmp_path: Path):
+        flat = StorageService(tmp_path)
+        for i in range(3):
+            flat.save_ritual(Ritual(id=f"m-{i}", title=f"Ritual {i}", duration=60))
+            flat.save_audio(f"m-{i}", "seg", b"audio")
+        flat.save_audio("temp", "adhoc", b"audio")
+
+        sharded = StorageService(tmp_path, layout="sharded")
+        # Not migrated yet: reads fall back to the flat layout
+        assert sharded.load_ritual("m-0").title == "Ritual 0"
+        assert sharded.resolve_audio_path("m-0/seg.mp3") == tmp_path / "audio" / "m-0" / "seg.mp3"
+        assert sharded.resolve_audio_path("temp/adhoc.mp3") is not None
+
+        # Writing moves a ritual's audio over first
+        sharded.save_audio("m-1", "new", b"audio")
+        assert set(sharded.segment_audio("m-1")) == {"seg", "new"}
+        assert not (tmp_path / "audio" / "m-1").exists()
+
+        moved = sharded.migrate_layout()
+        assert moved == {"rituals": 3, "audio_dirs": 2}
+        assert not list((tmp_path / "rituals").glob("*.json"))
+        assert sorted(r.id for r in StorageService(tmp_path, layout="sharded").list_rituals()) == ["m-0", "m-1", "m-2"]
+        assert sharded.resolve_audio_path("m-2/seg.mp3").read_bytes() == b"audio"
+        assert sharded.migrate_layout() == {"rituals": 0, "audio_dirs": 0}
+
+
+@pytest.mark.offline
+@pytest.mark.parametrize("backend", ["files", "sqlite"])
+def test_conditional_save(tmp_path: Path, backend: str):
+    """save_ritual with if_match only overwrites the version it was given."""
+    from app.services.sqlite_storage import SQLiteStorageService
+    from app.services.storage import PreconditionFailedError, ritual_etag
+
+    storage = StorageService(tmp_path) if backend == "files" else SQLiteStorageService(tmp_path)
+    ritual = Ritual(id="cond", title="One", duration=60)
+    with pytest.raises(PreconditionFailedError):
+        storage.save_ritual(ritual, if_match=["*"])  # Nothing stored yet
+    storage.save_ritual(ritual)
+    etag = ritual_etag(storage.load_ritual("cond"))
+
+    first = ritual.model_copy(update={"title": "First"})
+    second = ritual.model_copy(update={"title": "Second"})
+    storage.save_ritual(first, if_match=['"other"', etag])
+    with pytest.raises(PreconditionFailedError):
+        storage.save_ritual(second, if_match=[etag])
+    assert storage.load_ritual("cond").title == "First"
+
+    storage.save_ritual(second, if_match=["*"])
+    assert storage.load_ritual("cond").title == "Second"
@@ -7,6 +7,7 @@ Requires API keys in environment.
 import os
 import pytest
 
+from app.services.audio_info import probe_bytes
 from app.services.elevenlabs_tts import ElevenLabsTTSProvider, ELEVENLABS_VOICES
 from app.services.google_tts import GoogleTTSProvider, GOOGLE_VOICES
 from app.services.tts_service import TTSService
@@ -63,12 +64,11 @@ class TestElevenLabsProvider:
     async def test_synthesize_real_api(self, minimal_tts_text):
         """Test real ElevenLabs API with minimal text."""
         provider = ElevenLabsTTSProvider()
-        result = await provider.synthesize(minimal_tts_text, "sarah")
+        audio_bytes = b"".join([chunk async for chunk in provider.stream(minimal_tts_text, "sarah")])
 
-        assert result.audio_bytes
-        assert len(result.audio_bytes) > 0
-        assert result.duration_seconds > 0
-        assert result.content_type == "audio/mpeg"
+        assert len(audio_bytes) > 0
+        assert probe_bytes(audio_bytes).duration_seconds > 0
+        assert provider.content_type == "audio/mpeg"
 
 
 class TestGoogleTTSProvider:
@@ -104,12 +104,11 @@ class TestGoogleTTSProvider:
     async def test_synthesize_real_api(self, minimal_tts_text):
         """Test real Google TTS API with minimal text."""
         provider = GoogleTTSProvider()
-        result = await provider.synthesize(minimal_tts_text, "aoede")
+        audio_bytes = b"".join([chunk async for chunk in provider.stream(minimal_tts_text, "aoede")])
 
-        assert result.audio_bytes
-        assert len(result.audio_bytes) > 0
-        assert result.duration_seconds > 0
-        assert result.content_type == "audio/wav"
+        assert audio_bytes[:4] == b"RIFF"
+        assert probe_bytes(audio_bytes).duration_seconds > 0
+        assert provider.content_type == "audio/wav"
 
 
 class TestTTSService:
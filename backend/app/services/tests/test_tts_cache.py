@@ -0,0 +1,147 @@
+"""Offline tests for the content-addressed TTS cache."""
+
+import threading
+
+import pytest
+from pathlib import Path
+
+from app.services import tts_service
+from app.services.storage import StorageService
+from app.services.tts_cache import TTSCache, normalize_text
+from app.services.tts_service import TTSService
+from tests.mocks import MockElevenLabsTTSProvider, MockGoogleTTSProvider
+
+
+@pytest.mark.offline
+class TestTTSCache:
+    """Unit tests for TTSCache."""
+
+    @pytest.fixture
+    def cache(self, tmp_path: Path) -> TTSCache:
+        return TTSCache(tmp_path / "cache", max_bytes=1000)
+
+    def _audio(self, tmp_path: Path, name: str, size: int) -> Path:
+        path = tmp_path / name
+        path.write_bytes(b"\x01" * size)
+        return path
+
+    def test_key_normalizes_text(self):
+        """Whitespace and Unicode composition differences share a key."""
+        a = TTSCache.make_key("elevenlabs", "voice", "model", 1.0, "Take a deep  breath in…")
+        b = TTSCache.make_key("elevenlabs", "voice", "model", 1.0, " Take a deep breath\nin… ")
+        assert a == b
+        assert normalize_text("Caf\u00e9") == normalize_text("Cafe\u0301")
+
+    def test_key_depends_on_every_input(self):
+        base = ("elevenlabs", "voice", "model", 1.0, "Breathe.")
+        keys = {
+            TTSCache.make_key(*base),
+            TTSCache.make_key("google", *base[1:]),
+            TTSCache.make_key(base[0], "other-voice", *base[2:]),
+            TTSCache.make_key(*base[:2], "other-model", *base[3:]),
+            TTSCache.make_key(*base[:3], 1.25, base[4]),
+            TTSCache.make_key(*base[:4], "Exhale."),
+        }
+        assert len(keys) == 6
+
+    def test_miss_then_hit(self, cache: TTSCache, tmp_path: Path):
+        assert cache.get("k1") is None
+        cache.put("k1", self._audio(tmp_path, "a.mp3", 100))
+
+        blob = cache.get("k1")
+        assert blob is not None and blob.read_bytes() == b"\x01" * 100
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["bytes_saved"]) == (1, 1, 100)
+
+    def test_lru_eviction_by_size(self, cache: TTSCache, tmp_path: Path):
+        """The least recently used entry goes first once over budget."""
+        for key in ("k1", "k2", "k3"):
+            cache.put(key, self._audio(tmp_path, f"{key}.mp3", 400))
+        # k1 was evicted when k3 pushed the total to 1200 bytes
+        assert cache.get("k1") is None
+
+        cache.get("k2")  # k2 is now most recently used
+        cache.put("k4", self._audio(tmp_path, "k4.mp3", 400))
+        assert cache.get("k3") is None
+        assert cache.get("k2") is not None
+        assert cache.stats()["evictions"] == 2
+        assert cache.total_bytes == 800
+
+    def test_index_rebuilt_from_disk(self, cache: TTSCache, tmp_path: Path):
+        cache.put("k1", self._audio(tmp_path, "a.wav", 100))
+        reloaded = TTSCache(cache.cache_path, max_bytes=1000)
+        assert reloaded.get("k1") is not None
+        assert reloaded.total_bytes == 100
+
+
+@pytest.mark.offline
+class TestTTSServiceCache:
+    """TTSService should reuse cached audio across rituals."""
+
+    @pytest.fixture
+    def provider(self) -> MockElevenLabsTTSProvider:
+        return MockElevenLabsTTSProvider()
+
+    @pytest.fixture
+    def service(self, provider: MockElevenLabsTTSProvider, tmp_path: Path) -> TTSService:
+        return TTSService(
+            elevenlabs_provider=provider,
+            google_provider=MockGoogleTTSProvider(),
+            storage_service=StorageService(tmp_path / "storage"),
+            cache=TTSCache(tmp_path / "cache", max_bytes=10_000_000),
+        )
+
+    @pytest.mark.asyncio
+    async def test_repeated_line_synthesized_once(self, service: TTSService, provider: MockElevenLabsTTSProvider):
+        url1, duration1 = await service.synthesize("Take a deep breath in.", "sarah", "elevenlabs", "ritual-a", "seg-1")
+        url2, duration2 = await service.synthesize("Take a deep breath in. ", "sarah", "elevenlabs", "ritual-b", "seg-9")
+
+        assert provider.calls == 1
+        assert url2 == "/api/audio/ritual-b/seg-9.mp3"
+        assert duration1 == duration2
+
+        first = service.storage.audio_path / "ritual-a" / "seg-1.mp3"
+        second = service.storage.audio_path / "ritual-b" / "seg-9.mp3"
+        assert first.read_bytes() == second.read_bytes()
+        assert first.stat().st_ino == second.stat().st_ino  # Stored once, linked twice
+
+        stats = service.cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["bytes_saved"] == second.stat().st_size
+
+    @pytest.mark.asyncio
+    async def test_different_voice_is_a_miss(self, service: TTSService, provider: MockElevenLabsTTSProvider):
+        await service.synthesize("Breathe.", "sarah", "elevenlabs", "ritual-c", "seg-1")
+        await service.synthesize("Breathe.", "daniel", "elevenlabs", "ritual-c", "seg-2")
+        assert provider.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_stream_served_from_cache(self, service: TTSService, provider: MockElevenLabsTTSProvider, monkeypatch):
+        await service.synthesize("Relax.", "sarah", "elevenlabs", "ritual-d", "seg-1")
+
+        threads = []
+
+        def recording_open(*args, **kwargs):
+            threads.append(threading.current_thread().name.split("_")[0])
+            return open(*args, **kwargs)
+
+        # The cached blob is opened (and read) on storage I/O threads, not the event loop
+        monkeypatch.setattr(tts_service, "open", recording_open, raising=False)
+        _, _, chunks = service.stream("Relax.", "sarah", "elevenlabs", "ritual-d", "seg-2")
+        body = b"".join([chunk async for chunk in chunks])
+
+        assert threads == ["storage-io"]
+        assert provider.calls == 1
+        assert body == (service.storage.audio_path / "ritual-d" / "seg-1.mp3").read_bytes()
+        assert service.storage.audio_exists("ritual-d", "seg-2")
+
+    @pytest.mark.asyncio
+    async def test_regenerating_segment_does_not_corrupt_blob(self, service: TTSService):
+        """Overwriting a linked ritual file replaces the link, not the shared blob."""
+        await service.synthesize("Relax.", "sarah", "elevenlabs", "ritual-e", "seg-1")
+        blob = next(service.cache.cache_path.glob("*/*.mp3"))
+        original = blob.read_bytes()
+
+        await service.synthesize("Something else.", "sarah", "elevenlabs", "ritual-e", "seg-1")
+        assert blob.read_bytes() == original
@@ -1,8 +1,14 @@
 """Offline unit tests for TTSService with mock providers."""
 
+import asyncio
+import threading
+import tracemalloc
 import pytest
 from pathlib import Path
 
+from app.models.ritual import Ritual
+from app.services import audio_jobs
+from app.services.audio_jobs import AudioJobManager
 from app.services.tts_service import TTSService
 from app.services.storage import StorageService
 from tests.mocks import MockElevenLabsTTSProvider, MockGoogleTTSProvider
@@ -68,3 +74,198 @@ class TestTTSServiceMocked:
         providers = {v.provider for v in voices}
         assert "elevenlabs" in providers
         assert "google" in providers
+
+
+@pytest.mark.offline
+class TestTTSServiceConcurrency:
+    """Per-provider concurrency limits in TTSService."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit_per_provider(self, test_storage_path: Path):
+        """In-flight calls should never exceed the provider's limit."""
+        elevenlabs = MockElevenLabsTTSProvider(latency=0.05)
+        google = MockGoogleTTSProvider(latency=0.05)
+        service = TTSService(
+            elevenlabs_provider=elevenlabs,
+            google_provider=google,
+            storage_service=StorageService(test_storage_path),
+            concurrency_limits={"elevenlabs": 3, "google": 1},
+        )
+
+        await asyncio.gather(
+            *(
+                service.synthesize(f"Line {i}.", "sarah", "elevenlabs", "limit-ritual", f"el-{i}")
+                for i in range(9)
+            ),
+            *(
+                service.synthesize(f"Line {i}.", "aoede", "google", "limit-ritual", f"g-{i}")
+                for i in range(3)
+            ),
+        )
+
+        assert elevenlabs.calls == 9
+        assert elevenlabs.max_in_flight == 3
+        assert google.calls == 3
+        assert google.max_in_flight == 1
+
+    def test_usable_from_successive_event_loops(self, test_storage_path: Path):
+        """A shared service keeps working when a later event loop contends for the same provider."""
+        service = TTSService(
+            elevenlabs_provider=MockElevenLabsTTSProvider(latency=0.01),
+            google_provider=MockGoogleTTSProvider(),
+            storage_service=StorageService(test_storage_path),
+            concurrency_limits={"elevenlabs": 1},
+        )
+
+        async def contend(run: int) -> None:
+            await asyncio.gather(*(
+                service.synthesize(f"Run {run}, line {i}.", "sarah", "elevenlabs", "loops-ritual", f"{run}-{i}")
+                for i in range(3)
+            ))
+
+        asyncio.run(contend(0))
+        asyncio.run(contend(1))  # Would fail if the semaphore stayed bound to the first loop
+        assert service.elevenlabs.calls == 6
+        assert service.elevenlabs.max_in_flight == 1
+
+
+@pytest.mark.offline
+class TestTTSServiceStream:
+    """TTSService.stream relays chunks and tees them to storage."""
+
+    @pytest.fixture
+    def service(self, test_storage_path: Path) -> TTSService:
+        return TTSService(
+            elevenlabs_provider=MockElevenLabsTTSProvider(),
+            google_provider=MockGoogleTTSProvider(),
+            storage_service=StorageService(test_storage_path),
+        )
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_chunks_and_publishes_file(self, service: TTSService, test_storage_path: Path):
+        url, content_type, chunks = service.stream("Hello.", "sarah", "elevenlabs", "stream-svc", "seg-1")
+        assert url == "/api/audio/stream-svc/seg-1.mp3"
+        assert content_type == "audio/mpeg"
+
+        received = [chunk async for chunk in chunks]
+        assert len(received) == MockElevenLabsTTSProvider.CHUNK_COUNT
+        saved = test_storage_path / "audio" / "stream-svc" / "seg-1.mp3"
+        assert saved.read_bytes() == b"".join(received)
+
+    @pytest.mark.asyncio
+    async def test_stream_abandoned_early_discards_partial(self, service: TTSService, test_storage_path: Path):
+        """A consumer that stops early (client disconnect) must not leave a file behind."""
+        _, _, chunks = service.stream("Hello.", "sarah", "elevenlabs", "stream-abort", "seg-1")
+        await anext(chunks)
+        await chunks.aclose()
+
+        ritual_dir = test_storage_path / "audio" / "stream-abort"
+        assert list(ritual_dir.iterdir()) == []
+        assert not service.storage.audio_exists("stream-abort", "seg-1")
+
+    @pytest.mark.asyncio
+    async def test_file_io_runs_off_the_event_loop(self, service: TTSService, monkeypatch):
+        """Audio writes and the commit's fsync happen on storage I/O threads."""
+        from app.services.storage import AudioWriter
+
+        threads = set()
+        for name in ("write", "commit"):
+            original = getattr(AudioWriter, name)
+
+            def record(self, *args, original=original):
+                threads.add(threading.current_thread().name.split("_")[0])
+                return original(self, *args)
+
+            monkeypatch.setattr(AudioWriter, name, record)
+
+        await service.synthesize("Hello.", "sarah", "elevenlabs", "io-ritual", "seg-1")
+        assert threads == {"storage-io"}
+
+    @pytest.mark.asyncio
+    async def test_synthesize_memory_bounded_by_chunk_size(self, service: TTSService, test_storage_path: Path):
+        """A large synthesis should never be held in memory as a whole."""
+        chunk_size = 64 * 1024
+        chunk_count = 80  # 5 MiB total
+
+        class LargeStreamProvider(MockElevenLabsTTSProvider):
+            async def stream(self, text: str, voice_id: str = "", speed: float = 1.0):
+                for _ in range(chunk_count):
+                    yield bytes(chunk_size)
+
+        service._elevenlabs = LargeStreamProvider()
+
+        tracemalloc.start()
+        try:
+            url, duration = await service.synthesize("Long.", "sarah", "elevenlabs", "big-ritual", "big-seg")
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        saved = test_storage_path / "audio" / "big-ritual" / "big-seg.mp3"
+        assert saved.stat().st_size == chunk_size * chunk_count
+        assert peak < chunk_size * 8
+        assert duration > 0
+
+
+@pytest.mark.offline
+class TestAudioJobManagerMemory:
+    """Finished audio jobs don't accumulate in memory."""
+
+    @pytest.fixture
+    def storage(self, test_storage_path: Path) -> StorageService:
+        return StorageService(test_storage_path)
+
+    def manager(self, storage: StorageService, **kwargs) -> AudioJobManager:
+        tts = TTSService(
+            elevenlabs_provider=MockElevenLabsTTSProvider(latency=0.05),
+            google_provider=MockGoogleTTSProvider(),
+            storage_service=storage,
+        )
+        return AudioJobManager(tts, storage, **kwargs)
+
+    @staticmethod
+    def ritual(storage: StorageService, ritual_id: str) -> Ritual:
+        ritual = Ritual.model_validate({
+            "id": ritual_id, "title": ritual_id, "duration": 60,
+            "sections": [{"id": f"{ritual_id}-sec", "type": "body", "durationSeconds": 60, "segments": [
+                {"id": f"{ritual_id}-seg", "type": "text", "text": "Breathe.", "durationSeconds": 5},
+            ]}],
+        })
+        storage.save_ritual(ritual)
+        return ritual
+
+    @pytest.mark.asyncio
+    async def test_expired_jobs_are_read_back_from_storage(self, storage: StorageService):
+        manager = self.manager(storage, job_ttl_seconds=0)
+        job = await manager.start_job(self.ritual(storage, "ttl-ritual"), "sarah", "elevenlabs")
+        await manager.wait(job.id)
+
+        assert manager._jobs == {} and manager._tasks == {} and manager.get_latest_job("ttl-ritual") is None
+        stored = await manager.get_job(job.id)
+        assert stored.status == "completed" and stored.generated == 1
+
+    @pytest.mark.asyncio
+    async def test_cap_keeps_latest_job_per_ritual(self, storage: StorageService, monkeypatch):
+        monkeypatch.setattr(audio_jobs, "MAX_FINISHED_JOBS", 1)
+        manager = self.manager(storage)
+        first = await manager.start_job(self.ritual(storage, "cap-a"), "sarah", "elevenlabs")
+        await manager.wait(first.id)
+        second = await manager.start_job(self.ritual(storage, "cap-b"), "sarah", "elevenlabs")
+        await manager.wait(second.id)
+
+        # Over the cap, but both are their ritual's latest job
+        assert set(manager._jobs) == {first.id, second.id}
+        third = await manager.start_job(storage.load_ritual("cap-a"), "daniel", "elevenlabs")
+        await manager.wait(third.id)
+        assert set(manager._jobs) == {second.id, third.id}
+        assert (await manager.get_job(first.id)).status == "completed"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_before_running_leaves_no_task(self, storage: StorageService):
+        manager = self.manager(storage)
+        job = await manager.start_job(self.ritual(storage, "cancel-ritual"), "sarah", "elevenlabs")
+        cancelled = await manager.cancel_job(job.id)
+        await asyncio.sleep(0)  # Let the done callback run
+
+        assert cancelled.status == "cancelled"
+        assert manager._tasks == {}
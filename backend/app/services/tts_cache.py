@@ -0,0 +1,149 @@
+"""Content-addressed, disk-backed cache of synthesized TTS audio."""
+
+import hashlib
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from ..config import get_settings
+from ..logging_config import get_logger
+from .storage import link_or_copy
+
+logger = get_logger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different scripts share cache entries."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class TTSCache:
+    """
+    Cache of synthesized audio keyed by a hash of the synthesis inputs.
+
+    Each entry is one blob file under cache_path/{key[:2]}/{key}.{ext}; ritual
+    audio files are hard links to these blobs. Entries are evicted least
+    recently used first once the total blob size exceeds max_bytes. Recency
+    is tracked with blob mtimes, so the LRU order survives restarts.
+    Lookups and inserts run on storage I/O threads, so they hold a lock.
+    """
+
+    def __init__(self, cache_path: Optional[Path] = None, max_bytes: Optional[int] = None):
+        settings = get_settings()
+        self.cache_path = cache_path or settings.storage_path / "cache" / "tts"
+        self.max_bytes = max_bytes if max_bytes is not None else settings.tts_cache_max_bytes
+        self.cache_path.mkdir(parents=True, exist_ok=True)
+
+        self._entries: OrderedDict[str, tuple[Path, int]] = OrderedDict()  # key -> (blob, size), LRU first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        """Rebuild the in-memory LRU index from the blob store."""
+        blobs = []
+        for blob in self.cache_path.glob("*/*"):
+            if blob.name.startswith("."):
+                continue  # Leftover temp file
+            stat = blob.stat()
+            blobs.append((stat.st_mtime, blob.stem, blob, stat.st_size))
+        for _, key, blob, size in sorted(blobs):
+            self._entries[key] = (blob, size)
+            self.total_bytes += size
+        if blobs:
+            logger.info(f"TTS cache loaded: {len(blobs)} entries, {self.total_bytes} bytes")
+
+    @staticmethod
+    def make_key(provider: str, voice_id: str, model: str, speed: float, text: str) -> str:
+        """Hash the inputs that determine the synthesized audio."""
+        material = "\0".join([provider, voice_id, model, f"{speed:g}", normalize_text(text)])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Path]:
+        """Return the blob for key (marking it recently used), or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry[0].exists():
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+
+            blob, size = entry
+            self._entries.move_to_end(key)
+            os.utime(blob)
+            self.hits += 1
+            self.bytes_saved += size
+            return blob
+
+    def put(self, key: str, source: Path) -> Path:
+        """Store source's content under key and evict down to the size budget."""
+        with self._lock:
+            blob = self.cache_path / key[:2] / f"{key}{source.suffix}"
+            blob.parent.mkdir(exist_ok=True)
+            link_or_copy(source, blob)
+
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            size = blob.stat().st_size
+            self._entries[key] = (blob, size)
+            self.total_bytes += size
+            self._evict()
+            return blob
+
+    def discard(self, key: str) -> bool:
+        """Remove an entry (e.g. one whose audio turned out corrupt); returns whether it existed."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            entry[0].unlink(missing_ok=True)
+            self._drop(key)
+            return True
+
+    def _evict(self) -> None:
+        """Remove least recently used blobs until within max_bytes."""
+        while self.total_bytes > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            blob, size = self._entries[key]
+            blob.unlink(missing_ok=True)
+            self._drop(key)
+            self.evictions += 1
+            logger.debug(f"Evicted TTS cache entry {key} ({size} bytes)")
+
+    def _drop(self, key: str) -> None:
+        _, size = self._entries.pop(key)
+        self.total_bytes -= size
+
+    def stats(self) -> dict:
+        """Cache counters for monitoring and sizing."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+
+# Singleton instance
+_tts_cache: Optional[TTSCache] = None
+
+
+def get_tts_cache() -> TTSCache:
+    """Get or create TTS cache instance."""
+    global _tts_cache
+    if _tts_cache is None:
+        _tts_cache = TTSCache()
+    return _tts_cache
@@ -0,0 +1,41 @@
+"""Interface implemented by TTS providers."""
+
+from typing import AsyncIterator, Protocol
+
+from ..models.tts import Voice
+
+
+class TTSProvider(Protocol):
+    """
+    A text-to-speech backend that streams audio in chunks.
+
+    Providers never hold a whole synthesis in memory: stream() yields encoded
+    audio (a playable file format, not raw samples) as it arrives, and
+    TTSService appends the chunks to storage.
+    """
+
+    content_type: str  # MIME type of the streamed audio
+    extension: str  # File extension used when the audio is stored
+    model: str  # Provider model ID (part of the TTS cache key)
+
+    def stream(self, text: str, voice_id: str, speed: float = 1.0) -> AsyncIterator[bytes]:
+        """Yield encoded audio chunks for the text."""
+        ...
+
+    def estimate_duration(self, num_bytes: int) -> float:
+        """
+        Approximate duration in seconds of a complete stream of num_bytes.
+
+        Only used when the stored audio's headers cannot be parsed; see
+        audio_info for exact durations.
+        """
+        ...
+
+    def get_voice_id(self, voice_name: str) -> str:
+        ...
+
+    def get_voices(self) -> list[Voice]:
+        ...
+
+    def is_available(self) -> bool:
+        ...
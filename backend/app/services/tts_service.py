@@ -1,16 +1,30 @@
 """TTS service orchestration layer."""
 
+import asyncio
 import uuid
-from typing import Literal, Optional
+import weakref
+from contextlib import aclosing
+from pathlib import Path
+from typing import AsyncIterator, Literal, Optional
 
+from ..config import get_settings
+from ..logging_config import get_logger
 from ..models.tts import Voice
+from .async_storage import run_storage_io
+from .audio_info import probe_file
 from .elevenlabs_tts import ElevenLabsTTSProvider, get_elevenlabs_provider
 from .google_tts import GoogleTTSProvider, get_google_provider
-from .storage import StorageService, get_storage_service
+from .storage import TEMP_AUDIO_ID, AudioWriter, StorageService, get_storage_service
+from .tts_cache import TTSCache, get_tts_cache
+from .tts_provider import TTSProvider
 
+logger = get_logger(__name__)
 
 ProviderType = Literal["elevenlabs", "google"]
 
+# Read size when replaying cached audio to a stream
+CACHED_CHUNK_SIZE = 64 * 1024
+
 
 class TTSService:
     """Orchestrates TTS synthesis across providers."""
@@ -20,10 +34,23 @@ class TTSService:
         elevenlabs_provider: Optional[ElevenLabsTTSProvider] = None,
         google_provider: Optional[GoogleTTSProvider] = None,
         storage_service: Optional[StorageService] = None,
+        concurrency_limits: Optional[dict[str, int]] = None,
+        cache: Optional[TTSCache] = None,
     ):
         self._elevenlabs = elevenlabs_provider
         self._google = google_provider
         self._storage = storage_service
+        self.cache = cache
+
+        settings = get_settings()
+        self.concurrency_limits = concurrency_limits or {
+            "elevenlabs": settings.elevenlabs_max_concurrency,
+            "google": settings.google_max_concurrency,
+        }
+        # Per event loop: a semaphore belongs to the first loop that waits on it
+        self._semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]] = (
+            weakref.WeakKeyDictionary()
+        )
 
     @property
     def elevenlabs(self) -> ElevenLabsTTSProvider:
@@ -43,7 +70,7 @@ class TTSService:
             self._storage = get_storage_service()
         return self._storage
 
-    def get_provider(self, provider_type: ProviderType):
+    def get_provider(self, provider_type: ProviderType) -> TTSProvider:
         """Get provider by type."""
         if provider_type == "elevenlabs":
             return self.elevenlabs
@@ -52,6 +79,22 @@ class TTSService:
         else:
             raise ValueError(f"Unknown provider: {provider_type}")
 
+    def get_semaphore(self, provider_type: ProviderType) -> asyncio.Semaphore:
+        """
+        Get the semaphore bounding concurrent synthesis calls for a provider.
+
+        Semaphores are kept per running event loop, so the service singleton
+        can be used from more than one loop (e.g. successive test clients or
+        asyncio.run calls); the limit applies within each loop.
+        """
+        semaphores = self._semaphores.setdefault(asyncio.get_running_loop(), {})
+        semaphore = semaphores.get(provider_type)
+        if semaphore is None:
+            limit = max(1, self.concurrency_limits.get(provider_type, 1))
+            semaphore = asyncio.Semaphore(limit)
+            semaphores[provider_type] = semaphore
+        return semaphore
+
     async def synthesize(
         self,
         text: str,
@@ -62,37 +105,145 @@ class TTSService:
         speed: float = 1.0,
     ) -> tuple[str, float]:
         """
-        Synthesize text to speech and optionally save to storage.
+        Synthesize text to speech and save it to storage.
+
+        Audio is appended to storage chunk by chunk as the provider streams
+        it, so memory use is bounded by the provider's chunk size. File
+        writes, hashing and fsyncs run on the storage I/O pool.
 
         Returns:
             Tuple of (audio_url, duration_seconds)
         """
-        # Get provider and synthesize
         tts_provider = self.get_provider(provider)
-        result = await tts_provider.synthesize(text, voice_id, speed)
+        ritual_id, segment_id = self._resolve_target(ritual_id, segment_id)
 
-        # Determine file extension based on content type
-        extension = "mp3" if result.content_type == "audio/mpeg" else "wav"
+        key = self.synthesis_key(text, voice_id, provider, speed)
+        cache_key = key if self.cache else None
+        cached = await run_storage_io(self.cache.get, cache_key) if cache_key else None
+        if cached:
+            audio_url = await run_storage_io(self.storage.link_audio, ritual_id, segment_id, cached, synthesis_key=key)
+            return audio_url, await run_storage_io(self.measure_duration, tts_provider, cached)
 
-        # Save to storage if ritual_id and segment_id provided
-        if ritual_id and segment_id:
-            audio_url = self.storage.save_audio(
-                ritual_id=ritual_id,
-                segment_id=segment_id,
-                audio_bytes=result.audio_bytes,
-                extension=extension,
-            )
-        else:
-            # Generate a temp ID and save for immediate use
-            temp_id = str(uuid.uuid4())
-            audio_url = self.storage.save_audio(
-                ritual_id="temp",
-                segment_id=temp_id,
-                audio_bytes=result.audio_bytes,
-                extension=extension,
+        writer = await run_storage_io(
+            self.storage.open_audio_writer, ritual_id, segment_id, tts_provider.extension, synthesis_key=key
+        )
+        async for _ in self._tee(tts_provider, provider, writer, text, voice_id, speed, cache_key):
+            pass
+
+        return writer.url, await run_storage_io(self.measure_duration, tts_provider, writer.final_path)
+
+    def stream(
+        self,
+        text: str,
+        voice_id: str,
+        provider: ProviderType = "elevenlabs",
+        ritual_id: Optional[str] = None,
+        segment_id: Optional[str] = None,
+        speed: float = 1.0,
+    ) -> tuple[str, str, AsyncIterator[bytes]]:
+        """
+        Stream synthesized audio while teeing it to storage.
+
+        Returns:
+            Tuple of (audio_url, content_type, chunks). The file at audio_url
+            is published once the stream has been fully consumed; if the
+            consumer stops early the partial file is discarded.
+        """
+        tts_provider = self.get_provider(provider)
+        ritual_id, segment_id = self._resolve_target(ritual_id, segment_id)
+        audio_url = self.storage.audio_url(ritual_id, segment_id, tts_provider.extension)
+
+        key = self.synthesis_key(text, voice_id, provider, speed)
+        cache_key = key if self.cache else None
+
+        async def chunks() -> AsyncIterator[bytes]:
+            cached = await run_storage_io(self.cache.get, cache_key) if cache_key else None
+            if cached:
+                await run_storage_io(self.storage.link_audio, ritual_id, segment_id, cached, synthesis_key=key)
+                f = await run_storage_io(open, cached, "rb")
+                try:
+                    while chunk := await run_storage_io(f.read, CACHED_CHUNK_SIZE):
+                        yield chunk
+                finally:
+                    await run_storage_io(f.close)
+                return
+
+            writer = await run_storage_io(
+                self.storage.open_audio_writer, ritual_id, segment_id, tts_provider.extension, synthesis_key=key
             )
+            # aclosing: if our consumer stops early, abort the tee right away
+            tee = self._tee(tts_provider, provider, writer, text, voice_id, speed, cache_key)
+            async with aclosing(tee):
+                async for chunk in tee:
+                    yield chunk
+
+        return audio_url, tts_provider.content_type, chunks()
+
+    @staticmethod
+    def measure_duration(tts_provider: TTSProvider, path: Path) -> float:
+        """Duration read from the audio's headers, falling back to the provider's estimate."""
+        try:
+            return probe_file(path).duration_seconds
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read duration of {path.name}, estimating from size: {e}")
+            return tts_provider.estimate_duration(path.stat().st_size)
+
+    def discard_cached(self, text: str, voice_id: str, provider: ProviderType, speed: float = 1.0) -> bool:
+        """
+        Drop the cached audio for a synthesis so the next request calls the provider.
+
+        Ritual audio files are hard links to cache blobs, so a corrupt segment
+        file usually means a corrupt blob too.
+        """
+        if self.cache is None:
+            return False
+        return self.cache.discard(self.synthesis_key(text, voice_id, provider, speed))
+
+    def synthesis_key(self, text: str, voice_id: str, provider: ProviderType, speed: float = 1.0) -> str:
+        """
+        Hash of everything that determines a synthesis's audio.
+
+        Doubles as the TTS cache key, and is recorded in the audio manifest
+        next to each segment file so audio jobs can tell which segments are
+        out of date after an edit or a voice/provider switch.
+        """
+        tts_provider = self.get_provider(provider)
+        return TTSCache.make_key(provider, tts_provider.get_voice_id(voice_id), tts_provider.model, speed, text)
+
+    @staticmethod
+    def _resolve_target(ritual_id: Optional[str], segment_id: Optional[str]) -> tuple[str, str]:
+        """Storage location for a synthesis; ad-hoc requests get a temp ID."""
+        if ritual_id and segment_id:
+            return ritual_id, segment_id
+        return TEMP_AUDIO_ID, str(uuid.uuid4())
 
-        return audio_url, result.duration_seconds
+    async def _tee(
+        self,
+        tts_provider: TTSProvider,
+        provider: ProviderType,
+        writer: AudioWriter,
+        text: str,
+        voice_id: str,
+        speed: float,
+        cache_key: Optional[str] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        Relay provider chunks while appending them to writer; commit (and
+        cache) on completion. Writes and the commit's fsync run on the
+        storage I/O pool, one at a time and in order.
+        """
+        try:
+            # Bounded by the provider's concurrency limit
+            async with self.get_semaphore(provider):
+                async for chunk in tts_provider.stream(text, voice_id, speed):
+                    await run_storage_io(writer.write, chunk)
+                    yield chunk
+        except BaseException:
+            writer.abort()  # Close and unlink only; also runs while the generator is being closed
+            raise
+        await run_storage_io(writer.commit)
+        if cache_key:
+            await run_storage_io(self.cache.put, cache_key, writer.final_path)
 
     def get_all_voices(self) -> list[Voice]:
         """Get voices from all providers (always returns static voice list)."""
@@ -110,5 +261,6 @@ def get_tts_service() -> TTSService:
     """Get or create TTS service instance."""
     global _tts_service
     if _tts_service is None:
-        _tts_service = TTSService()
+        settings = get_settings()
+        _tts_service = TTSService(cache=get_tts_cache() if settings.tts_cache_enabled else None)
     return _tts_service
@@ -0,0 +1,45 @@
+"""Helpers for writing PCM WAV headers, including streaming headers."""
+
+import struct
+from pathlib import Path
+
+WAV_HEADER_SIZE = 44
+
+# Size placeholder used when the data length is not known up front
+STREAMING_SIZE = 0xFFFFFFFF
+
+
+def wav_header(
+    sample_rate: int = 24000,
+    channels: int = 1,
+    sample_width: int = 2,
+    data_size: int = STREAMING_SIZE,
+) -> bytes:
+    """
+    Build a canonical 44-byte PCM WAV header.
+
+    With the default data_size the header describes an open-ended stream,
+    which players accept for progressive playback. Use finalize_wav_header
+    to write the real sizes once the stream is complete.
+    """
+    byte_rate = sample_rate * channels * sample_width
+    block_align = channels * sample_width
+    riff_size = STREAMING_SIZE if data_size == STREAMING_SIZE else 36 + data_size
+    return (
+        b"RIFF" + struct.pack("<I", riff_size) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, sample_rate, byte_rate, block_align, sample_width * 8)
+        + b"data" + struct.pack("<I", data_size)
+    )
+
+
+def finalize_wav_header(path: Path) -> None:
+    """Patch the RIFF and data chunk sizes of a canonical WAV file in place."""
+    total_size = path.stat().st_size
+    with open(path, "r+b") as f:
+        header = f.read(WAV_HEADER_SIZE)
+        if len(header) < WAV_HEADER_SIZE or header[0:4] != b"RIFF" or header[8:12] != b"WAVE" or header[36:40] != b"data":
+            return  # Not a canonical PCM WAV header; leave untouched
+        f.seek(4)
+        f.write(struct.pack("<I", total_size - 8))
+        f.seek(40)
+        f.write(struct.pack("<I", total_size - WAV_HEADER_SIZE))
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Backfill exact audio durations for stored rituals.
+
+Reads every ritual in storage, measures each text segment's audio from its
+MP3 frame headers or WAV chunks, and rewrites actualDurationSeconds where the
+stored value is missing or differs (e.g. the old ElevenLabs byte-size estimate).
+
+Run from backend/:
+  python scripts/backfill_audio_durations.py [--dry-run] [--tolerance 0.01]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.audio_info import probe_file  # noqa: E402
+from app.services.storage import get_storage_service  # noqa: E402
+
+
+def backfill(dry_run: bool = False, tolerance: float = 0.01) -> dict:
+    """Update segment durations across all rituals; returns counters."""
+    storage = get_storage_service()
+    stats = {"rituals": 0, "rituals_updated": 0, "segments": 0, "updated": 0, "missing": 0, "unreadable": 0}
+
+    for ritual in storage.iter_rituals():
+        stats["rituals"] += 1
+        changed = False
+        audio = storage.segment_audio(ritual.id)
+
+        for section in ritual.sections:
+            for segment in section.segments:
+                if segment.type != "text":
+                    continue
+                path = audio.get(segment.id)
+                if path is None:
+                    stats["missing"] += 1
+                    continue
+
+                stats["segments"] += 1
+                try:
+                    duration = probe_file(path).duration_seconds
+                except (OSError, ValueError) as e:
+                    stats["unreadable"] += 1
+                    print(f"  {ritual.id}/{path.name}: unreadable ({e})")
+                    continue
+
+                old = segment.actual_duration_seconds
+                if old is None or abs(old - duration) > tolerance:
+                    old_label = "none" if old is None else f"{old:.2f}s"
+                    print(f"  {ritual.id}/{path.name}: {old_label} -> {duration:.2f}s")
+                    segment.actual_duration_seconds = duration
+                    stats["updated"] += 1
+                    changed = True
+
+        if changed:
+            stats["rituals_updated"] += 1
+            if not dry_run:
+                storage.save_ritual(ritual)
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill exact audio durations for stored rituals")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without saving")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="Seconds of difference to ignore (default: 0.01)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    stats = backfill(dry_run=args.dry_run, tolerance=args.tolerance)
+    elapsed = time.perf_counter() - started
+
+    print("-" * 50)
+    print(
+        f"Probed {stats['segments']} audio files in {stats['rituals']} rituals in {elapsed:.2f}s: "
+        f"{stats['updated']} durations updated across {stats['rituals_updated']} rituals, "
+        f"{stats['missing']} segments without audio, {stats['unreadable']} unreadable"
+    )
+    if args.dry_run:
+        print("Dry run: no rituals were saved")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Compare the file and SQLite storage backends.
+
+For each library size, fills a fresh temporary storage directory and times
+save, load, list (full and one summary page), filtered paging, full-text
+search (a query matching half the library) and delete.
+Times are per operation except for the listings, which are per call.
+
+Run from backend/:
+  python scripts/benchmark_storage.py [--sizes 1000 10000 100000] [--samples 200]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.models.ritual import Ritual, RitualSection, Segment  # noqa: E402
+from app.services.sqlite_storage import SQLiteStorageService  # noqa: E402
+from app.services.storage import StorageService  # noqa: E402
+
+BACKENDS = {"files": StorageService, "sqlite": SQLiteStorageService}
+TONES = ["gentle", "neutral", "coach"]
+
+
+def make_ritual(i: int) -> Ritual:
+    """A ritual of typical size: three sections of a few segments each."""
+    sections = [
+        RitualSection(id=f"{kind}-{i}", type=kind, duration_seconds=60, segments=[
+            Segment(id=f"{kind}-{i}-{j}", type="text" if j % 2 == 0 else "silence",
+                    text="Breathe in slowly and let your shoulders drop." if j % 2 == 0 else None,
+                    duration_seconds=5)
+            for j in range(4)
+        ])
+        for kind in ("intro", "body", "closing")
+    ]
+    return Ritual(
+        id=f"bench-{i:06d}",
+        title=f"Ritual {i}",
+        duration=180,
+        tone=TONES[i % 3],
+        tags=["morning"] if i % 2 else ["evening", "sleep"],
+        created_at=f"2024-01-01T00:00:00.{i:06d}Z",
+        sections=sections,
+    )
+
+
+def timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def run(backend: str, size: int, samples: int) -> dict[str, float]:
+    """Seconds for each operation on a library of `size` rituals."""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = BACKENDS[backend](Path(tmp))
+        rituals = (make_ritual(i) for i in range(size))
+        results["save"] = timed(lambda: storage.save_rituals(rituals)) / size
+
+        ids = [f"bench-{i:06d}" for i in random.Random(0).sample(range(size), min(samples, size))]
+        results["load"] = timed(lambda: [storage.load_ritual(ritual_id) for ritual_id in ids]) / len(ids)
+
+        # Reopen so the first listing includes startup cost (index load and reconcile, or schema check)
+        storage = BACKENDS[backend](Path(tmp))
+        results["open + list"] = timed(storage.list_ritual_summaries)
+        results["page of 50"] = timed(lambda: storage.page_ritual_summaries(limit=50))
+        results["filtered page"] = timed(
+            lambda: storage.page_ritual_summaries(limit=50, tags=["sleep"], tone="coach")
+        )
+        results["search"] = timed(lambda: storage.search_rituals("evening breathe", limit=20))
+        results["delete"] = timed(lambda: [storage.delete_ritual(ritual_id) for ritual_id in ids]) / len(ids)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ritual storage backends")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--samples", type=int, default=200, help="Rituals loaded and deleted per run (default: 200)")
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=list(BACKENDS))
+    args = parser.parse_args()
+
+    print(f"{'backend':<8} {'rituals':>8}  " + "  ".join(f"{name:>14}" for name in (
+        "save", "load", "open + list", "page of 50", "filtered page", "search", "delete")))
+    for size in args.sizes:
+        for backend in args.backends:
+            results = run(backend, size, args.samples)
+            print(f"{backend:<8} {size:>8}  " + "  ".join(f"{seconds * 1000:>12.3f}ms" for seconds in results.values()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Move ritual files and audio into the flat or sharded on-disk layout.
+
+Safe to run while the server is up: set STORAGE_LAYOUT to the target layout
+and restart first, then run this. Until an entry is moved the server reads
+it from the old layout, and audio URLs don't change. Each ritual file and
+audio directory moves with one rename, so an interrupted run can simply be
+repeated.
+
+Run from backend/:
+  python scripts/migrate_layout.py to-sharded
+  python scripts/migrate_layout.py to-flat
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.storage import StorageService  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move ritual files and audio into the flat or sharded layout")
+    parser.add_argument("direction", choices=["to-sharded", "to-flat"])
+    parser.add_argument("--storage-path", type=Path, help="Storage directory (default: STORAGE_PATH setting)")
+    args = parser.parse_args()
+
+    storage = StorageService(args.storage_path, layout=args.direction.removeprefix("to-"))
+    started = time.perf_counter()
+
+    def progress(moved: int) -> None:
+        print(f"  {moved} rituals moved ({time.perf_counter() - started:.1f}s)")
+
+    moved = storage.migrate_layout(progress=progress)
+    print("-" * 50)
+    print(
+        f"Moved {moved['rituals']} rituals and {moved['audio_dirs']} audio directories "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Move rituals between the file and SQLite storage backends.
+
+Rituals are streamed from the source in batches, so memory stays flat
+regardless of library size. Rituals already in the target are replaced, so
+an interrupted run can simply be repeated. Audio files are shared by both
+backends and are not touched. Set STORAGE_BACKEND afterwards to switch.
+
+Run from backend/:
+  python scripts/migrate_storage.py to-sqlite [--db-path storage/rituals.db]
+  python scripts/migrate_storage.py to-files
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.sqlite_storage import SQLiteStorageService, migrate_rituals  # noqa: E402
+from app.services.storage import StorageService  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move rituals between the file and SQLite storage backends")
+    parser.add_argument("direction", choices=["to-sqlite", "to-files"])
+    parser.add_argument("--storage-path", type=Path, help="Storage directory (default: STORAGE_PATH setting)")
+    parser.add_argument("--db-path", type=Path, help="SQLite database (default: SQLITE_PATH or {storage}/rituals.db)")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rituals per transaction (default: 500)")
+    args = parser.parse_args()
+
+    files = StorageService(args.storage_path)
+    database = SQLiteStorageService(args.storage_path, db_path=args.db_path)
+    source, target = (files, database) if args.direction == "to-sqlite" else (database, files)
+
+    started = time.perf_counter()
+
+    def progress(copied: int) -> None:
+        print(f"  {copied} rituals copied ({time.perf_counter() - started:.1f}s)")
+
+    copied = migrate_rituals(source, target, batch_size=args.batch_size, progress=progress)
+    print("-" * 50)
+    print(f"Copied {copied} rituals in {time.perf_counter() - started:.2f}s; target now has {target.count_rituals()}")
+
+
+if __name__ == "__main__":
+    main()
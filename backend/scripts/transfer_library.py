@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Export or import the whole ritual library.
+
+Exports are NDJSON (one ritual per line), or with --audio a tar holding each
+ritual and its segment audio. Both are streamed, so memory stays flat
+regardless of library size. Imports detect the format, run on several
+threads and skip anything already stored (rituals at least as recent,
+identical audio files), so an interrupted import can simply be rerun.
+
+Run from backend/:
+  python scripts/transfer_library.py export [--audio] [-o rituals.ndjson]
+  python scripts/transfer_library.py import rituals.ndjson [--workers 8]
+  python scripts/transfer_library.py export --audio | ssh host 'cd backend && python scripts/transfer_library.py import -'
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.library_transfer import (  # noqa: E402
+    DEFAULT_IMPORT_WORKERS,
+    export_ndjson,
+    export_tar,
+    import_ndjson,
+    import_tar,
+    is_tar,
+)
+from app.services.storage import get_storage_service  # noqa: E402
+
+
+def export(args: argparse.Namespace) -> None:
+    storage = get_storage_service()
+    chunks = export_tar(storage) if args.audio else export_ndjson(storage)
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    written = 0
+    started = time.perf_counter()
+    try:
+        for chunk in chunks:
+            out.write(chunk)
+            written += len(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    print(f"Exported {written} bytes in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+
+
+def import_(args: argparse.Namespace) -> None:
+    storage = get_storage_service()
+    source = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    started = time.perf_counter()
+    last_report = started
+
+    def progress(result: dict) -> None:
+        nonlocal last_report
+        if time.perf_counter() - last_report >= 5:
+            last_report = time.perf_counter()
+            print(
+                f"  {result['rituals_imported']} imported, {result['rituals_skipped']} unchanged, "
+                f"{result['audio_imported']} audio files ({last_report - started:.0f}s)",
+                file=sys.stderr,
+            )
+
+    with source:
+        if is_tar(source.peek(512)[:512]):
+            result = import_tar(storage, source, args.workers, progress)
+        else:
+            result = import_ndjson(storage, source, args.workers, progress)
+
+    print("-" * 50, file=sys.stderr)
+    print(
+        f"Rituals: {result['rituals_imported']} imported, {result['rituals_skipped']} unchanged; "
+        f"audio files: {result['audio_imported']} imported, {result['audio_skipped']} unchanged; "
+        f"{result['failed']} failed ({time.perf_counter() - started:.2f}s)",
+        file=sys.stderr,
+    )
+    for error in result["errors"]:
+        print(f"  {error}", file=sys.stderr)
+    if result["failed"]:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import the ritual library")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Write every ritual to a file or stdout")
+    export_parser.add_argument("--audio", action="store_true", help="Write a tar including segment audio")
+    export_parser.add_argument("-o", "--output", default="-", help="Output file (default: stdout)")
+    export_parser.set_defaults(run=export)
+
+    import_parser = commands.add_parser("import", help="Import an export (NDJSON or tar)")
+    import_parser.add_argument("input", help="Export file, or - for stdin")
+    import_parser.add_argument("--workers", type=int, default=DEFAULT_IMPORT_WORKERS,
+                               help=f"Import threads (default: {DEFAULT_IMPORT_WORKERS})")
+    import_parser.set_defaults(run=import_)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Verify stored segment audio against its recorded sizes and checksums.
+
+Checks every ritual's audio files against the manifest written alongside
+them and reports corrupt or truncated files. Files from before manifests
+existed are recorded if they parse as audio. With --repair, corrupt files
+are deleted and their rituals marked pending, so the next audio job for
+each ritual regenerates only those segments.
+
+Run from backend/:
+  python scripts/verify_audio.py [--repair]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.storage import get_storage_service  # noqa: E402
+
+
+def verify(repair: bool = False) -> dict:
+    """Verify audio for all rituals; returns counters."""
+    storage = get_storage_service()
+    stats = {"rituals": 0, "files": 0, "ok": 0, "corrupt": 0, "removed": 0, "adopted": 0}
+
+    for summary in storage.list_ritual_summaries():
+        result = storage.verify_ritual_audio(summary.id, repair=repair)
+        stats["rituals"] += 1
+        stats["files"] += result["checked"]
+        stats["ok"] += result["ok"]
+        stats["corrupt"] += len(result["corrupt"])
+        stats["removed"] += len(result["removed"])
+        stats["adopted"] += len(result["adopted"])
+        for segment_id, reason in result["corrupt"].items():
+            print(f"  {summary.id}/{segment_id}: {reason}")
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify stored segment audio against recorded checksums")
+    parser.add_argument("--repair", action="store_true", help="Delete corrupt files so they are regenerated")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    stats = verify(repair=args.repair)
+    elapsed = time.perf_counter() - started
+
+    print("-" * 50)
+    print(
+        f"Checked {stats['files']} audio files in {stats['rituals']} rituals in {elapsed:.2f}s: "
+        f"{stats['ok']} ok ({stats['adopted']} newly recorded), {stats['corrupt']} corrupt, {stats['removed']} removed"
+    )
+    if stats["corrupt"] and not args.repair:
+        print("Run with --repair to delete corrupt files and mark their rituals for regeneration")
+
+
+if __name__ == "__main__":
+    main()
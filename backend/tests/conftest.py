@@ -4,11 +4,14 @@ import os
 import shutil
 import tempfile
 from pathlib import Path
-from typing import Generator
+from typing import TYPE_CHECKING, Callable, Generator
 
 import pytest
 from fastapi.testclient import TestClient
 
+if TYPE_CHECKING:
+    from app.services.tts_service import TTSService
+
 # Set test environment before importing app
 os.environ.setdefault("STORAGE_PATH", tempfile.mkdtemp())
 
@@ -66,11 +69,16 @@ def mock_openai_client(test_storage_path: Path) -> Generator[TestClient, None, N
 
 
 @pytest.fixture
-def mock_tts_client(test_storage_path: Path) -> Generator[TestClient, None, None]:
-    """TestClient with mock TTS providers injected."""
+def mock_tts_services(test_storage_path: Path) -> Generator[Callable[..., "TTSService"], None, None]:
+    """
+    Factory installing storage at test_storage_path and a TTSService with
+    mock providers as the app's singletons (restored afterwards).
+
+    Keyword arguments are passed to TTSService, overriding the default
+    mock providers, e.g. a provider with latency or concurrency limits.
+    """
     os.environ["STORAGE_PATH"] = str(test_storage_path)
 
-    from app.main import app
     from app.services.storage import StorageService
     from app.services.tts_service import TTSService
     from tests.mocks import MockElevenLabsTTSProvider, MockGoogleTTSProvider
@@ -81,54 +89,49 @@ def mock_tts_client(test_storage_path: Path) -> Generator[TestClient, None, None
     original_tts = tts_module._tts_service
     original_storage = storage_module._storage_service
 
-    storage = StorageService(test_storage_path)
-    storage_module._storage_service = storage
-    tts_module._tts_service = TTSService(
-        elevenlabs_provider=MockElevenLabsTTSProvider(),
-        google_provider=MockGoogleTTSProvider(),
-        storage_service=storage,
-    )
+    def install(**overrides) -> TTSService:
+        storage = StorageService(test_storage_path)
+        storage_module._storage_service = storage
+        tts_module._tts_service = TTSService(**{
+            "elevenlabs_provider": MockElevenLabsTTSProvider(),
+            "google_provider": MockGoogleTTSProvider(),
+            "storage_service": storage,
+            **overrides,
+        })
+        return tts_module._tts_service
 
-    with TestClient(app) as c:
-        yield c
+    yield install
 
     tts_module._tts_service = original_tts
     storage_module._storage_service = original_storage
 
 
 @pytest.fixture
-def mock_all_client(test_storage_path: Path) -> Generator[TestClient, None, None]:
-    """TestClient with both OpenAI and TTS mocked."""
-    os.environ["STORAGE_PATH"] = str(test_storage_path)
+def mock_tts_client(mock_tts_services) -> Generator[TestClient, None, None]:
+    """TestClient with mock TTS providers injected."""
+    from app.main import app
+
+    mock_tts_services()
+    with TestClient(app) as c:
+        yield c
 
+
+@pytest.fixture
+def mock_all_client(mock_tts_services) -> Generator[TestClient, None, None]:
+    """TestClient with both OpenAI and TTS mocked."""
     from app.main import app
-    from app.services.storage import StorageService
-    from app.services.tts_service import TTSService
-    from tests.mocks import MockOpenAIProvider, MockElevenLabsTTSProvider, MockGoogleTTSProvider
+    from tests.mocks import MockOpenAIProvider
 
-    import app.services.storage as storage_module
     import app.services.openai_provider as openai_module
-    import app.services.tts_service as tts_module
 
     original_provider = openai_module._provider
-    original_tts = tts_module._tts_service
-    original_storage = storage_module._storage_service
-
-    storage = StorageService(test_storage_path)
-    storage_module._storage_service = storage
+    mock_tts_services()
     openai_module._provider = MockOpenAIProvider()
-    tts_module._tts_service = TTSService(
-        elevenlabs_provider=MockElevenLabsTTSProvider(),
-        google_provider=MockGoogleTTSProvider(),
-        storage_service=storage,
-    )
 
     with TestClient(app) as c:
         yield c
 
     openai_module._provider = original_provider
-    tts_module._tts_service = original_tts
-    storage_module._storage_service = original_storage
 
 
 @pytest.fixture
@@ -1,18 +1,27 @@
 """Mock TTS providers for offline testing."""
 
-from app.models.tts import TTSResult, Voice
+import asyncio
+from abc import ABC, abstractmethod
+from typing import AsyncIterator
 
+from app.models.tts import Voice
+from app.services.wav import WAV_HEADER_SIZE, wav_header
 
-class MockElevenLabsTTSProvider:
-    """Mock ElevenLabs TTS provider that returns fake MP3 bytes."""
 
-    VOICES = {
-        "sarah": {"name": "Sarah", "description": "Soft and calm American female", "labels": ["calm", "female"]},
-        "daniel": {"name": "Daniel", "description": "Warm British male", "labels": ["warm", "male"]},
-    }
+class _MockTTSProviderBase(ABC):
+    """Shared behaviour for mock providers: latency injection, failures, call tracking."""
+
+    model = "mock"
+    CHUNK_COUNT = 3  # Chunks yielded by stream()
+    SECONDS_PER_CHAR = 0.06  # ~60ms of speech per character
 
-    def __init__(self, api_key: str | None = None):
+    def __init__(self, api_key: str | None = None, latency: float = 0.0, fail_texts: set[str] | None = None):
         self.api_key = api_key or "mock-key"
+        self.latency = latency  # Simulated provider round-trip (seconds)
+        self.fail_texts = fail_texts or set()
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
 
     def is_available(self) -> bool:
         return True
@@ -20,55 +29,90 @@ class MockElevenLabsTTSProvider:
     def get_voice_id(self, voice_name: str) -> str:
         return voice_name
 
+    async def _simulate_call(self, text: str) -> None:
+        """Track concurrency, inject latency and raise for configured failures."""
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if text in self.fail_texts:
+                raise RuntimeError(f"Mock synthesis failure for '{text}'")
+        finally:
+            self.in_flight -= 1
+
+    def _fake_duration(self, text: str) -> float:
+        return max(0.1, len(text) * self.SECONDS_PER_CHAR)
+
+    @abstractmethod
+    def _fake_audio(self, text: str) -> bytes:
+        """Silent audio in the provider's format lasting _fake_duration(text)."""
+
+    async def stream(self, text: str, voice_id: str = "", speed: float = 1.0) -> AsyncIterator[bytes]:
+        """Yield the fake audio in a few chunks after the simulated latency."""
+        await self._simulate_call(text)
+        audio = self._fake_audio(text)
+        step = -(-len(audio) // self.CHUNK_COUNT)
+        for start in range(0, len(audio), step):
+            yield audio[start:start + step]
+            await asyncio.sleep(0)
+
+
+class MockElevenLabsTTSProvider(_MockTTSProviderBase):
+    """Mock ElevenLabs TTS provider that returns silent 128kbps MP3 frames."""
+
+    content_type = "audio/mpeg"
+    extension = "mp3"
+
+    # MPEG-1 Layer III, 128kbps, 44.1kHz, no padding: 417-byte frames of 1152 samples
+    FRAME = b"\xff\xfb\x90\x00" + b"\x00" * 413
+    SAMPLES_PER_FRAME = 1152
+    SAMPLE_RATE = 44100
+
+    VOICES = {
+        "sarah": {"name": "Sarah", "description": "Soft and calm American female", "labels": ["calm", "female"]},
+        "daniel": {"name": "Daniel", "description": "Warm British male", "labels": ["warm", "male"]},
+    }
+
     def get_voices(self) -> list[Voice]:
         return [
             Voice(id=vid, name=data["name"], description=data["description"], labels=data["labels"], provider="elevenlabs")
             for vid, data in self.VOICES.items()
         ]
 
-    async def synthesize(self, text: str, voice_id: str = "sarah", speed: float = 1.0) -> TTSResult:
-        # Generate fake MP3 bytes proportional to text length
-        fake_size = max(100, len(text) * 50)
-        fake_bytes = b"\xff\xfb\x90\x00" + b"\x00" * fake_size  # Fake MP3 header + padding
-        duration = len(text) * 0.06  # ~60ms per character
-        return TTSResult(
-            audio_bytes=fake_bytes,
-            duration_seconds=max(0.1, duration),
-            content_type="audio/mpeg",
-        )
+    def estimate_duration(self, num_bytes: int) -> float:
+        return num_bytes * 8 / 128_000
 
+    def _fake_audio(self, text: str) -> bytes:
+        # Whole frames covering ~60ms per character
+        frames = max(1, round(self._fake_duration(text) * self.SAMPLE_RATE / self.SAMPLES_PER_FRAME))
+        return self.FRAME * frames
 
-class MockGoogleTTSProvider:
+
+class MockGoogleTTSProvider(_MockTTSProviderBase):
     """Mock Google TTS provider that returns fake WAV bytes."""
 
+    content_type = "audio/wav"
+    extension = "wav"
+    SAMPLE_RATE = 24000
+
     VOICES = {
         "aoede": {"name": "Aoede", "description": "Warm, gentle female voice", "labels": ["warm", "gentle"]},
         "charon": {"name": "Charon", "description": "Deep, grounding male voice", "labels": ["deep", "grounding"]},
     }
 
-    def __init__(self, api_key: str | None = None):
-        self.api_key = api_key or "mock-key"
-
-    def is_available(self) -> bool:
-        return True
-
-    def get_voice_id(self, voice_name: str) -> str:
-        return voice_name
-
     def get_voices(self) -> list[Voice]:
         return [
             Voice(id=vid, name=data["name"], description=data["description"], labels=data["labels"], provider="google")
             for vid, data in self.VOICES.items()
         ]
 
-    async def synthesize(self, text: str, voice_id: str = "aoede", speed: float = 1.0) -> TTSResult:
-        # Generate fake WAV bytes proportional to text length
-        fake_size = max(100, len(text) * 50)
-        # Minimal WAV header (44 bytes) + padding
-        fake_bytes = b"RIFF" + fake_size.to_bytes(4, "little") + b"WAVE" + b"\x00" * (fake_size - 4)
-        duration = len(text) * 0.06
-        return TTSResult(
-            audio_bytes=fake_bytes,
-            duration_seconds=max(0.1, duration),
-            content_type="audio/wav",
-        )
+    def estimate_duration(self, num_bytes: int) -> float:
+        return max(0, num_bytes - WAV_HEADER_SIZE) / (self.SAMPLE_RATE * 2)
+
+    def _fake_audio(self, text: str) -> bytes:
+        # Silent 24kHz 16-bit mono PCM lasting ~60ms per character
+        pcm_size = round(self._fake_duration(text) * self.SAMPLE_RATE) * 2
+        # Streams start with an open-ended header, like the real provider
+        return wav_header(self.SAMPLE_RATE) + b"\x00" * pcm_size
@@ -0,0 +1,102 @@
+"""Regression tests: slow provider calls must not block the event loop."""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.services.elevenlabs_tts import ElevenLabsTTSProvider
+from app.services.google_tts import GoogleTTSProvider
+from app.services.openai_provider import OpenAIProvider
+
+SLOW_CALL_SECONDS = 0.5
+
+
+class SlowElevenLabsTTS:
+    """Stands in for AsyncElevenLabs.text_to_speech with a slow upstream."""
+
+    def convert(self, voice_id: str, **kwargs):
+        async def stream():
+            await asyncio.sleep(SLOW_CALL_SECONDS)
+            yield b"\xff\xfb\x90\x00" + b"\x00" * 400
+        return stream()
+
+
+class SlowGoogleModels:
+    """Stands in for genai.Client.aio.models with a slow upstream."""
+
+    async def generate_content_stream(self, **kwargs):
+        await asyncio.sleep(SLOW_CALL_SECONDS)
+        part = SimpleNamespace(inline_data=SimpleNamespace(data=b"\x00\x00" * 2400))
+        response = SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+
+        async def responses():
+            yield response
+        return responses()
+
+
+@pytest.mark.offline
+class TestEventLoopNotBlocked:
+    """/health must answer while a slow synthesis is in flight."""
+
+    @pytest.fixture
+    def slow_app(self, mock_tts_services):
+        from app.main import app
+
+        elevenlabs = ElevenLabsTTSProvider(api_key="fake-key")
+        elevenlabs._client = SimpleNamespace(text_to_speech=SlowElevenLabsTTS())
+        google = GoogleTTSProvider(api_key="fake-key")
+        google._client = SimpleNamespace(aio=SimpleNamespace(models=SlowGoogleModels()))
+        mock_tts_services(elevenlabs_provider=elevenlabs, google_provider=google)
+        return app
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("provider,voice", [("elevenlabs", "sarah"), ("google", "aoede")])
+    async def test_health_answers_during_slow_synthesis(self, slow_app, provider: str, voice: str):
+        transport = httpx.ASGITransport(app=slow_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            synth = asyncio.create_task(client.post("/api/tts/synthesize", json={
+                "text": "Breathe in.",
+                "voiceId": voice,
+                "provider": provider,
+            }))
+            await asyncio.sleep(0.05)  # Let the synthesis reach the provider
+
+            start = time.perf_counter()
+            health = await client.get("/health")
+            health_elapsed = time.perf_counter() - start
+
+            assert health.status_code == 200
+            assert health_elapsed < SLOW_CALL_SECONDS / 2
+            assert not synth.done()
+
+            response = await synth
+            assert response.status_code == 200
+            assert response.json()["durationSeconds"] > 0
+
+
+@pytest.mark.offline
+class TestLazyClientCreation:
+    """Lazy SDK clients must be created exactly once under concurrent access."""
+
+    @pytest.mark.parametrize("provider_cls", [ElevenLabsTTSProvider, GoogleTTSProvider, OpenAIProvider])
+    def test_client_created_once_across_threads(self, provider_cls):
+        provider = provider_cls(api_key="fake-key")
+        barrier = threading.Barrier(8)
+        clients = []
+
+        def grab():
+            barrier.wait()
+            clients.append(provider.client)
+
+        threads = [threading.Thread(target=grab) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(clients) == 8
+        assert all(c is clients[0] for c in clients)
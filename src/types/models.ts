@@ -128,6 +128,12 @@ export interface Ritual extends RitualContent {
   audioStatus?: AudioStatus
   /** Selected voice for TTS */
   voiceId?: string
+  /** Server-rendered audio of the whole ritual */
+  audioUrl?: string
+  /** Duration of the rendered ritual audio in seconds */
+  audioDurationSeconds?: number
+  /** When the ritual audio was last rendered */
+  audioGeneratedAt?: string
 }
 
 // ====================